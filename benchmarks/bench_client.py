@@ -0,0 +1,140 @@
+"""
+End-to-end rollout throughput against a local mock OpenAI-compatible server:
+one request per rollout vs grouped n-choice requests (core.client.ChoiceBatcher),
+through a pooled AsyncOpenAI client with retries.
+
+    python -m events_env.benchmarks.bench_client [--prompts 16 --repeats 8 --slots 8]
+
+The server serves at most `--slots` requests at a time; each holds a slot for a
+prefill proportional to the prompt plus a decode time, and the n choices of one
+request decode together. `--fail-rate` answers that share of requests with 429.
+"""
+import argparse
+import asyncio
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Tuple
+from ..core.client import RetryPolicy, pooled_client
+from ..core.env_singleturn import EventSchedulingEnv
+from .synthetic import make_catalog, make_proposal, render_completion
+
+class MockServer:
+    """Threaded HTTP server emulating /v1/chat/completions with a bounded number of slots."""
+    def __init__(self, *, slots: int = 8, prefill_per_kchar: float = 0.01, decode: float = 0.05,
+                 per_choice: float = 0.002, fail_rate: float = 0.0, seed: int = 0):
+        self.slots = threading.BoundedSemaphore(slots)
+        self.prefill_per_kchar, self.decode, self.per_choice = prefill_per_kchar, decode, per_choice
+        self.fail_rate = fail_rate
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.failures = 0
+        events, _ = make_catalog(12, seed)
+        self.answer = render_completion(make_proposal(events, 4, seed, hallucinated=0))
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get("content-length", 0))) or b"{}")
+                status, payload = server.handle(body)
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("content-type", "application/json")
+                self.send_header("content-length", str(len(data)))
+                if status == 429:
+                    self.send_header("retry-after", "0.01")
+                self.end_headers()
+                self.wfile.write(data)
+
+        class Server(ThreadingHTTPServer):
+            request_queue_size = 1024
+            daemon_threads = True
+
+        self.httpd = Server(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}/v1"
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def handle(self, body: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+        with self.lock:
+            self.requests += 1
+            fail = self.rng.random() < self.fail_rate
+            self.failures += fail
+        if fail:
+            return 429, {"error": {"message": "rate limited", "type": "rate_limit"}}
+        n = int(body.get("n") or 1)
+        chars = sum(len(str(m.get("content", ""))) for m in body.get("messages", []))
+        with self.slots:
+            time.sleep(self.prefill_per_kchar * chars / 1000 + self.decode + self.per_choice * (n - 1))
+        return 200, {
+            "id": "mock", "object": "chat.completion", "created": int(time.time()), "model": body.get("model", "mock"),
+            "choices": [{"index": i, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": self.answer}} for i in range(n)],
+            "usage": {"prompt_tokens": chars // 4, "completion_tokens": n * len(self.answer) // 4,
+                      "total_tokens": chars // 4 + n * len(self.answer) // 4},
+        }
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        return False
+
+async def run_rollouts(env: EventSchedulingEnv, client: Any, prompts, repeats: int) -> float:
+    t0 = time.perf_counter()
+    results = await asyncio.gather(*(
+        env.rollout(client, "mock", p, "") for p in prompts for _ in range(repeats)
+    ))
+    assert all(c[0]["content"] for c, _ in results)
+    return time.perf_counter() - t0
+
+def measure(*, prompts: int = 16, repeats: int = 8, slots: int = 8, catalog_events: int = 200,
+            fail_rate: float = 0.0, max_connections: int = 64) -> Dict[str, Dict[str, float]]:
+    """{"single": {...}, "grouped": {...}} with wall seconds, rollouts/s and server requests per mode."""
+    msgs = []
+    for i in range(prompts):
+        events, prio = make_catalog(catalog_events, seed=i)
+        listing = "\n".join(f"- {n} ({s} - {e})" for n, s, e in events)
+        msgs.append([{"role": "system", "content": "Schedule."}, {"role": "user", "content": listing}])
+    out = {}
+    retry = RetryPolicy(max_attempts=8, base_delay=0.01)
+    for mode, group in (("single", 0), ("grouped", repeats)):
+        with MockServer(slots=slots, fail_rate=fail_rate) as server:
+            client = pooled_client(server.url, "mock", max_connections=max_connections)
+            env = EventSchedulingEnv(dataset=None, eval_dataset=_tiny_eval(), group_choices=group, retry=retry)
+            wall = asyncio.run(run_rollouts(env, client, msgs, repeats))
+            out[mode] = {"wall_seconds": wall, "rollouts_per_s": prompts * repeats / wall,
+                         "server_requests": server.requests, "rate_limited": server.failures}
+    return out
+
+def _tiny_eval():
+    from datasets import Dataset
+    return Dataset.from_list([{"prompt": [{"role": "user", "content": "x"}], "answer": "{}"}])
+
+def main(argv=None) -> None:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--prompts", type=int, default=16)
+    ap.add_argument("--repeats", type=int, default=8)
+    ap.add_argument("--slots", type=int, default=8)
+    ap.add_argument("--catalog-events", type=int, default=200)
+    ap.add_argument("--fail-rate", type=float, default=0.05)
+    args = ap.parse_args(argv)
+    res = measure(prompts=args.prompts, repeats=args.repeats, slots=args.slots,
+                  catalog_events=args.catalog_events, fail_rate=args.fail_rate)
+    print(f"{'mode':<8} {'wall_s':>8} {'rollouts/s':>11} {'requests':>9} {'429s':>5}")
+    for mode, r in res.items():
+        print(f"{mode:<8} {r['wall_seconds']:>8.2f} {r['rollouts_per_s']:>11.1f} {r['server_requests']:>9} {r['rate_limited']:>5}")
+    print(f"speedup: {res['single']['wall_seconds'] / res['grouped']['wall_seconds']:.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+"""
+Prompt and answer tokens per example for each catalog/output encoding.
+
+    python -m events_env.benchmarks.bench_encoding [--events 10 100 1000] [--tokenizer NAME]
+
+Counts are ~4 characters per token unless `--tokenizer` names a Hugging Face
+tokenizer (needs `transformers`).
+"""
+import argparse
+from ..core.env_singleturn import SYSTEM
+from ..io.encoding import SYSTEM_INDEXED, token_report
+from ..io.synthetic import SyntheticConfig, iter_examples
+
+def main(argv=None) -> None:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--events", type=int, nargs="+", default=[10, 100, 1000])
+    ap.add_argument("--examples", type=int, default=20)
+    ap.add_argument("--tokenizer", default=None)
+    args = ap.parse_args(argv)
+
+    count = None
+    if args.tokenizer:
+        from transformers import AutoTokenizer
+        tok = AutoTokenizer.from_pretrained(args.tokenizer)
+        count = lambda s: len(tok.encode(s, add_special_tokens=False))
+
+    print(f"{'events':>6} {'catalog':<7} {'output':<8} {'prompt':>9} {'answer':>8} {'total':>9}")
+    for n in args.events:
+        exs = iter_examples(SyntheticConfig(num_events=n), args.examples)
+        for r in token_report(exs, {"full": SYSTEM, "indexed": SYSTEM_INDEXED}, count_tokens=count):
+            print(f"{n:>6} {r['catalog']:<7} {r['output']:<8} {r['prompt_tokens']:>9.1f} {r['answer_tokens']:>8.1f} {r['total_tokens']:>9.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Cold import time of the package entry points, from `python -X importtime`.
+
+    python -m events_env.benchmarks.bench_import [--repeat N]
+
+The scoring/parsing core must load without verifiers, datasets, openai or
+numpy; only the env and rubric modules pay for them.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from typing import Set, Tuple
+
+PKG = __package__.split(".")[0]
+CORE_MODULES = tuple(f"{PKG}.{m}" for m in (
+    "evals.reward", "evals.scoring", "evals.conflict_checker", "evals.incremental",
+    "evals.precompute", "evals.rescore", "io.parsing", "io.loader", "io.store", "core.client",
+))
+ENV_MODULES = tuple(f"{PKG}.{m}" for m in ("evals.rubric", "core.env_singleturn", "core.env_multiturn"))
+HEAVY = frozenset({"verifiers", "datasets", "openai", "numpy", "pyarrow", "pandas", "aiohttp", "httpx", "httpx2", "torch", "transformers"})
+
+def import_profile(module: str) -> Tuple[float, Set[str]]:
+    """(milliseconds to import `module` in a fresh interpreter, top-level packages it loaded)."""
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(p for p in sys.path if p))
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                          env=env, capture_output=True, text=True, check=True)
+    total_us, loaded = 0, set()
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        top = name.strip().split(".")[0]
+        loaded.add(top)
+        # package modules at the outermost level; everything else nests under them
+        if not name[1:].startswith(" ") and top == PKG:
+            total_us += int(cumulative)
+    return total_us / 1000, loaded
+
+def main(argv=None) -> None:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args(argv)
+
+    print(f"{'module':<42} {'import_ms':>9}  heavy deps")
+    for module in CORE_MODULES + ENV_MODULES:
+        runs = [import_profile(module) for _ in range(args.repeat)]
+        ms = statistics.median(r[0] for r in runs)
+        heavy = ",".join(sorted(runs[0][1] & HEAVY)) or "-"
+        print(f"{module:<42} {ms:>9.1f}  {heavy}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+Schedule extraction on long reasoning traces: single-pass scanner vs the
+whole-document parse it replaced.
+
+    python -m events_env.benchmarks.bench_parsing [--repeat N]
+"""
+import argparse
+import json
+import time
+from ..io.parsing import _parse_legacy, parse_schedule_any
+
+def make_completion(think_chars: int, n_events: int = 12, fmt: str = "json") -> str:
+    events = [{"name": f"Event {i}", "start": f"{8 + i % 12:02d}:00", "end": f"{8 + i % 12:02d}:45"} for i in range(n_events)]
+    if fmt == "json":
+        payload = json.dumps({"schedule": events})
+    else:
+        payload = "<schedule>" + "".join(
+            f"<event><name>{e['name']}</name><start>{e['start']}</start><end>{e['end']}</end></event>" for e in events
+        ) + "</schedule>"
+    filler = "Considering overlaps between sessions and weighing priorities... "
+    think = (filler * (think_chars // len(filler) + 1))[:think_chars]
+    return f"<think>{think}</think>\nFinal answer:\n```{fmt}\n{payload}\n```\n"
+
+def _per_call_us(fn, text: str, repeat: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        fn(text)
+    return (time.perf_counter() - t0) / repeat * 1e6
+
+def main(argv=None) -> None:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--repeat", type=int, default=200)
+    args = ap.parse_args(argv)
+
+    print(f"{'format':<6} {'think_chars':>11} {'legacy_us':>10} {'scanner_us':>10} {'speedup':>8}")
+    for fmt in ("json", "xml"):
+        for chars in (0, 1_000, 10_000, 30_000):
+            text = make_completion(chars, fmt=fmt)
+            assert parse_schedule_any(text, allow_reasoning_tag=True) == _parse_legacy(text, True)[0]
+            legacy = _per_call_us(lambda t: _parse_legacy(t, True), text, args.repeat)
+            scan = _per_call_us(lambda t: parse_schedule_any(t, allow_reasoning_tag=True), text, args.repeat)
+            print(f"{fmt:<6} {chars:>11} {legacy:>10.1f} {scan:>10.1f} {legacy / scan:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Weighted interval scheduling: NumPy solver (evals.wis) vs the per-item bisect DP
+it replaced, from 10 to 100k intervals, plus batched vs one-call-per-catalog.
+
+    python -m events_env.benchmarks.bench_wis [--min-gap N] [--repeat N]
+"""
+import argparse
+import time
+from bisect import bisect_right
+import numpy as np
+from ..evals.wis import solve, solve_batch
+
+def random_catalog(n: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    s = rng.integers(0, 1440 - 15, size=n)
+    e = np.minimum(1440, s + rng.integers(15, 180, size=n))
+    w = (e - s) * np.where(rng.random(n) < 0.2, 2.0, 1.0)
+    return s, e, w
+
+def _reference_solve(s, e, w, min_gap: int) -> float:
+    items = sorted(zip(s.tolist(), e.tolist(), w.tolist()), key=lambda x: x[1])
+    ends = [it[1] + min_gap for it in items]
+    M = [0.0] * (len(items) + 1)
+    for j, (sj, _, wj) in enumerate(items):
+        p = bisect_right(ends, sj, 0, j)
+        M[j+1] = max(M[j], wj + M[p])
+    return M[-1]
+
+def _best_ms(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1e3
+
+def main(argv=None) -> None:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--min-gap", type=int, default=0)
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args(argv)
+    gap = args.min_gap
+
+    print(f"{'intervals':>9} {'reference_ms':>12} {'numpy_ms':>9} {'speedup':>8}")
+    for n in (10, 100, 1_000, 10_000, 100_000):
+        s, e, w = random_catalog(n, seed=n)
+        assert _reference_solve(s, e, w, gap) == solve(s, e, w, min_gap=gap)[0]
+        ref = _best_ms(lambda: _reference_solve(s, e, w, gap), args.repeat)
+        new = _best_ms(lambda: solve(s, e, w, min_gap=gap), args.repeat)
+        print(f"{n:>9} {ref:>12.2f} {new:>9.2f} {ref / new:>7.1f}x")
+
+    print()
+    print(f"{'catalogs':>9} {'size':>5} {'loop_ms':>9} {'batch_ms':>9} {'speedup':>8}")
+    for k, n in ((100, 20), (1_000, 20), (1_000, 200)):
+        cats = [random_catalog(n, seed=i) for i in range(k)]
+        loop = np.array([solve(*c, min_gap=gap)[0] for c in cats])
+        assert np.array_equal(loop, solve_batch(cats, min_gap=gap))
+        t_loop = _best_ms(lambda: [solve(*c, min_gap=gap) for c in cats], args.repeat)
+        t_batch = _best_ms(lambda: solve_batch(cats, min_gap=gap), args.repeat)
+        print(f"{k:>9} {n:>5} {t_loop:>9.2f} {t_batch:>9.2f} {t_loop / t_batch:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""
+Benchmark suite for the reward hot paths: parsing, conflict checking, scoring,
+the DP optimum and the multi-turn validator, on seeded synthetic data.
+
+    python -m events_env.benchmarks.suite --out bench.json
+    python -m events_env.benchmarks.suite --baseline bench.json [--threshold 0.15]
+    python -m events_env.benchmarks.suite --quick --filter wis
+
+Results are JSON (one record per case, per-call times in microseconds). With
+`--baseline`, cases whose median got slower by more than `--threshold` are
+flagged and the exit status is 1.
+"""
+import argparse
+import asyncio
+import json
+import platform
+import statistics
+import sys
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from .synthetic import make_catalog, make_proposal, render_completion
+
+SCHEMA_VERSION = 1
+EVENT_SIZES = (5, 50, 500, 10_000)
+QUICK_EVENT_SIZES = (5, 500)
+THINK_SIZES = (0, 1_000, 10_000, 30_000)
+QUICK_THINK_SIZES = (0, 30_000)
+PROPOSAL_SIZE = 25  # entries per proposed schedule, whatever the catalog size
+
+Case = Tuple[str, Dict[str, Any], Callable[[], Any]]
+
+def _cases(quick: bool) -> Iterator[Case]:
+    from ..core.config import EventRubricConfig, PenaltiesMinutes, RealismConfig
+    from ..core.env_multiturn import EventSchedulingMultiTurnEnv
+    from ..evals.conflict_checker import check_conflicts
+    from ..evals.rubric import EventSchedulingRubric
+    from ..evals.scoring import score_with_penalties, wis_optimum
+    from ..io.parsing import parse_schedule_any
+
+    event_sizes = QUICK_EVENT_SIZES if quick else EVENT_SIZES
+    think_sizes = QUICK_THINK_SIZES if quick else THINK_SIZES
+
+    events, _ = make_catalog(12, seed=1)
+    proposal = make_proposal(events, 12, seed=1)
+    for fmt in ("json", "xml"):
+        for chars in think_sizes:
+            text = render_completion(proposal, think_chars=chars, fmt=fmt)
+            yield (f"parse/{fmt}/think={chars}", {"fmt": fmt, "think_chars": chars},
+                   lambda t=text: parse_schedule_any(t, allow_reasoning_tag=True))
+
+    pen, realism = PenaltiesMinutes(), RealismConfig(min_gap_minutes=5)
+    for n in event_sizes:
+        events, prio = make_catalog(n, seed=n)
+        proposal = make_proposal(events, PROPOSAL_SIZE, seed=n)
+        yield (f"check_conflicts/events={n}", {"events": n},
+               lambda e=events, p=proposal: check_conflicts(p, e, strict_times=True, min_gap_minutes=5))
+        yield (f"score_with_penalties/events={n}", {"events": n},
+               lambda e=events, pr=prio, p=proposal: score_with_penalties(
+                   p, e, pr, strict_times=True, penalties=pen, realism=realism))
+        yield (f"wis_optimum/events={n}", {"events": n},
+               lambda e=events, pr=prio: wis_optimum(e, pr, realism))
+
+    # env_response needs a (tiny) dataset; the catalog travels in `answer`
+    from datasets import Dataset
+    rubric = EventSchedulingRubric(EventRubricConfig(normalize_with_optimal="dp"))
+    ds = Dataset.from_list([{"prompt": [{"role": "user", "content": "x"}], "answer": "{}"}])
+    env = EventSchedulingMultiTurnEnv(dataset=ds, rubric=rubric, max_turns=3)
+    loop = asyncio.new_event_loop()
+    for n in event_sizes:
+        events, prio = make_catalog(n, seed=n)
+        answer = json.dumps({"events": events, "priority_events": prio, "optimal_score": None})
+        for chars in (0, think_sizes[-1]):
+            text = render_completion(make_proposal(events, PROPOSAL_SIZE, seed=n), think_chars=chars)
+            msgs = [{"role": "assistant", "content": text}]
+            yield (f"env_response/events={n}/think={chars}", {"events": n, "think_chars": chars},
+                   lambda m=msgs, a=answer: loop.run_until_complete(env.env_response(m, {"answer": a}, answer=a)))
+
+def measure(fn: Callable[[], Any], *, repeat: int = 5, min_time: float = 0.05) -> Dict[str, Any]:
+    """Per-call microseconds: loops per repeat chosen like timeit.autorange."""
+    fn()  # warm caches and lazy imports
+    loops = 1
+    while True:
+        t0 = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        if time.perf_counter() - t0 >= min_time or loops >= 1 << 20:
+            break
+        loops *= 2
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        samples.append((time.perf_counter() - t0) / loops * 1e6)
+    return {"loops": loops, "best_us": min(samples), "median_us": statistics.median(samples)}
+
+def run(*, quick: bool = False, filter: Optional[str] = None, repeat: int = 5, min_time: float = 0.05) -> Dict[str, Any]:
+    results: List[Dict[str, Any]] = []
+    for case_id, params, fn in _cases(quick):
+        if filter and filter not in case_id:
+            continue
+        rec = {"id": case_id, "group": case_id.split("/", 1)[0], "params": params}
+        rec.update(measure(fn, repeat=repeat, min_time=min_time))
+        results.append(rec)
+        print(f"{case_id:<40} {rec['median_us']:>12.1f} us", file=sys.stderr)
+    return {
+        "schema": SCHEMA_VERSION,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "quick": quick,
+        "results": results,
+    }
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float = 0.15) -> List[Dict[str, Any]]:
+    """Per shared case: baseline/current medians, their ratio and whether it regressed."""
+    base = {r["id"]: r for r in baseline.get("results", [])}
+    rows = []
+    for r in current.get("results", []):
+        b = base.get(r["id"])
+        if b is None:
+            continue
+        ratio = r["median_us"] / max(b["median_us"], 1e-9)
+        rows.append({
+            "id": r["id"],
+            "baseline_us": b["median_us"],
+            "current_us": r["median_us"],
+            "ratio": ratio,
+            "regressed": ratio > 1.0 + threshold,
+        })
+    return rows
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--out", help="write results JSON here (default: stdout)")
+    ap.add_argument("--baseline", help="saved results JSON to compare against")
+    ap.add_argument("--threshold", type=float, default=0.15, help="allowed slowdown before flagging, as a fraction")
+    ap.add_argument("--filter", help="only cases whose id contains this substring")
+    ap.add_argument("--quick", action="store_true", help="smaller size grid")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--min-time", type=float, default=0.05, help="seconds per repeat")
+    args = ap.parse_args(argv)
+
+    report = run(quick=args.quick, filter=args.filter, repeat=args.repeat, min_time=args.min_time)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    elif not args.baseline:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    if not args.baseline:
+        return 0
+
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        rows = compare(report, json.load(f), args.threshold)
+    print(f"{'case':<40} {'baseline_us':>12} {'current_us':>12} {'ratio':>6}")
+    for r in rows:
+        flag = "  REGRESSION" if r["regressed"] else ""
+        print(f"{r['id']:<40} {r['baseline_us']:>12.1f} {r['current_us']:>12.1f} {r['ratio']:>6.2f}{flag}")
+    return 1 if any(r["regressed"] for r in rows) else 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,35 @@
+"""
+Seeded catalogs (via io.synthetic) and completions for the benchmarks.
+Same seed, same data, so timings are comparable across runs and machines.
+"""
+import json
+import random
+from typing import List, Tuple
+from ..io.synthetic import SyntheticConfig, generate_example
+
+def make_catalog(n_events: int, seed: int = 0, *, priority_fraction: float = 0.2, **kwargs) -> Tuple[List[List[str]], List[str]]:
+    """(events, priority_events) from io.synthetic; extra kwargs go to SyntheticConfig."""
+    ex = generate_example(SyntheticConfig(num_events=n_events, priority_ratio=priority_fraction, seed=seed, **kwargs), 0)
+    return ex["events"], ex["priority_events"]
+
+def make_proposal(events: List[List[str]], n_chosen: int, seed: int = 0, *, hallucinated: int = 1) -> List[dict]:
+    """Random picks from the catalog (so some overlap) plus a few invented names."""
+    rng = random.Random(seed)
+    picks = rng.sample(events, min(n_chosen, len(events)))
+    picks.sort(key=lambda e: e[1])
+    out = [{"name": n, "start": s, "end": e} for n, s, e in picks]
+    out += [{"name": f"Invented {j}", "start": "12:00", "end": "13:00"} for j in range(hallucinated)]
+    return out
+
+def render_completion(proposal: List[dict], *, think_chars: int = 0, fmt: str = "json") -> str:
+    """A model-style completion: optional <think> trace, short prose, fenced payload."""
+    if fmt == "json":
+        payload = json.dumps({"schedule": proposal})
+    else:
+        payload = "<schedule>" + "".join(
+            f"<event><name>{e['name']}</name><start>{e['start']}</start><end>{e['end']}</end></event>" for e in proposal
+        ) + "</schedule>"
+    filler = "Considering overlaps between sessions and weighing priorities... "
+    think = (filler * (think_chars // len(filler) + 1))[:think_chars]
+    head = f"<think>{think}</think>\n" if think_chars else ""
+    return f"{head}Final answer:\n```{fmt}\n{payload}\n```\n"
@@ -0,0 +1,183 @@
+"""
+Async model client plumbing for rollouts.
+
+- `pooled_client`: one AsyncOpenAI per (base_url, api_key, pool size), sharing a
+  size-limited connection pool across envs and rollouts. SDK retries are off;
+  `RetryPolicy` handles them instead.
+- `RetryPolicy`: retries 429, 5xx, connection errors and timeouts with
+  exponential backoff and jitter, honouring `Retry-After`.
+- `ChoiceBatcher`: concurrent requests for the same prompt, model and sampling
+  args within a short window are sent as one call with `n` choices. Each caller
+  gets a response holding its own single choice.
+"""
+import asyncio
+import copy
+import json
+import random
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+from ..utils.metrics import METRICS
+
+_CLIENTS: Dict[tuple, Any] = {}
+
+def _limits(max_connections: int, max_keepalive: Optional[int]):
+    try:
+        import httpx
+    except ImportError:  # recent openai releases depend on httpx2 instead
+        import httpx2 as httpx
+    return httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_keepalive or max_connections)
+
+def pooled_client(
+    base_url: Optional[str] = None,
+    api_key: Optional[str] = None,
+    *,
+    max_connections: int = 64,
+    max_keepalive: Optional[int] = None,
+    timeout: float = 600.0,
+):
+    """Shared AsyncOpenAI for these settings; at most `max_connections` open sockets."""
+    from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+
+    key = (base_url, api_key, max_connections, max_keepalive, timeout)
+    client = _CLIENTS.get(key)
+    if client is None:
+        client = _CLIENTS[key] = AsyncOpenAI(
+            base_url=base_url,
+            api_key=api_key,
+            timeout=timeout,
+            max_retries=0,
+            http_client=DefaultAsyncHttpxClient(limits=_limits(max_connections, max_keepalive), timeout=timeout),
+        )
+    return client
+
+def _status(exc: BaseException) -> Optional[int]:
+    code = getattr(exc, "status_code", None)
+    return code if isinstance(code, int) else None
+
+def _retry_after(exc: BaseException) -> Optional[float]:
+    headers = getattr(getattr(exc, "response", None), "headers", None)
+    if not headers:
+        return None
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+@dataclass(slots=True)
+class RetryPolicy:
+    max_attempts: int = 5
+    base_delay: float = 0.5       # seconds, doubled per attempt
+    max_delay: float = 20.0
+    jitter: float = 0.25          # +- fraction of the delay
+
+    def retryable(self, exc: BaseException) -> bool:
+        code = _status(exc)
+        if code is not None:
+            return code == 429 or code >= 500
+        try:
+            from openai import APIConnectionError, APITimeoutError
+        except ImportError:
+            return False
+        return isinstance(exc, (APIConnectionError, APITimeoutError))
+
+    def delay(self, attempt: int, exc: Optional[BaseException] = None) -> float:
+        hinted = _retry_after(exc) if exc is not None else None
+        if hinted is not None:
+            return min(self.max_delay, hinted)
+        d = min(self.max_delay, self.base_delay * (2 ** attempt))
+        return d * (1 + random.uniform(-self.jitter, self.jitter))
+
+    async def call(self, fn: Callable[[], Awaitable[Any]]) -> Any:
+        for attempt in range(self.max_attempts):
+            try:
+                return await fn()
+            except Exception as exc:
+                if attempt + 1 >= self.max_attempts or not self.retryable(exc):
+                    raise
+                METRICS.incr("model_retries_total", status=_status(exc) or "conn")
+                await asyncio.sleep(self.delay(attempt, exc))
+
+def _single(response: Any, choice: Any) -> Any:
+    """`response` narrowed to one choice, re-indexed to 0."""
+    if hasattr(response, "model_copy"):
+        return response.model_copy(update={"choices": [choice.model_copy(update={"index": 0})]})
+    out = copy.copy(response)
+    out.choices = [choice]
+    return out
+
+class _Pending:
+    __slots__ = ("request", "waiters", "timer")
+
+    def __init__(self, request: Tuple[Any, str, Any, Dict[str, Any]]):
+        self.request = request  # (client, model, messages, sampling args)
+        self.waiters: List[asyncio.Future] = []
+        self.timer: Optional[asyncio.TimerHandle] = None
+
+class ChoiceBatcher:
+    """
+    Coalesces identical chat requests into n-choice calls (up to `max_n`).
+    A batch is sent when it is full or `window` seconds after its first request.
+    If the server returns fewer choices than asked, the rest is re-requested.
+    """
+    def __init__(self, max_n: int = 16, window: float = 0.005, retry: Optional[RetryPolicy] = None):
+        if max_n < 1:
+            raise ValueError("max_n must be >= 1")
+        self.max_n = max_n
+        self.window = window
+        self.retry = retry or RetryPolicy()
+        self.calls = 0      # requests sent to the server
+        self.choices = 0    # choices handed out
+        self._pending: Dict[tuple, _Pending] = {}
+        self._sending: Set[asyncio.Task] = set()
+
+    async def create(self, client: Any, model: str, messages: List[Dict[str, Any]], **sampling_args: Any) -> Any:
+        """Chat completion with one choice, possibly sampled as part of a larger n."""
+        if sampling_args.get("n", 1) != 1 or sampling_args.get("stream"):
+            self.calls += 1
+            return await self.retry.call(lambda: client.chat.completions.create(model=model, messages=messages, **sampling_args))
+        sampling_args.pop("n", None)
+        key = (id(client), model, json.dumps(messages, sort_keys=True, default=str),
+               json.dumps(sampling_args, sort_keys=True, default=str))
+        loop = asyncio.get_running_loop()
+        p = self._pending.get(key)
+        if p is None:
+            p = self._pending[key] = _Pending((client, model, messages, sampling_args))
+            p.timer = loop.call_later(self.window, self._flush, key)
+        fut = loop.create_future()
+        p.waiters.append(fut)
+        if len(p.waiters) >= self.max_n:
+            p.timer.cancel()
+            self._flush(key)
+        return await fut
+
+    def _flush(self, key: tuple) -> None:
+        p = self._pending.pop(key, None)
+        if p is not None:
+            task = asyncio.ensure_future(self._send(p))
+            self._sending.add(task)
+            task.add_done_callback(self._sending.discard)
+
+    async def _send(self, p: _Pending) -> None:
+        client, model, messages, args = p.request
+        waiters = [f for f in p.waiters if not f.done()]
+        try:
+            while waiters:
+                n = len(waiters)
+                self.calls += 1
+                extra = {"n": n} if n > 1 else {}
+                response = await self.retry.call(
+                    lambda: client.chat.completions.create(model=model, messages=messages, **args, **extra)
+                )
+                choices = list(response.choices)[:n]
+                if not choices:
+                    raise RuntimeError("model response has no choices")
+                METRICS.observe("choices_per_call", len(choices), buckets=(1, 2, 4, 8, 16, 32, 64))
+                for fut, choice in zip(waiters, choices):
+                    if not fut.done():
+                        fut.set_result(_single(response, choice))
+                        self.choices += 1
+                waiters = [f for f in waiters[len(choices):] if not f.done()]
+        except Exception as exc:
+            for fut in waiters:
+                if not fut.done():
+                    fut.set_exception(exc)
@@ -0,0 +1,63 @@
+"""
+History compaction for multi-turn prompts.
+
+A multi-turn rollout looks like
+    [system, user(catalog)] + [assistant, feedback] * k + [assistant?]
+Compaction keeps the leading prompt messages (system prompt and catalog, so the
+prefix stays cacheable), the latest proposal and the current feedback, and folds
+every earlier proposal/feedback pair into a one-line-per-turn digest that is
+prepended to the current feedback message (keeping roles alternating).
+"""
+from typing import Any, Dict, List, Tuple
+from ..io.parsing import parse_schedule_any
+
+Message = Dict[str, Any]
+
+def approx_tokens(messages: List[Message]) -> int:
+    """Rough prompt size (~4 characters per token plus per-message framing); no tokenizer needed."""
+    return sum(4 + (len(str(m.get("content") or "")) + 3) // 4 for m in messages)
+
+def _split(messages: List[Message]) -> Tuple[List[Message], List[Message]]:
+    """(leading prompt messages, conversation from the first assistant turn on)."""
+    for i, m in enumerate(messages):
+        if m.get("role") == "assistant":
+            return messages[:i], messages[i:]
+    return messages, []
+
+def _feedback_gist(text: str) -> str:
+    """Validator bullets without their name lists, e.g. "2 overlap(s) detected; 1 duplicate(s)"."""
+    bullets = [ln[2:].split(":", 1)[0].strip() for ln in text.splitlines() if ln.startswith("- ")]
+    if bullets:
+        return "; ".join(bullets)
+    if "not a valid" in text:
+        return "unparseable output"
+    first = text.strip().splitlines()[:1]
+    return first[0][:80] if first else "no feedback"
+
+def digest_turns(turns: List[Message], allow_reasoning_tag: bool = True, output_format: str = "full") -> str:
+    """One line per earlier (proposal, feedback) pair."""
+    lines = []
+    for k, j in enumerate(range(0, len(turns) - 1, 2), 1):
+        proposal, feedback = turns[j], turns[j + 1]
+        sched = parse_schedule_any(str(proposal.get("content") or ""), allow_reasoning_tag=allow_reasoning_tag,
+                                   output_format=output_format)
+        what = f"{len(sched)} event(s)" if sched is not None else "no valid schedule"
+        lines.append(f"- attempt {k}: {what}; feedback: {_feedback_gist(str(feedback.get('content') or ''))}")
+    return "Earlier attempts (details omitted):\n" + "\n".join(lines)
+
+def compact_messages(messages: List[Message], *, allow_reasoning_tag: bool = True, output_format: str = "full") -> List[Message]:
+    """
+    Compacted copy of `messages`; unchanged while there is only one proposal or
+    no feedback follows the latest one. The input messages are not modified.
+    """
+    head, conv = _split(messages)
+    # keep the latest assistant message and whatever follows it (the current feedback)
+    last = max((i for i, m in enumerate(conv) if m.get("role") == "assistant"), default=-1)
+    if last < 2:
+        return list(messages)
+    earlier, tail = conv[:last], conv[last:]
+    if len(tail) < 2:
+        return list(messages)  # no current feedback to carry the digest
+    fb = dict(tail[-1])
+    fb["content"] = f"{digest_turns(earlier, allow_reasoning_tag, output_format)}\n\n{fb.get('content') or ''}"
+    return head + tail[:-1] + [fb]
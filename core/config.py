@@ -10,6 +10,7 @@ class PenaltiesMinutes:
     overlap: float = 20.0                # applied per overlap
     out_of_bounds: float = 10.0          # per offending event
     min_gap_violation: float = 10.0      # per violation
+    malformed_time: float = 10.0         # per event with an unparseable start/end
 
 @dataclass(slots=True)
 class RealismConfig:
@@ -18,8 +19,9 @@ class RealismConfig:
     day_end: str = "24:00"
     allow_cross_midnight: bool = False
     min_gap_minutes: int = 0             # 0 = no check
-    # Hooks for future realism
-    enforce_venue_exclusive: bool = False  # requires dataset locations/venues
+    # Conflicts (and min-gap) only between events sharing a venue, up to its capacity
+    # in parallel; venues come from a 4th catalog column (see evals.venues)
+    enforce_venue_exclusive: bool = False
 
 @dataclass(slots=True)
 class EventRubricConfig:
@@ -29,9 +31,14 @@ class EventRubricConfig:
     allow_reasoning_tag: bool = True
     penalties: PenaltiesMinutes = field(default_factory=PenaltiesMinutes)
     realism: RealismConfig = field(default_factory=RealismConfig)
+    # "indexed" also accepts {"schedule":[ids]} answers (see io.encoding); "full" rejects them
+    output_format: Literal["full", "indexed"] = "full"
 
 @dataclass(slots=True)
 class MultiTurnConfig:
     max_turns: int = 3
     feedback_role: Literal["system", "user"] = "user"
     stop_early_on_clean: bool = True
+    compact_history: bool = False        # send earlier turns as a digest (see core.compaction)
+    compact_state: bool = False          # ResponseRecords instead of full responses (see core.records)
+    spill_path: Optional[str] = None     # with compact_state: append full responses here
@@ -0,0 +1,208 @@
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from verifiers.utils.async_utils import maybe_await
+
+def _percentile(sorted_vals: List[float], q: float) -> float:
+    if not sorted_vals:
+        return 0.0
+    k = min(len(sorted_vals) - 1, max(0, int(round(q * (len(sorted_vals) - 1)))))
+    return sorted_vals[k]
+
+@dataclass(slots=True)
+class DriverStats:
+    rollouts: int = 0
+    turns: int = 0
+    wall_seconds: float = 0.0
+    queue_waits: List[float] = field(default_factory=list)     # seconds a turn waited for a slot
+    model_seconds: List[float] = field(default_factory=list)   # per model call
+    max_in_flight_seen: int = 0
+
+    def summary(self) -> Dict[str, float]:
+        waits = sorted(self.queue_waits)
+        wall = max(self.wall_seconds, 1e-9)
+        return {
+            "rollouts": self.rollouts,
+            "turns": self.turns,
+            "wall_seconds": self.wall_seconds,
+            "rollouts_per_s": self.rollouts / wall,
+            "turns_per_s": self.turns / wall,
+            "queue_wait_mean": (sum(waits) / len(waits)) if waits else 0.0,
+            "queue_wait_p50": _percentile(waits, 0.50),
+            "queue_wait_p95": _percentile(waits, 0.95),
+            "queue_wait_max": waits[-1] if waits else 0.0,
+            "model_seconds_mean": (sum(self.model_seconds) / len(self.model_seconds)) if self.model_seconds else 0.0,
+            "max_in_flight_seen": self.max_in_flight_seen,
+        }
+
+class _Reservation:
+    """A first-turn slot taken for one sibling by its group; handed back exactly once."""
+    __slots__ = ("ready", "held", "done")
+
+    def __init__(self):
+        self.ready = asyncio.Event()  # set once the group holds the slot for this sibling
+        self.held = False             # slot taken and not yet used by a model call
+        self.done = False             # the sibling has finished (or failed)
+
+class MultiTurnRolloutDriver:
+    """
+    Asyncio driver for EventSchedulingMultiTurnEnv rollouts with explicit control
+    over concurrency. Follows the same turn loop as `MultiTurnEnv.rollout`, but:
+
+    - at most `max_in_flight` model calls are outstanding; each turn queues for a
+      slot (backpressure when the server saturates) and the wait is recorded;
+    - `env_response` validation runs outside the slot, interleaving with pending calls;
+    - at most `max_active_rollouts` rollouts are alive at once (bounds state memory);
+    - with `group_siblings`, the repetitions of one prompt acquire their first-turn
+      slots together so identical prefixes reach the server in one burst.
+    """
+    def __init__(
+        self,
+        env: Any,
+        client: Any,
+        model: str,
+        *,
+        max_in_flight: int = 32,
+        max_active_rollouts: Optional[int] = None,
+        group_siblings: bool = True,
+        sampling_args: Optional[Dict[str, Any]] = None,
+    ):
+        if max_in_flight <= 0:
+            raise ValueError("max_in_flight must be positive")
+        self.env = env
+        self.client = client
+        self.model = model
+        self.max_in_flight = max_in_flight
+        self.max_active_rollouts = max_active_rollouts or 4 * max_in_flight
+        self.group_siblings = group_siblings
+        self.sampling_args = sampling_args or {}
+        self.stats = DriverStats()
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._group_gate: Optional[asyncio.Lock] = None
+        self._in_flight = 0
+
+    async def _call_model(self, rollout: List[Dict[str, Any]], info: Dict[str, Any], *, slot_held: bool = False):
+        if not slot_held:
+            t_q = time.perf_counter()
+            await self._slots.acquire()
+            self.stats.queue_waits.append(time.perf_counter() - t_q)
+        self._in_flight += 1
+        self.stats.max_in_flight_seen = max(self.stats.max_in_flight_seen, self._in_flight)
+        t0 = time.perf_counter()
+        try:
+            return await self.env.get_model_response(
+                client=self.client,
+                model=self.model,
+                prompt=rollout,
+                oai_tools=info.get("oai_tools", None),
+                sampling_args=dict(self.sampling_args),
+                message_type="chat",
+            )
+        finally:
+            self.stats.model_seconds.append(time.perf_counter() - t0)
+            self._in_flight -= 1
+            self._slots.release()
+
+    async def _rollout(
+        self,
+        prompt: List[Dict[str, Any]],
+        answer: str,
+        info: Dict[str, Any],
+        first_slot: Optional[_Reservation] = None,
+    ) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        env = self.env
+        try:
+            state: Dict[str, Any] = {
+                "prompt": prompt, "completion": [], "answer": answer, "task": "default",
+                "info": info, "responses": [], "turn": 0,
+            }
+            state = await maybe_await(env.setup_state, state)
+            rollout = list(prompt)
+            completion: List[Dict[str, Any]] = []
+            max_turns = int(getattr(env, "max_turns", -1))
+            while not await maybe_await(env.is_completed, rollout, state):
+                held = first_slot is not None
+                if held:
+                    await first_slot.ready.wait()
+                    first_slot.held, first_slot = False, None  # _call_model releases it
+                response = await self._call_model(rollout, info, slot_held=held)
+                state["responses"].append(response)
+                msg = {"role": "assistant", "content": response.choices[0].message.content or ""}
+                rollout.append(msg)
+                completion.append(msg)
+                state["turn"] += 1
+                self.stats.turns += 1
+                if await maybe_await(env.is_completed, rollout, state) or (0 < max_turns <= state["turn"]):
+                    break
+                env_msgs, state = await maybe_await(env.env_response, rollout, state, answer=answer)
+                rollout += env_msgs
+                completion += env_msgs
+        finally:
+            if first_slot is not None:
+                # finished or failed before its first call: hand back the reserved slot,
+                # or let the group skip it if it has not been taken yet
+                first_slot.done = True
+                if first_slot.held:
+                    first_slot.held = False
+                    self._slots.release()
+        self.stats.rollouts += 1
+        slim = getattr(env, "slim_state", None)
+        return completion, (slim(state) if slim is not None else state)
+
+    async def _run_group(self, prompt, answer, info, repeats: int, active: asyncio.Semaphore):
+        async with active:
+            if not self.group_siblings or repeats == 1:
+                return list(await asyncio.gather(*(self._rollout(prompt, answer, info) for _ in range(repeats))))
+            results: List[Tuple[Any, Any]] = []
+            for lo in range(0, repeats, self.max_in_flight):
+                n = min(self.max_in_flight, repeats - lo)
+                reservations = [_Reservation() for _ in range(n)]
+                tasks = [asyncio.ensure_future(self._rollout(prompt, answer, info, r)) for r in reservations]
+                # take the siblings' slots as one block so their shared prefix arrives together
+                t_q = time.perf_counter()
+                taken = 0
+                try:
+                    async with self._group_gate:
+                        for _ in range(n):
+                            await self._slots.acquire()
+                            taken += 1
+                except BaseException:
+                    for _ in range(taken):
+                        self._slots.release()
+                    for t in tasks:
+                        t.cancel()
+                    raise
+                wait = time.perf_counter() - t_q
+                self.stats.queue_waits.extend([wait] * n)
+                for r in reservations:
+                    if r.done:  # failed before its slot arrived
+                        self._slots.release()
+                    else:
+                        r.held = True
+                        r.ready.set()
+                results.extend(await asyncio.gather(*tasks))
+            return results
+
+    async def run(
+        self,
+        prompts: Sequence[List[Dict[str, Any]]],
+        answers: Sequence[str],
+        infos: Optional[Sequence[Dict[str, Any]]] = None,
+        repeats: int = 1,
+    ) -> List[Tuple[List[Dict[str, Any]], Dict[str, Any]]]:
+        """
+        Run `repeats` rollouts per prompt. Returns (completion, state) pairs ordered
+        prompt-major, repetitions adjacent, as verifiers lays out repeated inputs.
+        """
+        self.stats = DriverStats()
+        self._slots = asyncio.Semaphore(self.max_in_flight)
+        self._group_gate = asyncio.Lock()
+        active = asyncio.Semaphore(max(1, self.max_active_rollouts // max(1, repeats)))
+        infos = infos or [{} for _ in prompts]
+        t0 = time.perf_counter()
+        groups = await asyncio.gather(*(
+            self._run_group(p, a, i or {}, repeats, active) for p, a, i in zip(prompts, answers, infos)
+        ))
+        self.stats.wall_seconds = time.perf_counter() - t0
+        return [r for g in groups for r in g]
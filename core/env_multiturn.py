@@ -1,7 +1,15 @@
-from typing import List, Dict, Any, Union, Literal, Tuple
-from verifiers.envs.multiturn import MultiTurnEnv
+from typing import List, Dict, Any, Optional, Union, Literal, Tuple
+from verifiers import MultiTurnEnv
 from ..io.parsing import parse_schedule_any
-from ..evals.conflict_checker import check_conflicts
+from ..io.schedule import Schedule
+from ..io.store import ResultStore, record_rewards, run_indexed, run_or_resume
+from ..evals.engine import engine_key, record_penalties, stash_evaluation, stashed_evaluation
+from ..evals.incremental import ValidatedSchedule
+from ..evals.problem import get_problem
+from ..utils.metrics import COUNT_BUCKETS, METRICS
+from .compaction import approx_tokens, compact_messages
+from .config import EventRubricConfig
+from .records import SpillFile, slim_responses
 
 SYSTEM = (
     "You are a scheduling assistant. Given an events list and priority names, "
@@ -19,61 +27,169 @@ class EventSchedulingMultiTurnEnv(MultiTurnEnv):
         max_turns: int = 3,
         feedback_role: Literal["system","user"] = "user",
         stop_early_on_clean: bool = True,
+        compact_history: bool = False,
+        compact_state: bool = False,
+        spill_path: Optional[str] = None,
+        store: Optional[ResultStore] = None,
         **kwargs: Any,
     ):
         super().__init__(max_turns=max_turns, **kwargs)
         self.feedback_role = feedback_role
         self.stop_early_on_clean = stop_early_on_clean
+        self.compact_history = compact_history
+        # responses become ResponseRecords (full objects optionally spilled to disk)
+        # and state is updated in place instead of copied each turn
+        self.compact_state = compact_state
+        self.spill = SpillFile(spill_path) if (compact_state and spill_path) else None
+        # finished rollouts are recorded here and replayed on restart (see io.store)
+        self.store = store
+
+    def slim_state(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """Replace full response objects in `state["responses"]` by ResponseRecords."""
+        if self.compact_state and state.get("responses"):
+            state["responses"] = slim_responses(state["responses"], self.spill)
+        return state
+
+    def _compact(self, messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        cfg = getattr(getattr(self, "rubric", None), "cfg", None) or EventRubricConfig()
+        return compact_messages(messages, allow_reasoning_tag=cfg.allow_reasoning_tag, output_format=cfg.output_format)
+
+    async def rollout(
+        self,
+        client: Any,
+        model: str,
+        prompt: Any,
+        answer: str = "",
+        task: str = "default",
+        info: Optional[Dict[str, Any]] = None,
+        sampling_args: Optional[Dict[str, Any]] = None,
+        **kwargs: Any,
+    ):
+        rep = kwargs.pop("rollout_index", None)
+        run = lambda: self._rollout(client, model, prompt, answer, task, info, sampling_args, **kwargs)
+        if self.store is None:
+            return await run()
+        return await run_or_resume(self.store, run, prompt=prompt, answer=answer, model=model,
+                                   sampling_args=sampling_args, rep=rep)
+
+    async def run_rollouts(self, client, model, prompts, answers, tasks, infos, sampling_args=None,
+                           max_concurrent: int = -1, rollout_offset: int = 0, **kwargs: Any):
+        if self.store is None:
+            return await super().run_rollouts(client, model, prompts, answers, tasks, infos, sampling_args,
+                                              max_concurrent, **kwargs)
+        rollout = lambda p, a, t, i, **kw: self.rollout(client, model, p, a, t, i, sampling_args, **kwargs, **kw)
+        return await run_indexed(rollout, prompts, answers, tasks, infos, offset=rollout_offset,
+                                 max_concurrent=max_concurrent)
+
+    async def a_generate(self, *args: Any, **kwargs: Any):
+        results = await super().a_generate(*args, **kwargs)
+        if self.store is not None and results.reward:
+            record_rewards(self.store, results.state, results.reward)
+        return results
+
+    async def _rollout(self, client: Any, model: str, prompt: Any, answer: str, *args: Any, **kwargs: Any):
+        if not METRICS.enabled:
+            completion, state = await super().rollout(client, model, prompt, answer, *args, **kwargs)
+            return completion, self.slim_state(state)
+        with METRICS.timer("rollout_seconds", env="multiturn"):
+            completion, state = await super().rollout(client, model, prompt, answer, *args, **kwargs)
+        self.slim_state(state)
+        turns = sum(1 for m in completion if isinstance(m, dict) and m.get("role") == "assistant")
+        METRICS.observe("turns_used", turns, buckets=COUNT_BUCKETS)
+        return completion, state
+
+    async def get_model_response(self, *args: Any, **kwargs: Any):
+        # Compaction only changes what is sent; the rollout keeps the full history.
+        if self.compact_history and isinstance(kwargs.get("prompt"), list):
+            kwargs["prompt"] = self._compact(kwargs["prompt"])
+        with METRICS.timer("model_seconds", env="multiturn"):
+            return await super().get_model_response(*args, **kwargs)
 
     async def env_response(self, messages: List[Dict[str,str]], state: Dict[str,Any], **kwargs: Any):
+        with METRICS.timer("env_response_seconds"):
+            env_msgs, state = self._respond(messages, state, **kwargs)
+        self.slim_state(state)
+        if self.compact_history:
+            self._record_savings(list(messages) + env_msgs, state)
+        return env_msgs, state
+
+    def _record_savings(self, next_prompt: List[Dict[str, Any]], state: Dict[str, Any]) -> None:
+        """Approximate prompt tokens of the next turn, full vs compacted, appended per turn."""
+        full = approx_tokens(next_prompt)
+        compact = approx_tokens(self._compact(next_prompt))
+        for k, v in (("prompt_tokens_full", full), ("prompt_tokens_compact", compact), ("prompt_tokens_saved", full - compact)):
+            state[k] = list(state.get(k, ())) + [v]
+        METRICS.incr("prompt_tokens_saved_total", full - compact)
+
+    def _respond(self, messages: List[Dict[str,str]], state: Dict[str,Any], **kwargs: Any):
         # Extract last assistant output
         last_text = ""
         if messages and messages[-1].get("role") == "assistant":
             last_text = messages[-1].get("content", "")
 
         # Track turn
-        state = dict(state or {})
+        state = state if (self.compact_state and state is not None) else dict(state or {})
         state["turn"] = int(state.get("turn", 0)) + 1
 
+        # Validate with the rubric's settings so the result can be reused for the reward
+        rubric = getattr(self, "rubric", None)
+        cfg = getattr(rubric, "cfg", None) or EventRubricConfig()
+
         # Attempt to parse schedule
-        schedule = parse_schedule_any(last_text, allow_reasoning_tag=True)
+        schedule = parse_schedule_any(last_text, allow_reasoning_tag=cfg.allow_reasoning_tag,
+                                      output_format=cfg.output_format)
         if schedule is None:
             feedback = (
                 "Your output was not a valid JSON or XML schedule. "
                 "Please output only one of the required formats. "
                 "Do not include explanations."
             )
+            METRICS.incr("feedback_total", result="unparseable")
             return [{"role": self.feedback_role, "content": feedback}], state
 
-        # Build validator feedback with rubric settings
-        import json
-        answer = kwargs.get("answer", None)
+        # One fused pass yields both the feedback report and the penalized minutes;
+        # the compiled catalog is shared with the rubric through the problem cache.
+        answer = kwargs.get("answer", state.get("answer"))
         try:
-            info_obj = json.loads(answer) if isinstance(answer, str) else (answer or {})
+            problem = get_problem(answer or {}, getattr(rubric, "problem_cache", None))
         except Exception:
-            info_obj = {}
-
-        rubric_cfg = getattr(getattr(self, "rubric", None), "cfg", None)
-        strict_times = getattr(rubric_cfg, "strict_times", True)
-        realism = getattr(rubric_cfg, "realism", None)
-        day_start = getattr(realism, "day_start", "00:00") if realism else "00:00"
-        day_end = getattr(realism, "day_end", "24:00") if realism else "24:00"
-        allow_cross_midnight = getattr(realism, "allow_cross_midnight", False) if realism else False
-        min_gap_minutes = getattr(realism, "min_gap_minutes", 0) if realism else 0
-
-        rep = check_conflicts(
-            proposal=schedule,
-            catalog=info_obj.get("events", []),
-            strict_times=strict_times,
-            day_start=day_start,
-            day_end=day_end,
-            allow_cross_midnight=allow_cross_midnight,
-            min_gap_minutes=min_gap_minutes,
+            problem = get_problem({})
+
+        # Revisions usually touch a few events: only new/changed entries and their
+        # neighbours are re-checked against the state carried from earlier turns.
+        validated = stashed_evaluation(state)[1]
+        if not isinstance(validated, ValidatedSchedule):
+            validated = ValidatedSchedule()
+        with METRICS.timer("validate_seconds", stage="env"):
+            ev = validated.update(
+                schedule,
+                problem,
+                strict_times=cfg.strict_times,
+                penalties=cfg.penalties,
+                realism=cfg.realism,
+            )
+        state["revalidated_events"] = validated.checked
+        record_penalties(ev.diag["penalty_counts"], "env")
+        ev.text = last_text
+        ev.key = engine_key(
+            answer,
+            allow_reasoning_tag=cfg.allow_reasoning_tag,
+            output_format=cfg.output_format,
+            strict_times=cfg.strict_times,
+            penalties=cfg.penalties,
+            realism=cfg.realism,
         )
-        state["validator_report"] = rep
-        state["normalized_schedule"] = rep.get("normalized")
+        rep = ev.report
+        # state keeps plain data only (dict views, a digest); the rich objects live in a side cache
+        stash_evaluation(state, ev, validated)
+        norm = rep.get("normalized")
+        norm = norm.as_dicts() if isinstance(norm, Schedule) else norm
+        state["validator_report"] = dict(rep, normalized=norm)
+        state["normalized_schedule"] = norm
 
-        if rep["summary"] == "No issues found.":
+        clean = rep["summary"] == "No issues found."
+        METRICS.incr("feedback_total", result="clean" if clean else "issues")
+        if clean:
             if self.stop_early_on_clean:
                 # Empty env message signals completion for many trainers, but we still return a gentle ack
                 return [{"role": self.feedback_role, "content": "Looks good."}], state
@@ -1,6 +1,12 @@
-from typing import List, Dict, Any, Union, Literal, Tuple
+import time
+from typing import List, Dict, Any, Optional, Union, Literal, Tuple
 from verifiers.envs.environment import Environment
-from openai import OpenAI
+from openai import AsyncOpenAI
+from ..io.parsing import IncrementalScheduleDetector
+from ..io.store import ResultStore, record_rewards, run_indexed, run_or_resume
+from .client import ChoiceBatcher, RetryPolicy
+from .records import SpillFile, record_response
+from ..utils.metrics import METRICS
 
 SYSTEM = (
     "You are a scheduling assistant. Given an events list and priority names, "
@@ -10,15 +16,60 @@ SYSTEM = (
     "Use only listed events, exact times (unless instructed otherwise), avoid overlaps, honor day bounds. /no_think"
 )
 
+def _clean_sampling_args(sampling_args: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Chat-API form of sampling args (max_tokens -> max_completion_tokens, no None values)."""
+    args = {k: v for k, v in (sampling_args or {}).items() if v is not None}
+    if "max_tokens" in args:
+        args["max_completion_tokens"] = args.pop("max_tokens")
+    return args
+
 class EventSchedulingEnv(Environment):
-    """Single-turn chat environment (baseline)."""
-    def __init__(self, message_type: Literal["chat","completion"]="chat", **kwargs):
+    """
+    Single-turn chat environment (baseline).
+    With `stream=True` (chat only), the completion is streamed through an
+    IncrementalScheduleDetector and the request is cancelled as soon as a
+    complete schedule has closed; `state` then records `stream_tokens`,
+    `budget_remaining` (max_tokens minus tokens received when stopped early: an
+    upper bound on tokens saved, None without max_tokens), `time_to_schedule`
+    and `stopped_early`.
+    With `group_choices=k`, concurrent rollouts of the same prompt (e.g. the
+    repetitions of one example) are sampled as one request with up to k choices
+    and fanned back out (see core.client.ChoiceBatcher). `retry` retries model
+    calls on 429/5xx with backoff. Pair with `core.client.pooled_client` for a
+    shared, size-limited connection pool.
+    With `compact_state=True`, `state["responses"]` holds core.records.ResponseRecord
+    entries (text, token counts, finish reason) instead of full response objects;
+    with `spill_path`, the full responses are appended to that file and
+    `record.raw()` loads them on demand.
+    With a `store` (io.store.ResultStore), finished rollouts are recorded (their
+    rewards once `a_generate` has scored them) and replayed instead of re-run when
+    the same run is restarted.
+    """
+    def __init__(
+        self,
+        message_type: Literal["chat","completion"]="chat",
+        stream: bool = False,
+        group_choices: int = 0,
+        retry: Optional[RetryPolicy] = None,
+        compact_state: bool = False,
+        spill_path: Optional[str] = None,
+        store: Optional[ResultStore] = None,
+        **kwargs,
+    ):
         super().__init__(message_type=message_type, **kwargs)
         self.message_type = message_type
+        self.stream = stream
+        self.retry = retry
+        self.compact_state = compact_state
+        self.spill = SpillFile(spill_path) if (compact_state and spill_path) else None
+        self.store = store
+        # chat calls go through the batcher when grouping or retrying (max_n=1 sends at once)
+        use_batcher = group_choices > 1 or retry is not None
+        self.batcher = ChoiceBatcher(max(1, group_choices), retry=retry or RetryPolicy(max_attempts=1)) if use_batcher else None
 
     async def rollout(
         self,
-        client: OpenAI,
+        client: AsyncOpenAI,
         model: str,
         prompt: Union[str, List[Dict[str, Any]]],
         answer: str,
@@ -27,6 +78,48 @@ class EventSchedulingEnv(Environment):
         sampling_args: Dict[str, Any] = {},
         **kwargs: Any,
     ) -> Tuple[Union[str, List[Dict[str, str]]], Dict[str, Any]]:
+        async def run():
+            with METRICS.timer("rollout_seconds", env="singleturn"):
+                return await self._rollout(client, model, prompt, sampling_args)
+        if self.store is None:
+            return await run()
+        return await run_or_resume(self.store, run, prompt=prompt, answer=answer, model=model,
+                                   sampling_args=sampling_args, rep=kwargs.get("rollout_index"))
+
+    async def run_rollouts(self, client, model, prompts, answers, tasks, infos, sampling_args=None,
+                           max_concurrent: int = -1, rollout_offset: int = 0, **kwargs: Any):
+        if self.store is None:
+            return await super().run_rollouts(client, model, prompts, answers, tasks, infos, sampling_args,
+                                              max_concurrent, **kwargs)
+        rollout = lambda p, a, t, i, **kw: self.rollout(client, model, p, a, t, i, sampling_args, **kwargs, **kw)
+        return await run_indexed(rollout, prompts, answers, tasks, infos, offset=rollout_offset,
+                                 max_concurrent=max_concurrent)
+
+    async def a_generate(self, *args: Any, **kwargs: Any):
+        results = await super().a_generate(*args, **kwargs)
+        if self.store is not None and results.reward:
+            record_rewards(self.store, results.state, results.reward)
+        return results
+
+    async def get_model_response(self, *args: Any, **kwargs: Any):
+        with METRICS.timer("model_seconds", env="singleturn"):
+            if self.batcher is not None and kwargs.get("message_type", self.message_type) == "chat" and not kwargs.get("oai_tools"):
+                return await self.batcher.create(kwargs["client"], kwargs["model"], kwargs["prompt"],
+                                                 **_clean_sampling_args(kwargs.get("sampling_args")))
+            if self.retry is not None:
+                return await self.retry.call(lambda: super(EventSchedulingEnv, self).get_model_response(*args, **kwargs))
+            return await super().get_model_response(*args, **kwargs)
+
+    async def _rollout(self, client: Any, model: str, prompt: Any, sampling_args: Dict[str, Any]):
+        if self.stream and self.message_type == "chat":
+            with METRICS.timer("model_seconds", env="singleturn", mode="stream"):
+                completion_text, state = await self._stream_until_schedule(client, model, prompt, sampling_args)
+            if state["stopped_early"]:
+                METRICS.incr("stream_stopped_early_total")
+                if state["budget_remaining"] is not None:
+                    METRICS.incr("stream_budget_remaining_total", state["budget_remaining"])
+            return [{"role": "assistant", "content": completion_text}], state
+
         completion = await self.get_model_response(
             client=client,
             model=model,
@@ -37,16 +130,62 @@ class EventSchedulingEnv(Environment):
 
         if hasattr(completion, "choices") and len(completion.choices) > 0:
             completion_text = completion.choices[0].message.content
-            state = {"responses": [completion]}
         elif isinstance(completion, str):
             completion_text = completion
-            state = {"responses": [completion]}
         else:
             completion_text = str(completion)
-            state = {"responses": [completion]}
+        state = {"responses": [record_response(completion, self.spill) if self.compact_state else completion]}
 
         if self.message_type == "chat":
             messages = [{"role": "assistant", "content": completion_text}]
             return messages, state
         else:
             return completion_text, state
+
+    async def _stream_until_schedule(
+        self,
+        client: Any,
+        model: str,
+        prompt: List[Dict[str, Any]],
+        sampling_args: Optional[Dict[str, Any]],
+    ) -> Tuple[str, Dict[str, Any]]:
+        args = _clean_sampling_args(sampling_args)
+        budget = args.get("max_completion_tokens")
+        rubric_cfg = getattr(getattr(self, "rubric", None), "cfg", None)
+        detector = IncrementalScheduleDetector(getattr(rubric_cfg, "allow_reasoning_tag", True),
+                                               getattr(rubric_cfg, "output_format", "full"))
+
+        t0 = time.perf_counter()
+        open_stream = lambda: client.chat.completions.create(model=model, messages=prompt, stream=True, **args)
+        stream = await (self.retry.call(open_stream) if self.retry is not None else open_stream())
+        received = 0
+        finish_reason = None
+        time_to_schedule = None
+        try:
+            async for chunk in stream:
+                if not chunk.choices:
+                    continue
+                choice = chunk.choices[0]
+                delta = getattr(choice.delta, "content", None) or ""
+                finish_reason = choice.finish_reason or finish_reason
+                if delta:
+                    received += 1  # servers stream one token per content delta
+                    if detector.feed(delta):
+                        time_to_schedule = time.perf_counter() - t0
+                        break
+        finally:
+            # closing the response cancels generation server-side
+            await stream.close()
+
+        # a schedule closing on the final chunk (finish_reason set) ended the stream by itself
+        stopped_early = detector.done and finish_reason is None
+        text = detector.text[:detector.end] if stopped_early else detector.text
+        state = {
+            "responses": [text],
+            "stream_tokens": received,
+            "budget_remaining": (max(0, int(budget) - received) if stopped_early else 0) if budget else None,
+            "time_to_schedule": time_to_schedule,
+            "stopped_early": stopped_early,
+            "finish_reason": "schedule_closed" if stopped_early else finish_reason,
+        }
+        return text, state
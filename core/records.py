@@ -0,0 +1,128 @@
+"""
+Compact per-response records for rollout state.
+
+`ResponseRecord` keeps the completion text, token counts and finish reason of a
+model response. The full response (logprobs, raw choices, usage details) is
+either dropped or appended to a `SpillFile`, and `record.raw()` then reads it
+back on demand through a memory map.
+"""
+import json
+import mmap
+import os
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+class SpillFile:
+    """
+    Append-only JSON-lines file of heavy payloads. `append` returns an
+    (offset, length) reference; `load` reads it back through an mmap that is
+    remapped when the file has grown past it.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._fh = open(path, "ab")
+        self._rfh = None
+        self._map: Optional[mmap.mmap] = None
+
+    def append(self, payload: Any) -> Tuple[int, int]:
+        data = json.dumps(payload, default=str, separators=(",", ":")).encode("utf-8")
+        with self._lock:
+            offset = self._fh.tell()
+            self._fh.write(data + b"\n")
+            self._fh.flush()
+        return offset, len(data)
+
+    def load(self, offset: int, length: int) -> Any:
+        with self._lock:
+            if self._map is None or offset + length > len(self._map):
+                if self._map is not None:
+                    self._map.close()
+                if self._rfh is None:
+                    self._rfh = open(self.path, "rb")
+                self._map = mmap.mmap(self._rfh.fileno(), 0, access=mmap.ACCESS_READ)
+            data = self._map[offset:offset + length]
+        return json.loads(data)
+
+    def size(self) -> int:
+        return os.path.getsize(self.path)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._map is not None:
+                self._map.close()
+                self._map = None
+            if self._rfh is not None:
+                self._rfh.close()
+                self._rfh = None
+            self._fh.close()
+
+class ResponseRecord:
+    __slots__ = ("text", "prompt_tokens", "completion_tokens", "finish_reason", "_spill", "_ref")
+
+    def __init__(
+        self,
+        text: str,
+        prompt_tokens: Optional[int] = None,
+        completion_tokens: Optional[int] = None,
+        finish_reason: Optional[str] = None,
+        spill: Optional[SpillFile] = None,
+        ref: Optional[Tuple[int, int]] = None,
+    ):
+        self.text = text
+        self.prompt_tokens = prompt_tokens
+        self.completion_tokens = completion_tokens
+        self.finish_reason = finish_reason
+        self._spill = spill
+        self._ref = ref
+
+    @property
+    def spilled(self) -> bool:
+        return self._ref is not None
+
+    def raw(self) -> Optional[Dict[str, Any]]:
+        """The full response as a dict, when it was spilled; None otherwise."""
+        if self._ref is None:
+            return None
+        return self._spill.load(*self._ref)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "text": self.text,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "finish_reason": self.finish_reason,
+        }
+
+    def __repr__(self) -> str:
+        return f"ResponseRecord({self.to_dict()!r}, spilled={self.spilled})"
+
+def record_response(response: Any, spill: Optional[SpillFile] = None) -> ResponseRecord:
+    """ResponseRecord of a chat/completion response (or plain text); spills the full object if `spill` is given."""
+    if isinstance(response, ResponseRecord):
+        return response
+    if isinstance(response, str):
+        return ResponseRecord(response)
+    choices = getattr(response, "choices", None) or []
+    text, finish = "", None
+    if choices:
+        c = choices[0]
+        msg = getattr(c, "message", None)
+        text = (getattr(msg, "content", None) if msg is not None else getattr(c, "text", None)) or ""
+        finish = getattr(c, "finish_reason", None)
+    usage = getattr(response, "usage", None)
+    ref = None
+    if spill is not None:
+        dump = response.model_dump() if hasattr(response, "model_dump") else str(response)
+        ref = spill.append(dump)
+    return ResponseRecord(
+        text,
+        getattr(usage, "prompt_tokens", None),
+        getattr(usage, "completion_tokens", None),
+        finish,
+        spill if ref is not None else None,
+        ref,
+    )
+
+def slim_responses(responses: List[Any], spill: Optional[SpillFile] = None) -> List[ResponseRecord]:
+    return [record_response(r, spill) for r in responses]
@@ -0,0 +1,303 @@
+import uuid
+from dataclasses import astuple, dataclass, field
+from typing import Any, Dict, List, Optional, Tuple, Union
+from ..utils.time_utils import hhmm_to_min, parse_hhmm
+from ..utils.intervals import overlapping_names
+from ..core.config import PenaltiesMinutes, RealismConfig
+from ..io.schedule import NONCANONICAL, Schedule
+from .problem import ProblemInstance
+from ..utils.cache import LRUCache
+from ..utils.metrics import METRICS
+
+# Penalty categories in the order they are tallied; `penalty_counts` in the
+# diagnostics is keyed by these PenaltiesMinutes field names.
+PENALTY_FIELDS: Tuple[str, ...] = (
+    "hallucinated_event",
+    "time_mismatch",
+    "duplicate_event",
+    "nonpositive_duration",
+    "out_of_bounds",
+    "overlap",
+    "min_gap_violation",
+    "malformed_time",
+)
+
+def penalty_minutes_from_counts(counts: Dict[str, int], penalties: PenaltiesMinutes) -> float:
+    """Single place counts become minutes, so scalar and batch paths agree exactly."""
+    total = 0.0
+    for k in PENALTY_FIELDS:
+        c = counts.get(k, 0)
+        if c:
+            total += c * getattr(penalties, k)
+    return total
+
+def engine_key(
+    answer: Any,
+    *,
+    allow_reasoning_tag: bool,
+    strict_times: bool,
+    penalties: PenaltiesMinutes,
+    realism: RealismConfig,
+    output_format: str = "full",
+) -> tuple:
+    """Identity of everything an Evaluation depends on besides the completion text."""
+    return (answer, allow_reasoning_tag, output_format, strict_times, astuple(penalties), astuple(realism))
+
+@dataclass(slots=True)
+class Evaluation:
+    report: Dict[str, Any]          # check_conflicts-style feedback report
+    minutes: float                  # penalized minutes, as score_with_penalties
+    diag: Dict[str, Any]            # score_with_penalties diagnostics
+    text: Optional[str] = None      # completion text this was computed from, if any
+    key: tuple = field(default=())  # engine_key() of the settings used
+
+# Rollout state stays plain JSON: the env's live Evaluation (and the multi-turn
+# ValidatedSchedule) sit here, keyed by the "id" of the digest in state["evaluation"].
+# An evicted entry only costs a re-score.
+LIVE_EVALUATIONS = LRUCache(maxsize=4096)
+
+def stash_evaluation(state: Dict[str, Any], ev: Evaluation, validated: Any = None) -> None:
+    """Keep `ev` (and `validated`) for this rollout; `state["evaluation"]` gets a plain digest."""
+    digest = state.get("evaluation")
+    eid = digest.get("id") if isinstance(digest, dict) else None
+    eid = eid or uuid.uuid4().hex
+    LIVE_EVALUATIONS.put(eid, (ev, validated))
+    state["evaluation"] = {"id": eid, "minutes": ev.minutes, "summary": ev.report["summary"]}
+
+def stashed_evaluation(state: Optional[Dict[str, Any]]) -> Tuple[Optional[Evaluation], Any]:
+    """(Evaluation, validated) kept by `stash_evaluation` for this rollout, or (None, None)."""
+    digest = (state or {}).get("evaluation")
+    hit = LIVE_EVALUATIONS.get(digest.get("id")) if isinstance(digest, dict) else None
+    return hit if hit is not None else (None, None)
+
+def record_penalties(counts: Dict[str, int], stage: str) -> None:
+    """Add an evaluation's penalty counts to METRICS (no-op when metrics are off)."""
+    if METRICS.enabled:
+        for k, c in counts.items():
+            if c:
+                METRICS.incr("penalties_total", c, category=k, stage=stage)
+
+def summarize(report: Dict[str, Any]) -> str:
+    bullets = []
+    if report["not_in_catalog"]:
+        bullets.append(f"- {len(report['not_in_catalog'])} event(s) not in catalog: {sorted(set(report['not_in_catalog']))}")
+    if report.get("malformed_times"):
+        bullets.append(f"- {len(report['malformed_times'])} malformed time(s), expected HH:MM: {sorted(set(report['malformed_times']))}")
+    if report["time_mismatches"]:
+        bullets.append(f"- {len(report['time_mismatches'])} time mismatch(es): {sorted(set(report['time_mismatches']))}")
+    if report["duplicates"]:
+        bullets.append(f"- {len(report['duplicates'])} duplicate(s): {sorted(set(report['duplicates']))}")
+    if report["nonpositive"]:
+        bullets.append(f"- {len(report['nonpositive'])} nonpositive duration: {sorted(set(report['nonpositive']))}")
+    if report["out_of_bounds"]:
+        bullets.append(f"- {len(report['out_of_bounds'])} outside day bounds: {sorted(set(report['out_of_bounds']))}")
+    if report["overlaps"]:
+        pairs = ", ".join(f"{a} / {b}" for a, b in report["overlaps"][:5])
+        more = f" (+{len(report['overlaps']) - 5} more)" if len(report["overlaps"]) > 5 else ""
+        bullets.append(f"- {len(report['overlaps'])} overlap(s) detected: {pairs}{more}")
+    if report["min_gap_violations"]:
+        bullets.append(f"- {report['min_gap_violations']} min-gap violation(s)")
+    return "No issues found." if not bullets else "Issues:\n" + "\n".join(bullets)
+
+# Per-entry verdicts; the first three are decided before duplicate detection.
+NOT_IN_CATALOG, MALFORMED, MISMATCH, NONPOSITIVE, OUT_OF_BOUNDS, OK = range(6)
+
+def classify_entry(
+    nm: str,
+    st: str,
+    en: str,
+    problem: ProblemInstance,
+    strict_times: bool,
+    cross: bool,
+    check_bounds: bool,
+    ds: int,
+    de: int,
+) -> Tuple[int, int, int, float]:
+    """(verdict, start minute, normalized end, weighted minutes) of one entry, duplicates aside."""
+    i = problem.index.get(nm)
+    if i is None:
+        return NOT_IN_CATALOG, 0, 0, 0.0
+    if st == problem.start_strs[i] and en == problem.end_strs[i]:
+        smin, emin = problem.starts[i], problem.ends[i]  # compiled with the catalog
+    else:
+        smin, emin = parse_hhmm(st), parse_hhmm(en)
+        if smin is None or emin is None:
+            return MALFORMED, 0, 0, 0.0
+        if strict_times:
+            return MISMATCH, 0, 0, 0.0
+    return _judge(i, smin, emin, problem, cross, check_bounds, ds, de)
+
+def _judge(
+    i: int, smin: int, emin: int, problem: ProblemInstance, cross: bool, check_bounds: bool, ds: int, de: int,
+) -> Tuple[int, int, int, float]:
+    end_norm = emin + 1440 if (cross and emin < smin) else emin
+    dur = end_norm - smin
+    if dur <= 0:
+        return NONPOSITIVE, smin, end_norm, 0.0
+    if check_bounds and (smin < ds or emin > de):
+        return OUT_OF_BOUNDS, smin, end_norm, 0.0
+    return OK, smin, end_norm, (2.0 if problem.priority[i] else 1.0) * dur
+
+def classify_coded(
+    sched: Schedule,
+    pos: int,
+    i: int,
+    problem: ProblemInstance,
+    strict_times: bool,
+    cross: bool,
+    check_bounds: bool,
+    ds: int,
+    de: int,
+) -> Tuple[int, int, int, float]:
+    """`classify_entry` for entry `pos` of a Schedule bound to catalog index `i`, on minute codes."""
+    if i < 0:
+        return NOT_IN_CATALOG, 0, 0, 0.0
+    smin, emin = sched.starts[pos], sched.ends[pos]
+    if smin == NONCANONICAL or emin == NONCANONICAL or not problem.canonical[i]:
+        return classify_entry(sched.names[pos], sched.start_str(pos), sched.end_str(pos),
+                              problem, strict_times, cross, check_bounds, ds, de)
+    # both sides canonical: equal codes <=> equal strings
+    if strict_times and (smin != problem.starts[i] or emin != problem.ends[i]):
+        return MISMATCH, 0, 0, 0.0
+    return _judge(i, smin, emin, problem, cross, check_bounds, ds, de)
+
+def count_min_gap_violations(intervals: List[Tuple[int,int]], min_gap: int) -> int:
+    """Neighbours closer than `min_gap` after sorting by (start, end)."""
+    if min_gap <= 0:
+        return 0
+    ints = sorted(intervals)
+    return sum(1 for j in range(len(ints) - 1) if ints[j+1][0] - ints[j][1] < min_gap)
+
+def find_conflicts(
+    names: List[str],
+    cat_idx: List[int],
+    intervals: List[Tuple[int,int]],
+    problem: ProblemInstance,
+    realism: RealismConfig,
+) -> Tuple[List[Tuple[str,str]], int]:
+    """(overlapping name pairs, min-gap violations) among valid chosen events; per venue when enforced."""
+    if not realism.enforce_venue_exclusive:
+        return overlapping_names(names, intervals), count_min_gap_violations(intervals, realism.min_gap_minutes)
+    from .venues import venue_conflicts
+    venues = problem.venues
+    pairs, gaps = venue_conflicts(intervals, [venues[i] for i in cat_idx], problem.capacity, realism.min_gap_minutes)
+    return [(names[i], names[j]) for i, j in pairs], gaps
+
+def build_evaluation(
+    flagged: List[List[str]],
+    duplicates: List[str],
+    base_minutes: float,
+    intervals: List[Tuple[int,int]],
+    chosen_norm: Union[Schedule, List[Dict[str,str]]],
+    overlaps: List[Tuple[str,str]],
+    min_gap_violations: int,
+    penalties: PenaltiesMinutes,
+) -> Evaluation:
+    """Assemble report, diagnostics and minutes; `flagged` is indexed by verdict."""
+    counts = {
+        "hallucinated_event": len(flagged[NOT_IN_CATALOG]),
+        "time_mismatch": len(flagged[MISMATCH]),
+        "duplicate_event": len(duplicates),
+        "nonpositive_duration": len(flagged[NONPOSITIVE]),
+        "out_of_bounds": len(flagged[OUT_OF_BOUNDS]),
+        "overlap": len(overlaps),
+        "min_gap_violation": min_gap_violations,
+        "malformed_time": len(flagged[MALFORMED]),
+    }
+    penalty_minutes = penalty_minutes_from_counts(counts, penalties)
+    report: Dict[str, Any] = {
+        "not_in_catalog": flagged[NOT_IN_CATALOG],
+        "malformed_times": flagged[MALFORMED],
+        "time_mismatches": flagged[MISMATCH],
+        "duplicates": duplicates,
+        "nonpositive": flagged[NONPOSITIVE],
+        "out_of_bounds": flagged[OUT_OF_BOUNDS],
+        "overlaps": overlaps,
+        "min_gap_violations": min_gap_violations,
+        "summary": "",
+    }
+    report["summary"] = summarize(report)
+    report["normalized"] = chosen_norm
+    diag = {
+        "base_minutes": base_minutes,
+        "penalty_minutes": penalty_minutes,
+        "overlaps": len(overlaps),
+        "intervals": intervals,
+        "penalty_counts": counts,
+    }
+    return Evaluation(report=report, minutes=max(0.0, base_minutes - penalty_minutes), diag=diag)
+
+def evaluate_schedule(
+    proposal: Union[Schedule, List[Dict[str,str]]],
+    problem: ProblemInstance,
+    *,
+    strict_times: bool,
+    penalties: PenaltiesMinutes,
+    realism: RealismConfig,
+) -> Evaluation:
+    """
+    One pass over `proposal` applying catalog lookup, time parsing, strict times, duplicates,
+    duration, day bounds, overlaps and min-gap. Produces both the validator
+    report and the penalized minutes, so nothing is walked twice.
+    """
+    cross = realism.allow_cross_midnight
+    check_bounds = realism.enforce_day_bounds and not cross
+    ds = hhmm_to_min(realism.day_start)
+    de = hhmm_to_min(realism.day_end)
+
+    flagged: List[List[str]] = [[] for _ in range(OK)]
+    duplicates: List[str] = []
+    seen = set()
+    base_minutes = 0.0
+    intervals: List[Tuple[int,int]] = []
+    proposal = problem.resolve(proposal)
+    if isinstance(proposal, Schedule):
+        # native path: catalog indices and minute codes, no per-entry dicts
+        names, starts, ends, raw = proposal.names, proposal.starts, proposal.ends, proposal.raw
+        cat_starts, cat_ends, canonical = problem.starts, problem.ends, problem.canonical
+        kept: List[int] = []
+        bound = proposal.bind(problem)
+        for pos, i in enumerate(bound):
+            nm = names[pos]
+            if i < 0:
+                flagged[NOT_IN_CATALOG].append(nm);  continue
+            if pos in raw or not canonical[i]:
+                v, smin, end_norm, wmin = classify_coded(proposal, pos, i, problem, strict_times, cross, check_bounds, ds, de)
+            elif strict_times and (starts[pos] != cat_starts[i] or ends[pos] != cat_ends[i]):
+                v = MISMATCH
+            else:
+                v, smin, end_norm, wmin = _judge(i, starts[pos], ends[pos], problem, cross, check_bounds, ds, de)
+            if v <= MISMATCH:
+                flagged[v].append(nm);  continue
+            if nm in seen:
+                duplicates.append(nm);  continue
+            seen.add(nm)
+            if v != OK:
+                flagged[v].append(nm);  continue
+            base_minutes += wmin
+            intervals.append((smin, end_norm))
+            kept.append(pos)
+        overlaps, gaps = find_conflicts([names[p] for p in kept], [bound[p] for p in kept], intervals, problem, realism)
+        chosen = proposal.take(kept) if len(kept) < len(names) else proposal.copy()
+        return build_evaluation(flagged, duplicates, base_minutes, intervals, chosen, overlaps, gaps, penalties)
+
+    chosen_norm: List[Dict[str,str]] = []
+    chosen_idx: List[int] = []
+    for e in proposal:
+        nm, st, en = e["name"], e["start"], e["end"]
+        v, smin, end_norm, wmin = classify_entry(nm, st, en, problem, strict_times, cross, check_bounds, ds, de)
+        if v <= MISMATCH:
+            flagged[v].append(nm);  continue
+        if nm in seen:
+            duplicates.append(nm);  continue
+        seen.add(nm)
+        if v != OK:
+            flagged[v].append(nm);  continue
+        base_minutes += wmin
+        intervals.append((smin, end_norm))
+        chosen_norm.append({"name": nm, "start": st, "end": en})
+        chosen_idx.append(problem.index[nm])
+
+    # every overlapping pair, by event name
+    overlaps, gaps = find_conflicts([e["name"] for e in chosen_norm], chosen_idx, intervals, problem, realism)
+    return build_evaluation(flagged, duplicates, base_minutes, intervals, chosen_norm, overlaps, gaps, penalties)
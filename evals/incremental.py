@@ -0,0 +1,159 @@
+"""
+Incremental re-validation of successive schedule revisions.
+
+`ValidatedSchedule` keeps, between turns:
+- a per-entry verdict memo keyed by (name, start, end), so unchanged entries are
+  not re-checked against the catalog;
+- the valid events as a sorted interval set with its overlap adjacency and
+  min-gap violation count, updated only for inserted, removed or retimed events
+  and their neighbours. With `enforce_venue_exclusive` this part is recomputed
+  per venue instead (see evals.venues).
+
+`update()` returns the same Evaluation `evaluate_schedule` would for the revision.
+"""
+from bisect import bisect_left, insort
+from dataclasses import astuple
+from typing import Dict, List, Optional, Set, Tuple, Union
+from ..utils.time_utils import hhmm_to_min
+from ..core.config import PenaltiesMinutes, RealismConfig
+from ..io.schedule import Schedule, triples
+from .engine import MISMATCH, OK, Evaluation, build_evaluation, classify_entry, find_conflicts
+from .problem import ProblemInstance
+
+Item = Tuple[int, int, str]  # (start, normalized end, name)
+
+class ValidatedSchedule:
+    __slots__ = (
+        "key", "verdicts", "valid", "items", "adjacent", "gap_violations",
+        "max_len", "checked", "changed",
+    )
+
+    def __init__(self, key: tuple = ()):
+        self._reset(key)
+
+    def _reset(self, key: tuple) -> None:
+        self.key = key
+        self.verdicts: Dict[Tuple[str, str, str], Tuple[int, int, int, float]] = {}
+        self.valid: Dict[str, Item] = {}        # name -> interval of each currently valid event
+        self.items: List[Item] = []             # valid intervals sorted by (start, end, name)
+        self.adjacent: Dict[str, Set[str]] = {} # overlap graph over valid events
+        self.gap_violations = 0
+        self.max_len = 0                        # bound for the backwards overlap scan
+        self.checked = 0                        # entries classified by the last update
+        self.changed = 0                        # valid intervals inserted or removed by it
+
+    @staticmethod
+    def settings_key(problem: ProblemInstance, strict_times: bool, realism: RealismConfig) -> tuple:
+        return (id(problem), problem.digest, strict_times, astuple(realism))
+
+    def _gap(self, a: Optional[Item], b: Optional[Item], min_gap: int) -> int:
+        return int(a is not None and b is not None and b[0] - a[1] < min_gap)
+
+    def _remove(self, it: Item, min_gap: int) -> None:
+        items = self.items
+        p = bisect_left(items, it)
+        if min_gap > 0:
+            a = items[p-1] if p > 0 else None
+            b = items[p+1] if p + 1 < len(items) else None
+            self.gap_violations += self._gap(a, b, min_gap) - self._gap(a, it, min_gap) - self._gap(it, b, min_gap)
+        items.pop(p)
+        for other in self.adjacent.pop(it[2], ()):
+            self.adjacent[other].discard(it[2])
+
+    def _insert(self, it: Item, min_gap: int) -> None:
+        items = self.items
+        s, e, nm = it
+        # candidates start before `e`; walk back while they could still reach past `s`
+        links: Set[str] = set()
+        j = bisect_left(items, (e,)) - 1
+        while j >= 0 and items[j][0] > s - self.max_len:
+            if items[j][1] > s:
+                links.add(items[j][2])
+            j -= 1
+        self.adjacent[nm] = links
+        for other in links:
+            self.adjacent[other].add(nm)
+        self.max_len = max(self.max_len, e - s)
+        p = bisect_left(items, it)
+        if min_gap > 0:
+            a = items[p-1] if p > 0 else None
+            b = items[p] if p < len(items) else None
+            self.gap_violations += self._gap(a, it, min_gap) + self._gap(it, b, min_gap) - self._gap(a, b, min_gap)
+        insort(items, it)
+
+    def update(
+        self,
+        proposal: Union[Schedule, List[Dict[str, str]]],
+        problem: ProblemInstance,
+        *,
+        strict_times: bool,
+        penalties: PenaltiesMinutes,
+        realism: RealismConfig,
+    ) -> Evaluation:
+        key = self.settings_key(problem, strict_times, realism)
+        if key != self.key:
+            self._reset(key)
+        cross = realism.allow_cross_midnight
+        check_bounds = realism.enforce_day_bounds and not cross
+        ds, de = hhmm_to_min(realism.day_start), hhmm_to_min(realism.day_end)
+        mg = realism.min_gap_minutes
+
+        flagged: List[List[str]] = [[] for _ in range(OK)]
+        duplicates: List[str] = []
+        seen = set()
+        base_minutes = 0.0
+        chosen_norm = Schedule()
+        valid: Dict[str, Item] = {}
+        checked = 0
+        for k in triples(problem.resolve(proposal)):
+            nm, st, en = k
+            verdict = self.verdicts.get(k)
+            if verdict is None:
+                verdict = self.verdicts[k] = classify_entry(nm, st, en, problem, strict_times, cross, check_bounds, ds, de)
+                checked += 1
+            v, smin, end_norm, wmin = verdict
+            if v <= MISMATCH:
+                flagged[v].append(nm);  continue
+            if nm in seen:
+                duplicates.append(nm);  continue
+            seen.add(nm)
+            if v != OK:
+                flagged[v].append(nm);  continue
+            base_minutes += wmin
+            valid[nm] = (smin, end_norm, nm)
+            chosen_norm.append(nm, st, en)
+
+        if realism.enforce_venue_exclusive:
+            # per-venue sweep over the valid set; verdicts are still memoized
+            self.changed = len(set(valid.items()) ^ set(self.valid.items()))
+            self.valid, self.checked = valid, checked
+            names = list(valid)
+            intervals = [(it[0], it[1]) for it in valid.values()]
+            overlaps, gaps = find_conflicts(names, [problem.index[nm] for nm in names], intervals, problem, realism)
+            return build_evaluation(flagged, duplicates, base_minutes, intervals, chosen_norm, overlaps, gaps, penalties)
+
+        # diff against the previous revision's valid set
+        old = self.valid
+        removed = [it for nm, it in old.items() if valid.get(nm) != it]
+        inserted = [it for nm, it in valid.items() if old.get(nm) != it]
+        for it in removed:
+            self._remove(it, mg)
+        for it in inserted:
+            self._insert(it, mg)
+        self.valid = valid
+        self.checked = checked
+        self.changed = len(removed) + len(inserted)
+
+        # same pair order as the full pass: by position in the proposal
+        pos = {nm: i for i, nm in enumerate(valid)}
+        pairs = sorted(
+            (pos[a], pos[b]) if pos[a] < pos[b] else (pos[b], pos[a])
+            for a, links in self.adjacent.items() for b in links if a < b
+        )
+        names = list(valid)
+        overlaps = [(names[i], names[j]) for i, j in pairs]
+        intervals = [(it[0], it[1]) for it in valid.values()]
+        return build_evaluation(
+            flagged, duplicates, base_minutes, intervals, chosen_norm, overlaps,
+            self.gap_violations, penalties,
+        )
@@ -0,0 +1,62 @@
+"""
+Memoization for duplicate completions.
+
+Two bounded LRU layers, both per rubric:
+- extraction: raw completion text -> parsed schedule, keyed by a hash of the part
+  of the text the parser actually reads (after the last `</think>` when reasoning
+  tags are allowed), so identical answers with different reasoning still hit;
+- reward: (answer digest, rubric settings, canonical schedule) -> (minutes, diag).
+"""
+import hashlib
+from typing import Any, Dict, List, Optional, Tuple, Union
+from ..io.parsing import parse_schedule_any
+from ..io.schedule import Schedule, triples
+from ..utils.cache import LRUCache
+
+_UNPARSEABLE = ()  # cached marker for text that yields no schedule
+
+def text_key(text: str, allow_reasoning_tag: bool, output_format: str = "full") -> bytes:
+    if allow_reasoning_tag:
+        k = text.rfind("</think>")
+        if k != -1:
+            text = text[k + len("</think>"):]
+    return hashlib.blake2b(
+        text.encode("utf-8", "surrogatepass"), digest_size=16,
+        person=(b"t" if allow_reasoning_tag else b"f") + output_format.encode(),
+    ).digest()
+
+def schedule_key(schedule: Union[Schedule, List[Dict[str, str]]]) -> Tuple[Tuple[str, str, str], ...]:
+    """
+    Canonical form of a parsed schedule. Entry order is kept: duplicate handling
+    keeps the first occurrence, so reordering can change the score.
+    """
+    return tuple(triples(schedule))
+
+class RewardMemo:
+    __slots__ = ("extractions", "rewards")
+
+    def __init__(self, extract_size: int = 4096, reward_size: int = 16384):
+        self.extractions = LRUCache(extract_size)
+        self.rewards = LRUCache(reward_size)
+
+    def extract(self, text: str, allow_reasoning_tag: bool, output_format: str = "full") -> Optional[List[Dict[str, str]]]:
+        """`parse_schedule_any`, cached by text hash. Callers must not mutate the result."""
+        k = text_key(text, allow_reasoning_tag, output_format)
+        hit = self.extractions.get(k)
+        if hit is None:
+            hit = parse_schedule_any(text, allow_reasoning_tag=allow_reasoning_tag, output_format=output_format)
+            self.extractions.put(k, _UNPARSEABLE if hit is None else hit)
+        return None if hit is _UNPARSEABLE else hit
+
+    def get(self, key: tuple) -> Optional[Tuple[float, Dict[str, Any]]]:
+        return self.rewards.get(key)
+
+    def put(self, key: tuple, minutes: float, diag: Dict[str, Any]) -> None:
+        self.rewards.put(key, (minutes, diag))
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {"extract": self.extractions.stats(), "reward": self.rewards.stats()}
+
+    def clear(self) -> None:
+        self.extractions.clear()
+        self.rewards.clear()
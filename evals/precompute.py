@@ -0,0 +1,105 @@
+"""
+Batch precompute of realism-aware DP optima and optimal event sets.
+
+The result for one example is stored as
+    {"key": realism_id(realism), "value": <optimum minutes>, "schedule": [[name,start,end], ...]}
+either as a `dp_optimum` dataset column (`add_optimum_column`) or in a JSONL
+sidecar keyed by example content (`write_optimum_sidecar` / `attach_optimum_sidecar`).
+The loader copies it into `answer`, where ProblemInstance picks it up.
+
+    python -m events_env.evals.precompute --out optima.jsonl [--min-gap 10] [--cross-midnight]
+"""
+import argparse
+import hashlib
+import json
+import sys
+from functools import partial
+from typing import Any, Dict, Iterable, Mapping, Optional
+from ..core.config import RealismConfig
+from .problem import realism_id
+from .scoring import wis_solve
+
+def example_id(events: Any, priority_events: Any) -> str:
+    """Content hash of an example's catalog, stable across select/shuffle."""
+    return hashlib.sha1(json.dumps([events, priority_events]).encode()).hexdigest()[:16]
+
+def solve_example(
+    events: Any, priority_events: Any, realism: RealismConfig, venue_capacity: Optional[Dict[str, int]] = None,
+) -> Dict[str, Any]:
+    problem = None
+    if realism.enforce_venue_exclusive:
+        from .problem import ProblemInstance
+        problem = ProblemInstance(events, priority_events, venue_capacity=venue_capacity)
+    value, chosen = wis_solve(events, priority_events, realism, problem)
+    return {
+        "key": realism_id(realism),
+        "value": float(value),
+        "schedule": [list(events[k][:3]) for k in chosen],
+    }
+
+def _optimum_row(ex: Dict[str, Any], realism: RealismConfig, column: str) -> Dict[str, Any]:
+    return {column: solve_example(ex["events"], ex["priority_events"], realism, ex.get("venue_capacity"))}
+
+def add_optimum_column(dataset, realism: RealismConfig, *, num_proc: Optional[int] = None, column: str = "dp_optimum"):
+    """Return `dataset` with a `column` holding each example's optimum under `realism`."""
+    return dataset.map(
+        partial(_optimum_row, realism=realism, column=column),
+        num_proc=num_proc if num_proc and len(dataset) > 1 else None,
+    )
+
+def write_optimum_sidecar(rows: Iterable[Mapping[str, Any]], realism: RealismConfig, path: str) -> int:
+    """Solve every row (needs `events` and `priority_events`) and write one JSONL line each."""
+    n = 0
+    with open(path, "w", encoding="utf-8") as f:
+        for ex in rows:
+            rec = solve_example(ex["events"], ex["priority_events"], realism, ex.get("venue_capacity"))
+            rec["id"] = example_id(ex["events"], ex["priority_events"])
+            f.write(json.dumps(rec) + "\n")
+            n += 1
+    return n
+
+def read_optimum_sidecar(path: str) -> Dict[str, Dict[str, Any]]:
+    out: Dict[str, Dict[str, Any]] = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                rec = json.loads(line)
+                out[rec.pop("id")] = rec
+    return out
+
+def _attach_row(ex: Dict[str, Any], table: Dict[str, Dict[str, Any]], column: str) -> Dict[str, Any]:
+    return {column: table.get(example_id(ex["events"], ex["priority_events"]))}
+
+def attach_optimum_sidecar(dataset, path: str, *, column: str = "dp_optimum"):
+    """Return `dataset` with `column` filled from a sidecar file (None where missing)."""
+    table = read_optimum_sidecar(path)
+    return dataset.map(partial(_attach_row, table=table, column=column))
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Precompute DP optima for the events dataset into a JSONL sidecar.")
+    ap.add_argument("--out", required=True)
+    ap.add_argument("--dataset", default="anakin87/events-scheduling")
+    ap.add_argument("--split", default=None, help="default: every split")
+    ap.add_argument("--min-gap", type=int, default=0)
+    ap.add_argument("--no-bounds", action="store_true")
+    ap.add_argument("--cross-midnight", action="store_true")
+    ap.add_argument("--day-start", default="00:00")
+    ap.add_argument("--day-end", default="24:00")
+    args = ap.parse_args(argv)
+
+    from datasets import load_dataset
+    realism = RealismConfig(
+        enforce_day_bounds=not args.no_bounds,
+        day_start=args.day_start,
+        day_end=args.day_end,
+        allow_cross_midnight=args.cross_midnight,
+        min_gap_minutes=args.min_gap,
+    )
+    ds = load_dataset(args.dataset)
+    splits = [ds[args.split]] if args.split else [ds[k] for k in ds.keys()]
+    n = write_optimum_sidecar((ex for split in splits for ex in split), realism, args.out)
+    print(f"wrote {n} optima (realism {realism_id(realism)}) to {args.out}", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
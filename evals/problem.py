@@ -0,0 +1,153 @@
+import hashlib
+import json
+from array import array
+from dataclasses import astuple
+from typing import Any, Dict, List, Optional, Union
+from ..utils.time_utils import HHMM_TABLE, hhmm_to_min
+from ..utils.cache import LRUCache
+from ..utils.metrics import METRICS
+from ..core.config import RealismConfig
+from ..io.schedule import Schedule
+
+def realism_key(realism: RealismConfig) -> tuple:
+    """Hashable identity of a RealismConfig (the dataclass itself is mutable)."""
+    return astuple(realism)
+
+def realism_id(realism: RealismConfig) -> str:
+    """Short stable string form of realism_key, for storing alongside data."""
+    return hashlib.sha1(json.dumps(realism_key(realism)).encode()).hexdigest()[:12]
+
+class ProblemInstance:
+    """
+    Compiled form of one dataset `answer`: the catalog as integer minute arrays,
+    a name->index map, a priority mask and a per-realism memo of the DP optimum.
+    Built once per distinct answer and shared by every rollout scored against it.
+    A precomputed `dp_optimum` entry in the answer (see evals.precompute) seeds
+    the memo, so the matching realism never runs the DP at reward time.
+    Catalog rows may carry a venue as a 4th element; `venue_capacity` (from the
+    answer) gives how many events a venue hosts at once, 1 by default.
+    """
+    __slots__ = (
+        "events", "priority_events", "optimal_score",
+        "names", "start_strs", "end_strs", "starts", "ends",
+        "index", "priority", "canonical", "venues", "venue_names", "capacity",
+        "digest", "_optima", "_precomputed", "__weakref__",
+    )
+
+    def __init__(
+        self,
+        events: List[List[str]],
+        priority_events: List[str],
+        optimal_score: Any = None,
+        dp_optimum: Optional[Dict[str, Any]] = None,
+        digest: Optional[str] = None,
+        venue_capacity: Optional[Dict[str, int]] = None,
+    ):
+        self.events = events
+        self.priority_events = priority_events
+        self.optimal_score = optimal_score
+        self.names: List[str] = [e[0] for e in events]
+        self.start_strs: List[str] = [e[1] for e in events]
+        self.end_strs: List[str] = [e[2] for e in events]
+        self.starts = array("i", (hhmm_to_min(s) for s in self.start_strs))
+        self.ends = array("i", (hhmm_to_min(e) for e in self.end_strs))
+        # later duplicates win, as with events_index()
+        self.index: Dict[str, int] = {nm: i for i, nm in enumerate(self.names)}
+        pset = set(priority_events)
+        self.priority = array("b", (nm in pset for nm in self.names))
+        # both times already in "HH:MM" form, so Schedule minute codes compare directly
+        self.canonical = array("b", (s in HHMM_TABLE and e in HHMM_TABLE for s, e in zip(self.start_strs, self.end_strs)))
+        # venue id per event; rows without a venue share the unnamed venue ""
+        ids: Dict[str, int] = {}
+        self.venues = array("i", (ids.setdefault(e[3] if len(e) > 3 and e[3] else "", len(ids)) for e in events))
+        self.venue_names: List[str] = list(ids)
+        caps = venue_capacity or {}
+        self.capacity: List[int] = [max(1, int(caps.get(v, 1))) for v in self.venue_names]
+        # content hash of the source answer, when built from one (keys the reward memo)
+        self.digest = digest
+        self._optima: Dict[tuple, float] = {}
+        # realism_id -> {"key": ..., "value": float, "schedule": [[name,start,end], ...]}
+        self._precomputed: Dict[str, Dict[str, Any]] = {}
+        if dp_optimum and dp_optimum.get("key"):
+            self._precomputed[dp_optimum["key"]] = dp_optimum
+
+    @classmethod
+    def from_answer(cls, answer: Union[str, Dict[str, Any]]) -> "ProblemInstance":
+        raw = answer if isinstance(answer, str) else json.dumps(answer or {}, sort_keys=True)
+        info = json.loads(answer) if isinstance(answer, str) else (answer or {})
+        return cls(
+            info.get("events", []),
+            info.get("priority_events", []),
+            info.get("optimal_score", None),
+            info.get("dp_optimum", None),
+            hashlib.sha1(raw.encode("utf-8", "surrogatepass")).hexdigest(),
+            info.get("venue_capacity", None),
+        )
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def resolve(self, schedule: Union[Schedule, List[Dict[str, Any]]]) -> Union[Schedule, List[Dict[str, str]]]:
+        """
+        Map indexed entries ({"index": i}, see io.encoding) to a Schedule of
+        catalog entries; other schedules are returned as is. Unknown ids become
+        `#<i>`, which is not in the catalog.
+        """
+        if isinstance(schedule, Schedule) or not schedule or "index" not in schedule[0]:
+            return schedule
+        n = len(self.names)
+        out = Schedule()
+        for e in schedule:
+            i = e["index"]
+            if 0 <= i < n:
+                out.append(self.names[i], self.start_strs[i], self.end_strs[i])
+            else:
+                out.append(f"#{i}", "", "")
+        return out
+
+    def optimum(self, realism: RealismConfig) -> float:
+        """Memoized `wis_optimum` under the given realism settings."""
+        key = realism_key(realism)
+        val = self._optima.get(key)
+        if val is None:
+            pre = self._precomputed.get(realism_id(realism)) if self._precomputed else None
+            if pre is not None:
+                val = max(1.0, float(pre["value"]))
+                METRICS.incr("optimum_total", source="precomputed")
+            else:
+                from .scoring import wis_optimum
+                with METRICS.timer("optimum_seconds"):
+                    val = wis_optimum(self.events, self.priority_events, realism, self)
+                METRICS.incr("optimum_total", source="dp")
+            self._optima[key] = val
+        return val
+
+    def optimal_schedule(self, realism: RealismConfig) -> List[Dict[str,str]]:
+        """One optimal event set under `realism`, as schedule dicts in time order."""
+        pre = self._precomputed.get(realism_id(realism))
+        if pre is not None and pre.get("schedule") is not None:
+            rows = pre["schedule"]
+        else:
+            from .scoring import wis_solve
+            rows = [self.events[k] for k in wis_solve(self.events, self.priority_events, realism, self)[1]]
+        return [{"name": r[0], "start": r[1], "end": r[2]} for r in rows]
+
+    def denominator(self, normalize_with_optimal: str, realism: RealismConfig) -> float:
+        ds_opt = self.optimal_score
+        if normalize_with_optimal == "dataset" and isinstance(ds_opt, (int, float)) and ds_opt > 0:
+            return float(ds_opt)
+        return self.optimum(realism)
+
+PROBLEM_CACHE = LRUCache(maxsize=4096)
+
+def get_problem(answer: Union[str, Dict[str, Any]], cache: Optional[LRUCache] = None) -> ProblemInstance:
+    """
+    Return the compiled ProblemInstance for `answer`, building it on first use.
+    String answers are cached (keyed by the string itself); dict answers are compiled uncached.
+    """
+    if not isinstance(answer, str):
+        return ProblemInstance.from_answer(answer)
+    cache = PROBLEM_CACHE if cache is None else cache
+    if METRICS.enabled:
+        METRICS.incr("problem_cache_total", result="hit" if answer in cache else "miss")
+    return cache.get_or_create(answer, lambda: ProblemInstance.from_answer(answer))
@@ -0,0 +1,252 @@
+"""
+Offline re-scoring of stored completions, e.g. after changing penalties or realism.
+
+    python -m events_env.evals.rescore rollouts.jsonl --out rewards.jsonl [--workers 8] \
+        [--penalty overlap=30] [--min-gap 10] [--normalize dp]
+
+Input is JSONL (`-` for stdin), Arrow IPC (`.arrow`, as written by `datasets`)
+or Parquet, one record per completion with an `answer` (JSON string or object)
+and a `completion` (text or chat messages); records without a completion are
+skipped. ResultStore segments work as is: the answer is then read from
+`state["answer"]`, and their reward-only lines are skipped.
+
+Records are streamed in chunks to a process pool, each worker holding its own
+EventScorer (problem cache and memo). Completions of the same answer within a
+chunk are validated together with `score_group`. At most two chunks per worker
+are in flight and results are written in input order, so memory stays bounded
+whatever the input size. Each output line holds the record's index, reward,
+penalized minutes and penalty breakdown; throughput goes to stderr.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import fields
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
+from ..core.config import EventRubricConfig, PenaltiesMinutes, RealismConfig
+from .problem import get_problem
+from .reward import EventScorer
+
+Chunk = Tuple[List[str], List[Tuple[int, Any]]]  # distinct answers, (answer index, completion) rows
+
+def _iter_jsonl(path: str) -> Iterator[Dict[str, Any]]:
+    f = sys.stdin.buffer if path == "-" else open(path, "rb")
+    try:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+    finally:
+        if f is not sys.stdin.buffer:
+            f.close()
+
+def _iter_arrow(path: str, batch_rows: int) -> Iterator[Dict[str, Any]]:
+    try:
+        import pyarrow as pa
+    except ImportError as e:
+        raise ImportError("reading Arrow/Parquet input needs pyarrow") from e
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+        batches = pq.ParquetFile(path).iter_batches(batch_size=batch_rows)
+    else:
+        source = pa.memory_map(path)
+        try:
+            reader = pa.ipc.open_file(source)
+            batches = (reader.get_batch(i) for i in range(reader.num_record_batches))
+        except pa.ArrowInvalid:  # `datasets` writes the streaming format
+            batches = pa.ipc.open_stream(pa.memory_map(path))
+    for batch in batches:
+        yield from batch.to_pylist()
+
+def iter_records(path: str, batch_rows: int = 1024) -> Iterator[Dict[str, Any]]:
+    """Records of a JSONL, Arrow IPC or Parquet file, one at a time."""
+    if path.endswith((".arrow", ".parquet", ".feather")):
+        return _iter_arrow(path, batch_rows)
+    return _iter_jsonl(path)
+
+def _answer(rec: Mapping[str, Any], field: str) -> str:
+    answer = rec.get(field)
+    if answer is None and isinstance(rec.get("state"), dict):
+        answer = rec["state"].get("answer")
+    return answer if isinstance(answer, str) else json.dumps(answer or {})
+
+def _chunks(
+    records: Iterable[Mapping[str, Any]], size: int, answer_field: str, completion_field: str, keep: Sequence[str],
+) -> Iterator[Tuple[Chunk, List[Dict[str, Any]]]]:
+    """(payload for a worker, kept fields per row) for every `size` records."""
+    answers: Dict[str, int] = {}
+    rows: List[Tuple[int, Any]] = []
+    kept: List[Dict[str, Any]] = []
+    for rec in records:
+        if completion_field not in rec:
+            continue
+        a = answers.setdefault(_answer(rec, answer_field), len(answers))
+        rows.append((a, rec.get(completion_field, "")))
+        kept.append({k: rec[k] for k in keep if k in rec})
+        if len(rows) == size:
+            yield (list(answers), rows), kept
+            answers, rows, kept = {}, [], []
+    if rows:
+        yield (list(answers), rows), kept
+
+def _result(scorer: EventScorer, problem, scored: Optional[Tuple[float, Dict[str, Any]]]) -> Dict[str, Any]:
+    if scored is None:
+        return {"reward": 0.0, "parsed": False, "minutes": 0.0}
+    minutes, diag = scored
+    return {
+        "reward": scorer._normalize(minutes, problem),
+        "parsed": True,
+        "minutes": minutes,
+        "base_minutes": diag["base_minutes"],
+        "penalty_minutes": diag["penalty_minutes"],
+        "penalty_counts": diag["penalty_counts"],
+    }
+
+def score_chunk(chunk: Chunk, scorer: EventScorer) -> List[Dict[str, Any]]:
+    """Result dicts for the rows of `chunk`, in order; a row whose answer fails to compile gets an `error`."""
+    answers, rows = chunk
+    groups: Dict[int, List[int]] = {}
+    for i, (a, _) in enumerate(rows):
+        groups.setdefault(a, []).append(i)
+    out: List[Dict[str, Any]] = [{} for _ in rows]
+    for a, idx in groups.items():
+        try:
+            problem = get_problem(answers[a], scorer.problem_cache)
+            scored = scorer.score_many([rows[i][1] for i in idx], answers[a])
+        except (ValueError, TypeError, KeyError, AttributeError) as e:
+            for i in idx:
+                out[i] = {"reward": None, "error": f"{type(e).__name__}: {e}"}
+            continue
+        for i, s in zip(idx, scored):
+            out[i] = _result(scorer, problem, s)
+    return out
+
+_SCORER: Optional[EventScorer] = None
+
+def _init_worker(cfg: EventRubricConfig) -> None:
+    global _SCORER
+    _SCORER = EventScorer(cfg)
+
+def _score_in_worker(chunk: Chunk) -> List[Dict[str, Any]]:
+    return score_chunk(chunk, _SCORER)
+
+def rescore(
+    records: Iterable[Mapping[str, Any]],
+    cfg: EventRubricConfig,
+    *,
+    workers: int = 0,
+    chunk_size: int = 512,
+    answer_field: str = "answer",
+    completion_field: str = "completion",
+    keep: Sequence[str] = (),
+) -> Iterator[Dict[str, Any]]:
+    """
+    Yield one result per record, in input order: `index`, the `keep` fields,
+    `reward` and the penalty breakdown. `workers=0` scores in this process.
+    """
+    chunks = _chunks(records, max(1, chunk_size), answer_field, completion_field, keep)
+    index = 0
+    if workers <= 0:
+        scorer = EventScorer(cfg)
+        for chunk, kept in chunks:
+            for k, r in zip(kept, score_chunk(chunk, scorer)):
+                yield {"index": index, **k, **r}
+                index += 1
+        return
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(cfg,)) as pool:
+        pending: deque = deque()
+        for chunk, kept in chunks:
+            pending.append((pool.submit(_score_in_worker, chunk), kept))
+            if len(pending) < 2 * workers:
+                continue
+            fut, kept = pending.popleft()
+            for k, r in zip(kept, fut.result()):
+                yield {"index": index, **k, **r}
+                index += 1
+        while pending:
+            fut, kept = pending.popleft()
+            for k, r in zip(kept, fut.result()):
+                yield {"index": index, **k, **r}
+                index += 1
+
+def _penalties(specs: Sequence[str]) -> PenaltiesMinutes:
+    names = {f.name for f in fields(PenaltiesMinutes)}
+    values: Dict[str, float] = {}
+    for spec in specs:
+        name, sep, value = spec.partition("=")
+        if not sep or name not in names:
+            raise SystemExit(f"--penalty expects NAME=MINUTES with NAME in {sorted(names)}, got {spec!r}")
+        values[name] = float(value)
+    return PenaltiesMinutes(**values)
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Re-score stored completions offline with a process pool.")
+    ap.add_argument("input", help="JSONL (or - for stdin), .arrow or .parquet")
+    ap.add_argument("--out", default="-")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="0 = score in-process")
+    ap.add_argument("--chunk-size", type=int, default=512)
+    ap.add_argument("--answer-field", default="answer")
+    ap.add_argument("--completion-field", default="completion")
+    ap.add_argument("--keep", default="id,example_id,rep", help="comma-separated input fields copied to the output")
+    ap.add_argument("--normalize", choices=("dataset", "dp", "none"), default="dataset")
+    ap.add_argument("--no-clip", action="store_true")
+    ap.add_argument("--lenient-times", action="store_true")
+    ap.add_argument("--no-reasoning-tag", action="store_true")
+    ap.add_argument("--penalty", action="append", default=[], metavar="NAME=MINUTES")
+    ap.add_argument("--min-gap", type=int, default=0)
+    ap.add_argument("--no-bounds", action="store_true")
+    ap.add_argument("--cross-midnight", action="store_true")
+    ap.add_argument("--venue-exclusive", action="store_true")
+    ap.add_argument("--day-start", default="00:00")
+    ap.add_argument("--day-end", default="24:00")
+    ap.add_argument("--progress", type=float, default=10.0, help="seconds between progress lines (0 = off)")
+    args = ap.parse_args(argv)
+
+    cfg = EventRubricConfig(
+        normalize_with_optimal=args.normalize,
+        strict_times=not args.lenient_times,
+        clip_to_unit=not args.no_clip,
+        allow_reasoning_tag=not args.no_reasoning_tag,
+        penalties=_penalties(args.penalty),
+        realism=RealismConfig(
+            enforce_day_bounds=not args.no_bounds,
+            day_start=args.day_start,
+            day_end=args.day_end,
+            allow_cross_midnight=args.cross_midnight,
+            min_gap_minutes=args.min_gap,
+            enforce_venue_exclusive=args.venue_exclusive,
+        ),
+    )
+    keep = [k for k in args.keep.split(",") if k]
+    results = rescore(iter_records(args.input, args.chunk_size), cfg, workers=args.workers,
+                      chunk_size=args.chunk_size, answer_field=args.answer_field,
+                      completion_field=args.completion_field, keep=keep)
+
+    out = sys.stdout if args.out == "-" else open(args.out, "w", encoding="utf-8")
+    t0 = last = time.perf_counter()
+    n = parsed = errors = 0
+    total = 0.0
+    try:
+        for r in results:
+            out.write(json.dumps(r) + "\n")
+            n += 1
+            if r.get("error"):
+                errors += 1
+                continue
+            parsed += r["parsed"]
+            total += r["reward"]
+            if args.progress > 0 and time.perf_counter() - last >= args.progress:
+                last = time.perf_counter()
+                print(f"{n} records, {n / (last - t0):.0f}/s", file=sys.stderr)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    dt = time.perf_counter() - t0
+    print(f"scored {n} records ({parsed} parsed, {errors} errors, mean reward {total / max(1, n - errors):.4f}) "
+          f"in {dt:.1f}s, {n / max(dt, 1e-9):.0f} records/s", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
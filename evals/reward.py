@@ -0,0 +1,193 @@
+"""
+Reward computation without the verifiers dependency.
+
+`EventScorer` holds everything the rubric does to turn a completion into a
+reward: parsing, the memo, validation and normalization. Scoring workers and
+offline tools can use it directly; `evals.rubric.EventSchedulingRubric` wraps
+it as a verifiers Rubric.
+"""
+from dataclasses import astuple
+from typing import Any, Dict, List, Optional, Tuple, Union
+from ..io.parsing import parse_schedule_any
+from .scoring import score_group
+from .engine import Evaluation, engine_key, evaluate_schedule, record_penalties, stashed_evaluation
+from .memo import RewardMemo, schedule_key
+from .problem import ProblemInstance, get_problem
+from ..core.config import EventRubricConfig
+from ..utils.cache import LRUCache
+from ..utils.metrics import METRICS
+
+class EventScorer:
+    """
+    Emits a single scalar reward. If normalized, returns in [0,1].
+    `answer` (from dataset mapping) must be a JSON string containing:
+      { "events": [[name,start,end],...],
+        "priority_events": [name,...],
+        "optimal_score": <int or null> }
+    Compiled answers are shared through `problem_cache` (the process-wide
+    PROBLEM_CACHE by default); read `problem_cache.stats()` for hit/miss counts.
+    If the env stashed an Evaluation for the rollout (`engine.stash_evaluation`)
+    with the same final text and settings, it is reused instead of re-parsing and re-scoring;
+    a rollout replayed from a ResultStore returns its `stored_reward`.
+    Duplicate completions hit `memo` (parse by text hash, score by answer and
+    canonical schedule); pass `memoize=False` to disable, read `memo.stats()` for hit rates.
+    """
+    def __init__(
+        self,
+        cfg: EventRubricConfig,
+        problem_cache: Optional[LRUCache] = None,
+        memo: Optional[RewardMemo] = None,
+        memoize: bool = True,
+    ):
+        self.cfg = cfg
+        self.problem_cache = problem_cache
+        self.memo = memo if memo is not None else (RewardMemo() if memoize else None)
+
+    def _extract_text(self, completion: Union[str, List[Dict[str,Any]]]) -> str:
+        # Multi-turn completions can end on validator feedback; score the last assistant turn
+        if isinstance(completion, list) and completion:
+            for msg in reversed(completion):
+                if isinstance(msg, dict) and msg.get("role") == "assistant" and "content" in msg:
+                    return msg["content"]
+            if "content" in completion[-1]:
+                return completion[-1]["content"]
+        return str(completion)
+
+    def engine_key(self, answer: Any) -> tuple:
+        return engine_key(
+            answer,
+            allow_reasoning_tag=self.cfg.allow_reasoning_tag,
+            output_format=self.cfg.output_format,
+            strict_times=self.cfg.strict_times,
+            penalties=self.cfg.penalties,
+            realism=self.cfg.realism,
+        )
+
+    def _parse(self, text: str) -> Optional[List[Dict[str,str]]]:
+        if self.memo is not None:
+            return self.memo.extract(text, self.cfg.allow_reasoning_tag, self.cfg.output_format)
+        return parse_schedule_any(text, allow_reasoning_tag=self.cfg.allow_reasoning_tag, output_format=self.cfg.output_format)
+
+    def _memo_key(self, problem: ProblemInstance, schedule: List[Dict[str,str]]) -> Optional[tuple]:
+        if self.memo is None or problem.digest is None:
+            return None
+        cfg = self.cfg
+        return (problem.digest, cfg.strict_times, astuple(cfg.penalties), astuple(cfg.realism), schedule_key(schedule))
+
+    def evaluate(self, text: str, answer: Any, problem: Optional[ProblemInstance] = None) -> Optional[Evaluation]:
+        """Parse `text` and run the fused validate-and-score pass; None if unparseable."""
+        schedule = self._parse(text)
+        if schedule is None:
+            return None
+        if problem is None:
+            problem = get_problem(answer, self.problem_cache)
+        with METRICS.timer("validate_seconds", stage="reward"):
+            ev = evaluate_schedule(
+                schedule,
+                problem,
+                strict_times=self.cfg.strict_times,
+                penalties=self.cfg.penalties,
+                realism=self.cfg.realism,
+            )
+        record_penalties(ev.diag["penalty_counts"], "reward")
+        ev.text = text
+        ev.key = self.engine_key(answer)
+        return ev
+
+    def score(self, text: str, answer: Any, problem: Optional[ProblemInstance] = None) -> Optional[Tuple[float, Dict[str,Any]]]:
+        """(penalized minutes, diagnostics) for `text`, through the memo; None if unparseable."""
+        schedule = self._parse(text)
+        if schedule is None:
+            return None
+        if problem is None:
+            problem = get_problem(answer, self.problem_cache)
+        schedule = problem.resolve(schedule)
+        key = self._memo_key(problem, schedule)
+        hit = self.memo.get(key) if key is not None else None
+        if hit is not None:
+            return hit
+        with METRICS.timer("validate_seconds", stage="reward"):
+            ev = evaluate_schedule(
+                schedule,
+                problem,
+                strict_times=self.cfg.strict_times,
+                penalties=self.cfg.penalties,
+                realism=self.cfg.realism,
+            )
+        record_penalties(ev.diag["penalty_counts"], "reward")
+        if key is not None:
+            self.memo.put(key, ev.minutes, ev.diag)
+        return ev.minutes, ev.diag
+
+    def _reward(self, completion, answer, state: Optional[Dict[str,Any]] = None, **kwargs) -> float:
+        with METRICS.timer("reward_seconds"):
+            if state and state.get("resumed") and state.get("stored_reward") is not None:
+                # the store's config hash covers the rubric settings, so this is the same score
+                METRICS.incr("evaluation_reuse_total", result="stored")
+                return float(state["stored_reward"])
+            text = self._extract_text(completion)
+            problem = get_problem(answer, self.problem_cache)
+            ev = stashed_evaluation(state)[0]
+            if isinstance(ev, Evaluation) and ev.text == text and ev.key == self.engine_key(answer):
+                METRICS.incr("evaluation_reuse_total", result="hit")
+                return self._normalize(ev.minutes, problem)
+            METRICS.incr("evaluation_reuse_total", result="miss")
+            scored = self.score(text, answer, problem)
+            if scored is None:
+                return 0.0
+            return self._normalize(scored[0], problem)
+
+    def _normalize(self, minutes: float, problem: ProblemInstance) -> float:
+        if self.cfg.normalize_with_optimal == "none":
+            reward = minutes  # raw minutes
+        else:
+            denom = problem.denominator(self.cfg.normalize_with_optimal, self.cfg.realism)
+            reward = minutes / max(1.0, denom)
+
+        if self.cfg.clip_to_unit:
+            reward = max(0.0, min(1.0, reward))
+        return float(reward)
+
+    def score_many(self, completions: List[Any], answer: Any) -> List[Optional[Tuple[float, Dict[str,Any]]]]:
+        """
+        `score` for many completions of the same prompt, validated together with
+        `score_group`; each distinct schedule is scored once.
+        """
+        problem = get_problem(answer, self.problem_cache)
+        schedules = [self._parse(self._extract_text(c)) for c in completions]
+        schedules = [None if s is None else problem.resolve(s) for s in schedules]
+        keys = [None if s is None else (self._memo_key(problem, s) or i) for i, s in enumerate(schedules)]
+        # score each distinct schedule not already memoized, once
+        scored: Dict[Any, Tuple[float, Dict[str,Any]]] = {}
+        todo: Dict[Any, List[Dict[str,str]]] = {}
+        for key, s in zip(keys, schedules):
+            if s is None or key in scored or key in todo:
+                continue
+            hit = self.memo.get(key) if isinstance(key, tuple) else None
+            if hit is not None:
+                scored[key] = hit
+            else:
+                todo[key] = s
+        if todo:
+            batch = score_group(
+                list(todo.values()),
+                problem.events,
+                problem.priority_events,
+                strict_times=self.cfg.strict_times,
+                penalties=self.cfg.penalties,
+                realism=self.cfg.realism,
+                problem=problem,
+            )
+            for key, (m, diag) in zip(todo, batch):
+                scored[key] = (m, diag)
+                if isinstance(key, tuple):
+                    self.memo.put(key, m, diag)
+        return [None if key is None else scored[key] for key in keys]
+
+    def reward_group(self, completions: List[Any], answer: str) -> List[float]:
+        """
+        Rewards for many completions of the same prompt, scored together with
+        `score_group`. Equal to calling `_reward` on each completion.
+        """
+        problem = get_problem(answer, self.problem_cache)
+        return [0.0 if s is None else self._normalize(s[0], problem) for s in self.score_many(completions, answer)]
@@ -1,123 +1,239 @@
-from typing import List, Dict, Tuple
-from ..utils.time_utils import hhmm_to_min, duration_min, find_overlaps
+from typing import List, Dict, Optional, Sequence, Tuple, Union
+from ..utils.time_utils import hhmm_to_min, duration_min, parse_hhmm
 from ..core.config import PenaltiesMinutes, RealismConfig
+from .engine import PENALTY_FIELDS, evaluate_schedule, penalty_minutes_from_counts
+from ..io.schedule import Schedule
+from .problem import ProblemInstance
 
 def events_index(events: List[List[str]]) -> dict[str, tuple[str,str]]:
-    return {name: (start, end) for name, start, end in events}
+    return {e[0]: (e[1], e[2]) for e in events}
 
 def weighted_minutes(name: str, start: str, end: str, priority_names: set[str], *, allow_cross_midnight: bool) -> float:
     w = 2.0 if name in priority_names else 1.0
     return w * duration_min(start, end, allow_cross_midnight=allow_cross_midnight)
 
-def wis_optimum(events: List[List[str]], priority_events: List[str], realism: RealismConfig) -> float:
-    """Weighted Interval Scheduling optimum in minutes, with optional day-bounds filtering."""
-    ds = hhmm_to_min(realism.day_start)
-    de = hhmm_to_min(realism.day_end)
-    pset = set(priority_events)
-    items: List[Tuple[int,int,float]] = []
-    for name, s, e in events:
-        sm, em = hhmm_to_min(s), hhmm_to_min(e)
-        if realism.enforce_day_bounds and not realism.allow_cross_midnight:
-            if sm < ds or em > de:
-                continue
-        dur = duration_min(s, e, allow_cross_midnight=realism.allow_cross_midnight)
-        if dur <= 0:
-            continue
-        # Normalize wrapped intervals by extending end past midnight when needed
-        end_norm = em + 1440 if (realism.allow_cross_midnight and em < sm) else em
-        w = (2.0 if name in pset else 1.0) * dur
-        items.append((sm, end_norm, w))
-    items.sort(key=lambda x: x[1])
-    n = len(items)
-    if n == 0: return 1.0
-    ends = [it[1] for it in items]
-    # p(j): rightmost compatible
-    p = [ -1 ] * n
-    for j in range(n):
-        lo, hi = 0, j-1
-        pj = -1
-        while lo <= hi:
-            mid = (lo+hi)//2
-            if ends[mid] <= items[j][0]:
-                pj = mid; lo = mid+1
-            else:
-                hi = mid-1
-        p[j] = pj
-    M = [0.0]*(n+1)
-    for j in range(1, n+1):
-        take = items[j-1][2] + (M[p[j-1]+1] if p[j-1] != -1 else 0.0)
-        skip = M[j-1]
-        M[j] = max(take, skip)
-    return max(1.0, M[n])  # guard to avoid /0
+def wis_solve(
+    events: List[List[str]],
+    priority_events: List[str],
+    realism: RealismConfig,
+    problem: Optional[ProblemInstance] = None,
+) -> Tuple[float, List[int]]:
+    """
+    Weighted Interval Scheduling under `realism` (day-bounds filtering, cross-midnight,
+    min-gap between chosen events). See evals.wis for the vectorized solver.
+    Returns (optimum_minutes, catalog indices of one optimal event set in time order).
+    """
+    from .wis import wis_catalog
+    return wis_catalog(events, priority_events, realism, problem)
+
+def wis_optimum(
+    events: List[List[str]],
+    priority_events: List[str],
+    realism: RealismConfig,
+    problem: Optional[ProblemInstance] = None,
+) -> float:
+    """Weighted Interval Scheduling optimum in minutes under `realism`."""
+    return max(1.0, wis_solve(events, priority_events, realism, problem)[0])  # guard to avoid /0
 
 def score_with_penalties(
-    proposal: List[Dict[str,str]],
+    proposal: Union[Schedule, List[Dict[str,str]]],
     events: List[List[str]],
     priority_events: List[str],
     *,
     strict_times: bool,
     penalties: PenaltiesMinutes,
-    realism: RealismConfig
+    realism: RealismConfig,
+    problem: Optional[ProblemInstance] = None,
 ) -> tuple[float, dict]:
     """
     Returns (minutes_after_penalties, diagnostics).
     Base minutes = sum weighted minutes for valid chosen events.
     Penalties expressed in minutes; subtracted then clamped at 0.
+    Pass a compiled `problem` to skip rebuilding the catalog index and priority set.
+    """
+    if problem is None:
+        problem = ProblemInstance(events, priority_events)
+    ev = evaluate_schedule(proposal, problem, strict_times=strict_times, penalties=penalties, realism=realism)
+    return ev.minutes, ev.diag
+
+def score_group(
+    proposals: Sequence[Union[Schedule, List[Dict[str,str]]]],
+    events: List[List[str]],
+    priority_events: List[str],
+    *,
+    strict_times: bool,
+    penalties: PenaltiesMinutes,
+    realism: RealismConfig,
+    problem: Optional[ProblemInstance] = None,
+) -> List[tuple[float, dict]]:
+    """
+    Batch form of `score_with_penalties` for N proposals against one catalog.
+    Names are mapped to catalog indices in one flattening pass; every rule after
+    that runs as NumPy array ops over all N proposals at once. Results (minutes
+    and diagnostics) are identical to calling the scalar path per proposal.
     """
-    idx = events_index(events)
-    pset = set(priority_events)
-    seen = set()
-    base_minutes = 0.0
-    penalty_minutes = 0.0
-    intervals: List[tuple[int,int]] = []
-
-    ds = hhmm_to_min(realism.day_start)
-    de = hhmm_to_min(realism.day_end)
-
-    for e in proposal:
-        nm, st, en = e["name"], e["start"], e["end"]
-        if nm not in idx:
-            penalty_minutes += penalties.hallucinated_event;  continue
-        vst, ven = idx[nm]
-        if strict_times and (st != vst or en != ven):
-            penalty_minutes += penalties.time_mismatch;  continue
-        # Normalize to catalog times under strict mode
-        st, en = (vst, ven) if strict_times else (st, en)
-
-        if nm in seen:
-            penalty_minutes += penalties.duplicate_event;  continue
-        seen.add(nm)
-
-        dur = duration_min(st, en, allow_cross_midnight=realism.allow_cross_midnight)
-        if dur <= 0:
-            penalty_minutes += penalties.nonpositive_duration;  continue
-
-        smin, emin = hhmm_to_min(st), hhmm_to_min(en)
-        if realism.enforce_day_bounds and not realism.allow_cross_midnight:
-            if smin < ds or emin > de:
-                penalty_minutes += penalties.out_of_bounds;  continue
-
-        base_minutes += weighted_minutes(nm, st, en, pset, allow_cross_midnight=realism.allow_cross_midnight)
-        end_norm = emin + 1440 if (realism.allow_cross_midnight and emin < smin) else emin
-        intervals.append((smin, end_norm))
-
-    # overlaps
-    overlaps = find_overlaps(intervals)
-    penalty_minutes += penalties.overlap * len(overlaps)
-
-    # min-gap
-    if realism.min_gap_minutes > 0:
-        ints = sorted(intervals, key=lambda x: x[0])
-        for i in range(len(ints) - 1):
-            gap = ints[i+1][0] - ints[i][1]
-            if gap < realism.min_gap_minutes:
-                penalty_minutes += penalties.min_gap_violation
-
-    final_minutes = max(0.0, base_minutes - penalty_minutes)
-    diag = {
-        "base_minutes": base_minutes,
-        "penalty_minutes": penalty_minutes,
-        "overlaps": len(overlaps),
-        "intervals": intervals,
+    import numpy as np
+
+    if problem is None:
+        problem = ProblemInstance(events, priority_events)
+    n = len(proposals)
+    if n == 0:
+        return []
+    index = problem.index
+    start_strs, end_strs = problem.start_strs, problem.end_strs
+    cat_starts, cat_ends = problem.starts, problem.ends
+
+    # Flatten: one row per proposed entry
+    # time status per entry: 0 ok, 1 malformed, 2 strict mismatch
+    rows: List[int] = []
+    cat: List[int] = []
+    tstat: List[int] = []
+    smins: List[int] = []
+    emins: List[int] = []
+    canonical = problem.canonical
+    for r, proposal in enumerate(proposals):
+        proposal = problem.resolve(proposal)
+        if isinstance(proposal, Schedule):
+            # native: bound indices and minute codes; only non-canonical times fall through to parsing
+            ss, es, raw = proposal.starts, proposal.ends, proposal.raw
+            for pos, i in enumerate(proposal.bind(problem)):
+                rows.append(r)
+                cat.append(i)
+                if i < 0:
+                    tstat.append(0); smins.append(0); emins.append(0)
+                    continue
+                if pos not in raw and canonical[i]:
+                    sm, em = ss[pos], es[pos]
+                    tstat.append(2 if strict_times and (sm != cat_starts[i] or em != cat_ends[i]) else 0)
+                    smins.append(sm); emins.append(em)
+                    continue
+                st, en = proposal.start_str(pos), proposal.end_str(pos)
+                if st == start_strs[i] and en == end_strs[i]:
+                    tstat.append(0); smins.append(cat_starts[i]); emins.append(cat_ends[i])
+                    continue
+                sm, em = parse_hhmm(st), parse_hhmm(en)
+                if sm is None or em is None:
+                    tstat.append(1); smins.append(0); emins.append(0)
+                else:
+                    tstat.append(2 if strict_times else 0); smins.append(sm); emins.append(em)
+            continue
+        for e in proposal:
+            i = index.get(e["name"], -1)
+            rows.append(r)
+            cat.append(i)
+            if i < 0:
+                tstat.append(0); smins.append(0); emins.append(0)
+                continue
+            st, en = e["start"], e["end"]
+            if st == start_strs[i] and en == end_strs[i]:
+                tstat.append(0); smins.append(cat_starts[i]); emins.append(cat_ends[i])
+                continue
+            sm, em = parse_hhmm(st), parse_hhmm(en)
+            if sm is None or em is None:
+                tstat.append(1); smins.append(0); emins.append(0)
+            else:
+                tstat.append(2 if strict_times else 0); smins.append(sm); emins.append(em)
+
+    row = np.asarray(rows, dtype=np.int64)
+    ci = np.asarray(cat, dtype=np.int64)
+    smin = np.asarray(smins, dtype=np.int64)
+    emin = np.asarray(emins, dtype=np.int64)
+    ts = np.asarray(tstat, dtype=np.int8)
+    known = ci >= 0
+    hallucinated = ~known
+    malformed = known & (ts == 1)
+    mismatch = known & (ts == 2)
+    candidate = known & (ts == 0)
+
+    # Duplicates: anything but the first (row, catalog index) among entries past the time check
+    cand_pos = np.flatnonzero(candidate)
+    first = np.zeros(row.shape[0], dtype=bool)
+    if cand_pos.size:
+        keys = row[cand_pos] * (len(problem) + 1) + ci[cand_pos]
+        _, first_at = np.unique(keys, return_index=True)
+        first[cand_pos[first_at]] = True
+    duplicate = candidate & ~first
+
+    cross = realism.allow_cross_midnight
+    end_norm = np.where(emin < smin, emin + 1440, emin) if cross else emin
+    dur = end_norm - smin
+    nonpositive = first & (dur <= 0)
+    alive = first & ~nonpositive
+    if realism.enforce_day_bounds and not cross:
+        ds = hhmm_to_min(realism.day_start)
+        de = hhmm_to_min(realism.day_end)
+        out_of_bounds = alive & ((smin < ds) | (emin > de))
+    else:
+        out_of_bounds = np.zeros_like(alive)
+    valid = alive & ~out_of_bounds
+
+    # trailing False slot absorbs the -1 index of hallucinated entries
+    prio = np.append(np.asarray(problem.priority, dtype=bool), False)
+    weight = np.where(prio[ci], 2.0, 1.0)
+    base = np.bincount(row[valid], weights=(weight * dur)[valid], minlength=n)
+
+    # Conflicts are checked within groups: the row, or (row, venue) with venue exclusivity
+    vpos = np.flatnonzero(valid)
+    venue_mode = realism.enforce_venue_exclusive
+    group = row
+    if venue_mode:
+        venue = np.asarray(problem.venues, dtype=np.int64)[np.where(known, ci, 0)]
+        group = row * len(problem.capacity) + venue
+    # (group, start, end) sort; min-gap compares neighbours as the scalar loop does
+    order = vpos[np.lexsort((end_norm[vpos], smin[vpos], group[vpos]))]
+    sgrp, srow, sst, sen = group[order], row[order], smin[order], end_norm[order]
+    same = sgrp[1:] == sgrp[:-1]
+    # All overlapping pairs (see utils.intervals.count_overlaps): groups are shifted apart
+    # so the earlier groups cancel out of j - #{ends <= start_j}
+    if order.size:
+        span = int(sen.max() - sst.min()) + 1
+        shift = sgrp * span
+        open_before = np.arange(order.size) - np.searchsorted(np.sort(sen + shift), sst + shift, side="right")
+        overlap_per_row = np.bincount(srow, weights=open_before, minlength=n).astype(np.int64).tolist()
+    else:
+        overlap_per_row = [0] * n
+    mg = realism.min_gap_minutes
+    gap_rows = srow[1:][same & ((sst[1:] - sen[:-1]) < mg)] if mg > 0 else srow[:0]
+    gap_per_row = np.bincount(gap_rows, minlength=n).tolist()
+    if venue_mode and max(problem.capacity, default=1) > 1:
+        # multi-room venues: capacity-aware sweep per proposal (see evals.venues)
+        from .venues import venue_conflicts
+        s_l, e_l, v_l = smin.tolist(), end_norm.tolist(), venue.tolist()
+        per: List[List[int]] = [[] for _ in range(n)]
+        for p in vpos.tolist():
+            per[rows[p]].append(p)
+        for r in range(n):
+            ps = per[r]
+            pairs, gaps = venue_conflicts([(s_l[p], e_l[p]) for p in ps], [v_l[p] for p in ps], problem.capacity, mg)
+            overlap_per_row[r], gap_per_row[r] = len(pairs), gaps
+
+    def per_row(mask_rows):
+        return np.bincount(mask_rows, minlength=n).tolist()
+
+    tallies = {
+        "hallucinated_event": per_row(row[hallucinated]),
+        "time_mismatch": per_row(row[mismatch]),
+        "duplicate_event": per_row(row[duplicate]),
+        "nonpositive_duration": per_row(row[nonpositive]),
+        "out_of_bounds": per_row(row[out_of_bounds]),
+        "overlap": overlap_per_row,
+        "min_gap_violation": gap_per_row,
+        "malformed_time": per_row(row[malformed]),
     }
-    return final_minutes, diag
+    intervals: List[List[tuple[int,int]]] = [[] for _ in range(n)]
+    for r, s_, e_ in zip(row[vpos].tolist(), smin[vpos].tolist(), end_norm[vpos].tolist()):
+        intervals[r].append((s_, e_))
+
+    out: List[tuple[float, dict]] = []
+    for r in range(n):
+        counts = {k: tallies[k][r] for k in PENALTY_FIELDS}
+        base_minutes = float(base[r])
+        penalty_minutes = penalty_minutes_from_counts(counts, penalties)
+        out.append((max(0.0, base_minutes - penalty_minutes), {
+            "base_minutes": base_minutes,
+            "penalty_minutes": penalty_minutes,
+            "overlaps": counts["overlap"],
+            "intervals": intervals[r],
+            "penalty_counts": counts,
+        }))
+    return out
@@ -0,0 +1,67 @@
+"""
+Venue-exclusive conflict checking (`RealismConfig.enforce_venue_exclusive`).
+
+Chosen events are grouped by catalog venue and each venue is swept on its
+own, O(m log m) for its m events, so events in different rooms never conflict.
+A venue of capacity k hosts k events at once: an event that starts while k
+others of its venue are still running overlaps each of them. With k == 1 that
+is every overlapping pair in the venue, the same pairs `overlapping_pairs` reports.
+
+Min-gap is per venue as well. With one room it is the usual neighbour rule.
+With k rooms, an event violates it if it starts while every room is either busy
+or was freed less than `min_gap` minutes before.
+"""
+import heapq
+from typing import Dict, List, Sequence, Tuple
+from ..utils.intervals import overlapping_pairs
+from .engine import count_min_gap_violations
+
+Interval = Tuple[int, int]
+
+def _sweep(intervals: Sequence[Interval], k: int, min_gap: int) -> Tuple[List[Tuple[int, int]], int]:
+    items = sorted((s, e, p) for p, (s, e) in enumerate(intervals))
+    active: List[Tuple[int, int]] = []   # heap of (end, position) still running
+    freed: List[int] = []                # heap of ends within min_gap before the current start
+    pairs: List[Tuple[int, int]] = []
+    gaps = 0
+    for s, e, p in items:
+        while active and active[0][0] <= s:
+            end, _ = heapq.heappop(active)
+            if min_gap > 0:
+                heapq.heappush(freed, end)
+        while freed and freed[0] + min_gap <= s:
+            heapq.heappop(freed)
+        if len(active) >= k:
+            pairs.extend((q, p) if q < p else (p, q) for _, q in active)
+        elif len(active) + len(freed) >= k:
+            gaps += 1
+        heapq.heappush(active, (e, p))
+    return pairs, gaps
+
+def venue_conflicts(
+    intervals: Sequence[Interval],
+    venues: Sequence[int],
+    capacity: Sequence[int],
+    min_gap: int = 0,
+) -> Tuple[List[Tuple[int, int]], int]:
+    """
+    (overlapping position pairs (i, j), i < j, sorted; min-gap violations) for
+    intervals whose catalog venue ids are `venues`; `capacity` is indexed by venue id.
+    """
+    groups: Dict[int, List[int]] = {}
+    for p, v in enumerate(venues):
+        groups.setdefault(v, []).append(p)
+    pairs: List[Tuple[int, int]] = []
+    gaps = 0
+    for v, pos in groups.items():
+        ints = [intervals[p] for p in pos]
+        k = capacity[v]
+        if k == 1:
+            local = overlapping_pairs(ints)
+            gaps += count_min_gap_violations(ints, min_gap)
+        else:
+            local, g = _sweep(ints, k, min_gap)
+            gaps += g
+        pairs.extend((pos[i], pos[j]) for i, j in local)
+    pairs.sort()
+    return pairs, gaps
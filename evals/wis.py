@@ -0,0 +1,248 @@
+"""
+Weighted interval scheduling solver on NumPy arrays.
+
+Two intervals i, j (i ending first) are compatible when end_i + min_gap <= start_j,
+so min-gap is handled by shifting ends before the predecessor search. Wrapped
+cross-midnight intervals are linearized by extending their end past 1440, the same
+convention the scorer uses for overlaps. Predecessors come from one
+`np.searchsorted`; the DP itself is a single linear pass.
+
+`solve_tracks` generalizes to k parallel tracks (a venue with k rooms) as a
+min-cost flow over the timeline; `wis_catalog` sums per-venue optima when
+`enforce_venue_exclusive` is set.
+"""
+import heapq
+from typing import TYPE_CHECKING, List, Optional, Sequence, Tuple
+import numpy as np
+from ..utils.time_utils import hhmm_to_min
+from ..core.config import RealismConfig
+
+if TYPE_CHECKING:
+    from .problem import ProblemInstance
+
+Intervals = Tuple[np.ndarray, np.ndarray, np.ndarray]  # starts, ends, weights
+
+def catalog_arrays(
+    events: List[List[str]],
+    priority_events: List[str],
+    realism: RealismConfig,
+    problem: Optional["ProblemInstance"] = None,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    (starts, ends, weights, catalog_index) of the events eligible under `realism`:
+    day-bounds filtered, nonpositive durations dropped, wrapped ends extended.
+    With `problem`, its compiled minute arrays are used instead of re-parsing.
+    """
+    if problem is not None:
+        s = np.asarray(problem.starts, dtype=np.int64)
+        e = np.asarray(problem.ends, dtype=np.int64)
+        prio = np.asarray(problem.priority, dtype=bool)
+    else:
+        s = np.fromiter((hhmm_to_min(ev[1]) for ev in events), dtype=np.int64, count=len(events))
+        e = np.fromiter((hhmm_to_min(ev[2]) for ev in events), dtype=np.int64, count=len(events))
+        pset = set(priority_events)
+        prio = np.fromiter((ev[0] in pset for ev in events), dtype=bool, count=len(events))
+    n = len(s)
+    cross = realism.allow_cross_midnight
+    keep = np.ones(n, dtype=bool)
+    if realism.enforce_day_bounds and not cross:
+        keep &= (s >= hhmm_to_min(realism.day_start)) & (e <= hhmm_to_min(realism.day_end))
+    if cross:
+        e = np.where(e < s, e + 1440, e)
+    keep &= e > s
+    idx = np.flatnonzero(keep)
+    s, e = s[idx], e[idx]
+    w = np.where(prio[idx], 2.0, 1.0) * (e - s)
+    return s, e, w, idx
+
+def _dp(starts: np.ndarray, ends: np.ndarray, weights: np.ndarray, min_gap: int):
+    """Sort by end, find predecessors, run the DP. Returns (order, pred, M)."""
+    order = np.argsort(ends, kind="stable")
+    s, e, w = starts[order], ends[order], weights[order]
+    # pred[j] = last i (in end order) with e_i + gap <= s_j, or -1
+    pred = np.searchsorted(e + min_gap, s, side="right") - 1
+    n = len(order)
+    M = [0.0] * (n + 1)
+    wl = w.tolist()
+    pl = (pred + 1).tolist()
+    for j in range(n):
+        take = wl[j] + M[pl[j]]
+        skip = M[j]
+        M[j+1] = take if take > skip else skip
+    return order, pl, wl, M
+
+def solve(
+    starts: np.ndarray,
+    ends: np.ndarray,
+    weights: np.ndarray,
+    *,
+    min_gap: int = 0,
+    with_selection: bool = False,
+) -> Tuple[float, Optional[np.ndarray]]:
+    """
+    Maximum total weight of pairwise-compatible intervals. With `with_selection`,
+    also returns the positions (into the input arrays) of one optimal set, in time order.
+    """
+    starts = np.asarray(starts, dtype=np.int64)
+    ends = np.asarray(ends, dtype=np.int64)
+    weights = np.asarray(weights, dtype=np.float64)
+    if len(starts) == 0:
+        return 0.0, (np.zeros(0, dtype=np.int64) if with_selection else None)
+    order, pl, wl, M = _dp(starts, ends, weights, int(min_gap))
+    if not with_selection:
+        return M[-1], None
+    chosen = []
+    j = len(order)
+    while j > 0:
+        if wl[j-1] + M[pl[j-1]] >= M[j-1]:
+            chosen.append(j - 1)
+            j = pl[j-1]
+        else:
+            j -= 1
+    return M[-1], order[np.asarray(chosen[::-1], dtype=np.int64)]
+
+def solve_batch(catalogs: Sequence[Intervals], *, min_gap: int = 0) -> np.ndarray:
+    """
+    Optima of many independent catalogs in one call. Catalogs are laid end to end
+    with time offsets large enough that every interval of catalog c is compatible
+    with all of catalog c-1, so one DP over the concatenation yields running sums
+    whose differences at catalog boundaries are the per-catalog optima.
+    """
+    k = len(catalogs)
+    if k == 0:
+        return np.zeros(0, dtype=np.float64)
+    lens = np.fromiter((len(c[0]) for c in catalogs), dtype=np.int64, count=k)
+    if lens.sum() == 0:
+        return np.zeros(k, dtype=np.float64)
+    s = np.concatenate([np.asarray(c[0], dtype=np.int64) for c in catalogs])
+    e = np.concatenate([np.asarray(c[1], dtype=np.int64) for c in catalogs])
+    w = np.concatenate([np.asarray(c[2], dtype=np.float64) for c in catalogs])
+    span = int(e.max() - s.min()) + int(min_gap) + 1
+    owner = np.repeat(np.arange(k, dtype=np.int64), lens)
+    shift = owner * span
+    order, _, _, M = _dp(s + shift, e + shift, w, int(min_gap))
+    # M after the last interval of each catalog (in end order, catalogs stay contiguous)
+    last_pos = np.cumsum(np.bincount(owner[order], minlength=k))
+    running = np.asarray(M, dtype=np.float64)[last_pos]
+    return np.diff(running, prepend=0.0)
+
+def solve_tracks(
+    starts: np.ndarray,
+    ends: np.ndarray,
+    weights: np.ndarray,
+    k: int,
+    *,
+    min_gap: int = 0,
+    with_selection: bool = False,
+) -> Tuple[float, Optional[np.ndarray]]:
+    """
+    Maximum total weight of intervals that fit on `k` parallel tracks, where two
+    intervals on one track need end + min_gap <= next start. Min-cost flow of k
+    units along the timeline: time points are nodes joined by free arcs of
+    capacity k, and each interval is a capacity-1 arc from its start to its
+    end + min_gap with cost -weight. The graph is a DAG, so initial potentials
+    come from one forward pass; each of the at most k augmentations is a
+    Dijkstra on reduced costs, O(k (n + T) log T) for T distinct time points.
+    With k == 1 this equals `solve`.
+    """
+    starts = np.asarray(starts, dtype=np.int64)
+    ends = np.asarray(ends, dtype=np.int64) + int(min_gap)
+    weights = np.asarray(weights, dtype=np.float64)
+    n = len(starts)
+    if n == 0 or k <= 0:
+        return 0.0, (np.zeros(0, dtype=np.int64) if with_selection else None)
+    if k == 1:
+        return solve(starts, ends - int(min_gap), weights, min_gap=min_gap, with_selection=with_selection)
+    times = np.unique(np.concatenate([starts, ends]))
+    T = len(times)
+    su = np.searchsorted(times, starts).tolist()
+    eu = np.searchsorted(times, ends).tolist()
+
+    # residual graph: arc a and its reverse a ^ 1
+    to: List[int] = []
+    cap: List[int] = []
+    cost: List[float] = []
+    adj: List[List[int]] = [[] for _ in range(T)]
+    def arc(u: int, v: int, c: int, w: float) -> None:
+        adj[u].append(len(to)); to.append(v); cap.append(c); cost.append(w)
+        adj[v].append(len(to)); to.append(u); cap.append(0); cost.append(-w)
+    for t in range(T - 1):
+        arc(t, t + 1, k, 0.0)
+    first_event = len(to)
+    for u, v, w in zip(su, eu, weights.tolist()):
+        arc(u, v, 1, -w)
+
+    # potentials: shortest distances in the initial DAG (arcs only go forward in time)
+    pot = [0.0] * T
+    for u in range(T):
+        for a in adj[u]:
+            if cap[a] > 0 and pot[u] + cost[a] < pot[to[a]]:
+                pot[to[a]] = pot[u] + cost[a]
+    INF = float("inf")
+    sink = T - 1
+    total = 0.0
+    for _ in range(k):
+        dist = [INF] * T
+        via = [-1] * T
+        dist[0] = 0.0
+        heap = [(0.0, 0)]
+        while heap:
+            d, u = heapq.heappop(heap)
+            if d > dist[u]:
+                continue
+            pu = pot[u]
+            for a in adj[u]:
+                if cap[a] > 0:
+                    v = to[a]
+                    nd = d + cost[a] + pu - pot[v]
+                    if nd < dist[v] - 1e-9:
+                        dist[v] = nd
+                        via[v] = a
+                        heapq.heappush(heap, (nd, v))
+        path_cost = dist[sink] + pot[sink] - pot[0]
+        if dist[sink] == INF or path_cost >= -1e-9:
+            break  # the remaining units ride the free timeline arcs
+        dt = dist[sink]
+        for v in range(T):
+            pot[v] += min(dist[v], dt)
+        v = sink
+        while v != 0:
+            a = via[v]
+            cap[a] -= 1
+            cap[a ^ 1] += 1
+            v = to[a ^ 1]
+        total -= path_cost
+    if not with_selection:
+        return total, None
+    chosen = [j for j in range(n) if cap[first_event + 2 * j] == 0]
+    chosen.sort(key=lambda j: (starts[j], ends[j]))
+    return total, np.asarray(chosen, dtype=np.int64)
+
+def wis_catalog(
+    events: List[List[str]],
+    priority_events: List[str],
+    realism: RealismConfig,
+    problem: Optional["ProblemInstance"] = None,
+) -> Tuple[float, List[int]]:
+    """Optimum under `realism` (min-gap aware) and catalog indices of one optimal set."""
+    s, e, w, idx = catalog_arrays(events, priority_events, realism, problem)
+    gap = realism.min_gap_minutes
+    if not realism.enforce_venue_exclusive:
+        value, sel = solve(s, e, w, min_gap=gap, with_selection=True)
+        return float(value), idx[sel].tolist()
+    if problem is None:
+        from .problem import ProblemInstance
+        problem = ProblemInstance(events, priority_events)
+    # venues are independent: solve each on its own tracks and merge the selections
+    venue = np.asarray(problem.venues, dtype=np.int64)[idx]
+    by_venue = np.argsort(venue, kind="stable")
+    bounds = np.flatnonzero(np.diff(venue[by_venue])) + 1
+    value, picked = 0.0, []
+    for grp in np.split(by_venue, bounds) if len(by_venue) else []:
+        k = problem.capacity[int(venue[grp[0]])]
+        v, sel = solve_tracks(s[grp], e[grp], w[grp], k, min_gap=gap, with_selection=True)
+        value += v
+        picked.append(grp[sel])
+    sel = np.concatenate(picked) if picked else np.zeros(0, dtype=np.int64)
+    sel = sel[np.lexsort((e[sel], s[sel]))]
+    return float(value), idx[sel].tolist()
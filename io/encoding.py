@@ -0,0 +1,104 @@
+"""
+Prompt and answer encodings.
+
+Catalog (user prompt):
+- "text":  the dataset's human-readable listing, unchanged;
+- "table": one CSV row per event, `id,name,start,end,priority` (plus `venue`
+  when the catalog has venues).
+
+Expected schedule (model output):
+- "full":    JSON/XML entries with name, start and end;
+- "indexed": `{"schedule":[3,7,12]}`, ids from the table. Needs the "table" catalog.
+  The parser returns `{"index": i}` entries, which `ProblemInstance.resolve`
+  maps back to catalog entries before validation.
+"""
+import csv
+import io
+import json
+from typing import Any, Callable, Dict, Iterable, List, Literal, Optional
+
+CatalogFormat = Literal["text", "table"]
+OutputFormat = Literal["full", "indexed"]
+CATALOG_FORMATS = ("text", "table")
+OUTPUT_FORMATS = ("full", "indexed")
+
+SYSTEM_INDEXED = (
+    "You are a scheduling assistant. Given a table of events (id,name,start,end,priority), "
+    "return ONLY the ids of the events to attend, in start order:\n"
+    'JSON: {"schedule":[id, ...]}\n'
+    "Use only listed ids, avoid overlaps, honor day bounds. /no_think"
+)
+
+def check_formats(catalog_format: str, output_format: str) -> None:
+    if catalog_format not in CATALOG_FORMATS:
+        raise ValueError(f"catalog_format must be one of {CATALOG_FORMATS}, got {catalog_format!r}")
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"output_format must be one of {OUTPUT_FORMATS}, got {output_format!r}")
+    if output_format == "indexed" and catalog_format != "table":
+        raise ValueError("output_format='indexed' needs catalog_format='table' (the ids are listed there)")
+
+def catalog_table(events: List[List[str]], priority_events: List[str]) -> str:
+    """CSV listing with a header row; ids are positions in `events`."""
+    pset = set(priority_events)
+    venues = any(len(e) > 3 for e in events)
+    buf = io.StringIO()
+    w = csv.writer(buf, lineterminator="\n")
+    w.writerow(("id", "name", "start", "end", "priority") + (("venue",) if venues else ()))
+    for i, e in enumerate(events):
+        row = (i, e[0], e[1], e[2], int(e[0] in pset))
+        w.writerow(row + ((e[3] if len(e) > 3 else "",) if venues else ()))
+    return buf.getvalue()
+
+def user_prompt(ex: Dict[str, Any], catalog_format: CatalogFormat = "text") -> str:
+    if catalog_format == "text":
+        return ex["prompt"]
+    return (
+        "Create an optimized schedule from the events below. "
+        "Priority events (priority=1) count double.\n\n" + catalog_table(ex["events"], ex["priority_events"])
+    )
+
+def system_prompt(base: str, output_format: OutputFormat = "full") -> str:
+    return base if output_format == "full" else SYSTEM_INDEXED
+
+def render_schedule(schedule: List[Dict[str, str]], events: List[List[str]], output_format: OutputFormat = "full") -> str:
+    """The answer a model would emit for `schedule` (catalog entries as schedule dicts)."""
+    if output_format == "indexed":
+        ids = {tuple(e[:3]): i for i, e in enumerate(events)}
+        return json.dumps({"schedule": [ids[(e["name"], e["start"], e["end"])] for e in schedule]})
+    return json.dumps({"schedule": schedule})
+
+def approx_tokens(text: str) -> int:
+    """About 4 characters per token; pass a real tokenizer's count where it matters."""
+    return (len(text) + 3) // 4
+
+def token_report(
+    examples: Iterable[Dict[str, Any]],
+    system_prompts: Dict[str, str],
+    *,
+    count_tokens: Optional[Callable[[str], int]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Mean prompt and answer tokens per example for each valid (catalog, output)
+    pair. `examples` are raw rows (events, priority_events, prompt); the answer
+    is the DP-optimal schedule rendered in each output format. `system_prompts`
+    maps output format -> system prompt.
+    """
+    from ..core.config import RealismConfig
+    from ..evals.problem import ProblemInstance
+
+    count = count_tokens or approx_tokens
+    realism = RealismConfig(enforce_day_bounds=False)
+    combos = [(c, o) for c in CATALOG_FORMATS for o in OUTPUT_FORMATS if not (o == "indexed" and c != "table")]
+    sums = {k: [0, 0] for k in combos}
+    n = 0
+    for ex in examples:
+        n += 1
+        best = ProblemInstance(ex["events"], ex["priority_events"]).optimal_schedule(realism)
+        for c, o in combos:
+            sums[(c, o)][0] += count(system_prompts[o]) + count(user_prompt(ex, c))
+            sums[(c, o)][1] += count(render_schedule(best, ex["events"], o))
+    return [
+        {"catalog": c, "output": o, "examples": n,
+         "prompt_tokens": p / max(1, n), "answer_tokens": a / max(1, n), "total_tokens": (p + a) / max(1, n)}
+        for (c, o), (p, a) in sums.items()
+    ]
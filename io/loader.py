@@ -1,28 +1,56 @@
+import hashlib
 import json
-from typing import Literal
-from datasets import load_dataset
-from ..evals.rubric import EventSchedulingRubric
-from ..core.config import EventRubricConfig, MultiTurnConfig
-from ..core.env_singleturn import EventSchedulingEnv, SYSTEM as SYSTEM_SINGLE
-from ..core.env_multiturn import EventSchedulingMultiTurnEnv, SYSTEM as SYSTEM_MULTI
-
-def _map_example(ex, system_prompt: str):
+import os
+import shutil
+import tempfile
+from dataclasses import asdict
+from functools import partial
+from pathlib import Path
+from typing import Any, Dict, Literal, Optional, Union
+from ..evals.precompute import add_optimum_column, attach_optimum_sidecar, solve_example
+from ..evals.problem import realism_id
+from ..core.config import EventRubricConfig, MultiTurnConfig, RealismConfig
+from .encoding import CatalogFormat, OutputFormat, check_formats, system_prompt as encoded_system_prompt, user_prompt
+from .store import ResultStore
+from .synthetic import SyntheticConfig, iter_examples
+
+DATASET_ID = "anakin87/events-scheduling"
+# Bump when _map_example's output changes so stale prepared splits are ignored.
+_PREP_VERSION = 1
+
+# `datasets`, verifiers and the envs are imported on first use, so importing
+# this module (or anything in evals/io) stays cheap for scoring workers.
+def load_dataset(*args, **kwargs):
+    from datasets import load_dataset
+    return load_dataset(*args, **kwargs)
+
+def load_from_disk(*args, **kwargs):
+    from datasets import load_from_disk
+    return load_from_disk(*args, **kwargs)
+
+def _map_example(ex, system_prompt: str, catalog_format: CatalogFormat = "text"):
     # Dataset fields expected:
     # ex["events"]: [[name,start,end], ...]
     # ex["priority_events"]: [name,...]
     # ex["optimal_score"]: int (weighted minutes), may be None
     # ex["prompt"]: human-readable listing
-    user_prompt = ex["prompt"]
+    # ex["dp_optimum"]: optional, from evals.precompute
+    # ex["venue_capacity"]: optional {venue: rooms}, for 4-column [name,start,end,venue] catalogs
     messages = [
         {"role": "system", "content": system_prompt},
-        {"role": "user", "content": user_prompt},
+        {"role": "user", "content": user_prompt(ex, catalog_format)},
     ]
     ex["prompt"] = messages
-    ex["answer"] = json.dumps({
+    info = {
         "events": ex["events"],
         "priority_events": ex["priority_events"],
         "optimal_score": ex.get("optimal_score", None),
-    })
+    }
+    if ex.get("dp_optimum"):
+        info["dp_optimum"] = ex["dp_optimum"]
+    if ex.get("venue_capacity"):
+        info["venue_capacity"] = ex["venue_capacity"]
+    ex["answer"] = json.dumps(info)
     return ex
 
 def _holdout(train_split, desired_test: int = 100, seed: int = 42):
@@ -34,36 +62,265 @@ def _holdout(train_split, desired_test: int = 100, seed: int = 42):
 def _maybe_select(ds, n: int):
     return ds if n == -1 else ds.select(range(min(n, len(ds))))
 
-def load_environment(
-    num_train_examples: int = -1,
-    num_eval_examples: int = -1,
-    normalize_with_optimal: Literal["dataset","dp","none"]="dataset",
-    strict: bool = True,
-    allow_reasoning_tag: bool = True,
-    realism_min_gap: int = 0,
-    realism_enforce_bounds: bool = True,
+def _default_cache_dir() -> Path:
+    root = os.environ.get("EVENTS_ENV_CACHE") or os.path.join(os.path.expanduser("~"), ".cache", "events_env")
+    return Path(root) / "prepared"
+
+def _dataset_revision() -> Optional[str]:
+    """Current commit of DATASET_ID on the Hub, or None when it cannot be asked (offline, no hub client)."""
+    try:
+        from huggingface_hub import HfApi
+        return HfApi().dataset_info(DATASET_ID, timeout=10).sha
+    except Exception:
+        return None
+
+def _prep_key(system_prompt: str, num_train_examples: int, num_eval_examples: int, **extra) -> str:
+    spec = {
+        "version": _PREP_VERSION,
+        "dataset": DATASET_ID,
+        "system_prompt": system_prompt,
+        "num_train": num_train_examples,
+        "num_eval": num_eval_examples,
+        "holdout_seed": 42,
+        **extra,
+    }
+    return hashlib.sha256(json.dumps(spec, sort_keys=True).encode()).hexdigest()[:24]
+
+def _prepare_splits(
+    system_prompt: str,
+    num_train_examples: int,
+    num_eval_examples: int,
+    *,
+    num_proc: Optional[int] = None,
+    cache_dir: Optional[str] = None,
+    use_cache: bool = True,
+    optimum_realism: Optional[RealismConfig] = None,
+    optimum_sidecar: Optional[str] = None,
+    catalog_format: CatalogFormat = "text",
 ):
-    ds = load_dataset("anakin87/events-scheduling")
+    """
+    Load, trim and map the train/eval splits. Selection happens before mapping,
+    the mapper is a picklable partial (stable datasets fingerprint, num_proc-safe),
+    and the prepared splits are persisted as Arrow under a key of the system
+    prompt, sizes and dataset revision (the Hub commit, which is also what gets
+    loaded), so a warm start loads them without reading the source and an
+    upstream update is never served stale. When the revision cannot be looked
+    up, the source is loaded and its fingerprint keys the cache instead.
+    With `optimum_realism` (or an `optimum_sidecar` file), each answer also
+    carries the precomputed DP optimum and optimal schedule.
+    """
+    extra = {}
+    if optimum_sidecar:
+        st = os.stat(optimum_sidecar)
+        extra["optimum_sidecar"] = [os.path.abspath(optimum_sidecar), st.st_size, st.st_mtime_ns]
+    elif optimum_realism is not None:
+        extra["optimum_realism"] = realism_id(optimum_realism)
+    if catalog_format != "text":
+        extra["catalog_format"] = catalog_format
+    root = Path(cache_dir) if cache_dir else _default_cache_dir()
+    revision = _dataset_revision() if use_cache else None
+    ds = None
+    if revision is not None:
+        extra["revision"] = revision
+    elif use_cache:
+        ds = load_dataset(DATASET_ID)
+        extra["fingerprint"] = {name: getattr(split, "_fingerprint", None) for name, split in ds.items()}
+    target = root / _prep_key(system_prompt, num_train_examples, num_eval_examples, **extra)
+    if use_cache and (target / "train").is_dir() and (target / "eval").is_dir():
+        return load_from_disk(str(target / "train")), load_from_disk(str(target / "eval"))
+
+    if ds is None:
+        ds = load_dataset(DATASET_ID, revision=revision)
     train_split = ds.get("train") or ds[list(ds.keys())[0]]
     eval_split = ds.get("test")
     if eval_split is None:
         train_split, eval_split = _holdout(train_split)
 
-    train_split = train_split.map(lambda ex: _map_example(ex, SYSTEM_SINGLE))
-    eval_split  = eval_split.map(lambda ex: _map_example(ex, SYSTEM_SINGLE))
-
     train_split = _maybe_select(train_split, num_train_examples)
     eval_split  = _maybe_select(eval_split,  num_eval_examples)
 
-    from .config import EventRubricConfig, RealismConfig, PenaltiesMinutes
+    if optimum_sidecar:
+        train_split = attach_optimum_sidecar(train_split, optimum_sidecar)
+        eval_split  = attach_optimum_sidecar(eval_split,  optimum_sidecar)
+    elif optimum_realism is not None:
+        train_split = add_optimum_column(train_split, optimum_realism, num_proc=num_proc)
+        eval_split  = add_optimum_column(eval_split,  optimum_realism, num_proc=num_proc)
+
+    mapper = partial(_map_example, system_prompt=system_prompt, catalog_format=catalog_format)
+    train_split = train_split.map(mapper, num_proc=num_proc if num_proc and len(train_split) > 1 else None)
+    eval_split  = eval_split.map(mapper,  num_proc=num_proc if num_proc and len(eval_split) > 1 else None)
+
+    if use_cache:
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = Path(tempfile.mkdtemp(dir=target.parent, prefix=".tmp-"))
+        try:
+            train_split.save_to_disk(str(tmp / "train"))
+            eval_split.save_to_disk(str(tmp / "eval"))
+            os.replace(tmp, target)  # atomic publish; a concurrent writer may win the race
+        except OSError:
+            pass
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+    return train_split, eval_split
+
+# Synthetic eval examples are drawn from an index range disjoint from training.
+_SYNTHETIC_EVAL_OFFSET = 1 << 32
+# Split sizes used for num_*_examples=-1 when a split is materialized.
+_SYNTHETIC_DEFAULT_TRAIN = 1000
+_SYNTHETIC_DEFAULT_EVAL = 100
+def _synthetic_features():
+    from datasets import Features, Sequence, Value
+    return Features({
+        "events": Sequence(Sequence(Value("string"))),
+        "priority_events": Sequence(Value("string")),
+        "prompt": [{"role": Value("string"), "content": Value("string")}],
+        "optimal_score": Value("int64"),
+        "answer": Value("string"),
+    })
+
+def _synthetic_rows(
+    cfg: SyntheticConfig,
+    num_examples: int,
+    start: int,
+    system_prompt: str,
+    optimum_realism: Optional[RealismConfig] = None,
+    catalog_format: CatalogFormat = "text",
+):
+    for ex in iter_examples(cfg, num_examples, start):
+        if optimum_realism is not None:
+            ex["dp_optimum"] = solve_example(ex["events"], ex["priority_events"], optimum_realism, ex.get("venue_capacity"))
+        ex = _map_example(ex, system_prompt, catalog_format)
+        ex.pop("dp_optimum", None)  # carried inside `answer`
+        ex.pop("venue_capacity", None)
+        yield ex
+
+def _synthetic_splits(
+    synthetic: Union[SyntheticConfig, Dict[str, Any]],
+    system_prompt: str,
+    num_train_examples: int,
+    num_eval_examples: int,
+    *,
+    streaming: bool = False,
+    optimum_realism: Optional[RealismConfig] = None,
+    catalog_format: CatalogFormat = "text",
+):
+    """
+    Generated train/eval splits, materialized as Datasets (1000 train and 100
+    eval examples when the size is -1). With `streaming`, train is instead an
+    IterableDataset produced on the fly (endless when num_train_examples is -1);
+    it has no len() or select(), so only consumers that take iterables can use it.
+    """
+    from datasets import Dataset, IterableDataset
+
+    cfg = synthetic if isinstance(synthetic, SyntheticConfig) else SyntheticConfig(**synthetic)
+    features = _synthetic_features()
+    n_eval = _SYNTHETIC_DEFAULT_EVAL if num_eval_examples == -1 else num_eval_examples
+    eval_split = Dataset.from_list(
+        list(_synthetic_rows(cfg, n_eval, _SYNTHETIC_EVAL_OFFSET, system_prompt, optimum_realism, catalog_format)),
+        features=features,
+    )
+    kwargs = {"cfg": cfg, "num_examples": num_train_examples, "start": 0,
+              "system_prompt": system_prompt, "optimum_realism": optimum_realism, "catalog_format": catalog_format}
+    if streaming:
+        train_split = IterableDataset.from_generator(_synthetic_rows, gen_kwargs=kwargs, features=features)
+    else:
+        if num_train_examples == -1:
+            kwargs["num_examples"] = _SYNTHETIC_DEFAULT_TRAIN
+        train_split = Dataset.from_list(list(_synthetic_rows(**kwargs)), features=features)
+    return train_split, eval_split
+
+def _rubric_config(
+    normalize_with_optimal: str,
+    strict: bool,
+    allow_reasoning_tag: bool,
+    realism_min_gap: int,
+    realism_enforce_bounds: bool,
+    output_format: str = "full",
+) -> EventRubricConfig:
     cfg = EventRubricConfig(
         normalize_with_optimal=normalize_with_optimal,
         strict_times=strict,
         allow_reasoning_tag=allow_reasoning_tag,
+        output_format=output_format,
     )
     # realism toggles from args
     cfg.realism.min_gap_minutes = int(realism_min_gap)
     cfg.realism.enforce_day_bounds = bool(realism_enforce_bounds)
+    return cfg
+
+def _result_store(results_dir: Optional[str], kind: str, system_prompt: str, cfg: EventRubricConfig, **extra):
+    """ResultStore keyed by everything that changes a rollout or its reward (model and sampling args are added per call)."""
+    if not results_dir:
+        return None
+    return ResultStore(results_dir, {"env": kind, "system_prompt": system_prompt, "rubric": asdict(cfg), **extra})
+
+def _load_splits(
+    system_prompt: str,
+    num_train_examples: int,
+    num_eval_examples: int,
+    cfg: EventRubricConfig,
+    *,
+    num_proc: Optional[int],
+    cache_dir: Optional[str],
+    use_cache: bool,
+    precompute_optimum: bool,
+    optimum_sidecar: Optional[str],
+    synthetic: Optional[Union[SyntheticConfig, Dict[str, Any]]],
+    synthetic_streaming: bool,
+    catalog_format: CatalogFormat,
+):
+    optimum_realism = cfg.realism if precompute_optimum else None
+    if synthetic is not None:
+        if optimum_sidecar:
+            raise ValueError("optimum_sidecar applies to the hub dataset, not to synthetic data")
+        return _synthetic_splits(
+            synthetic, system_prompt, num_train_examples, num_eval_examples,
+            streaming=synthetic_streaming, optimum_realism=optimum_realism, catalog_format=catalog_format,
+        )
+    return _prepare_splits(
+        system_prompt, num_train_examples, num_eval_examples,
+        num_proc=num_proc, cache_dir=cache_dir, use_cache=use_cache,
+        optimum_realism=optimum_realism, optimum_sidecar=optimum_sidecar, catalog_format=catalog_format,
+    )
+
+def load_environment(
+    num_train_examples: int = -1,
+    num_eval_examples: int = -1,
+    normalize_with_optimal: Literal["dataset","dp","none"]="dataset",
+    strict: bool = True,
+    allow_reasoning_tag: bool = True,
+    realism_min_gap: int = 0,
+    realism_enforce_bounds: bool = True,
+    stream: bool = False,
+    group_choices: int = 0,
+    retry_attempts: int = 0,
+    num_proc: Optional[int] = None,
+    cache_dir: Optional[str] = None,
+    use_cache: bool = True,
+    precompute_optimum: bool = False,
+    optimum_sidecar: Optional[str] = None,
+    synthetic: Optional[Union[SyntheticConfig, Dict[str, Any]]] = None,
+    synthetic_streaming: bool = False,
+    catalog_format: CatalogFormat = "text",
+    output_format: OutputFormat = "full",
+    compact_state: bool = False,
+    spill_path: Optional[str] = None,
+    results_dir: Optional[str] = None,
+):
+    from ..core.client import RetryPolicy
+    from ..core.env_singleturn import EventSchedulingEnv, SYSTEM as SYSTEM_SINGLE
+    from ..evals.rubric import EventSchedulingRubric
+
+    check_formats(catalog_format, output_format)
+    cfg = _rubric_config(normalize_with_optimal, strict, allow_reasoning_tag, realism_min_gap, realism_enforce_bounds,
+                         output_format)
+    system_prompt = encoded_system_prompt(SYSTEM_SINGLE, output_format)
+    train_split, eval_split = _load_splits(
+        system_prompt, num_train_examples, num_eval_examples, cfg,
+        num_proc=num_proc, cache_dir=cache_dir, use_cache=use_cache,
+        precompute_optimum=precompute_optimum, optimum_sidecar=optimum_sidecar,
+        synthetic=synthetic, synthetic_streaming=synthetic_streaming, catalog_format=catalog_format,
+    )
 
     rubric = EventSchedulingRubric(cfg)
 
@@ -71,9 +328,16 @@ def load_environment(
         dataset=train_split,
         eval_dataset=eval_split,
         parser=None,
-        system_prompt=SYSTEM_SINGLE,
+        system_prompt=system_prompt,
         rubric=rubric,
         message_type="chat",
+        stream=stream,
+        group_choices=group_choices,
+        retry=RetryPolicy(max_attempts=retry_attempts) if retry_attempts > 1 else None,
+        compact_state=compact_state,
+        spill_path=spill_path,
+        store=_result_store(results_dir, "single", system_prompt, cfg, catalog_format=catalog_format,
+                            stream=stream, group_choices=group_choices),
     )
     return env
 
@@ -86,36 +350,52 @@ def load_environment_multiturn(
     realism_min_gap: int = 0,
     realism_enforce_bounds: bool = True,
     max_turns: int = 3,
+    compact_history: bool = False,
+    num_proc: Optional[int] = None,
+    cache_dir: Optional[str] = None,
+    use_cache: bool = True,
+    precompute_optimum: bool = False,
+    optimum_sidecar: Optional[str] = None,
+    synthetic: Optional[Union[SyntheticConfig, Dict[str, Any]]] = None,
+    synthetic_streaming: bool = False,
+    catalog_format: CatalogFormat = "text",
+    output_format: OutputFormat = "full",
+    compact_state: bool = False,
+    spill_path: Optional[str] = None,
+    results_dir: Optional[str] = None,
 ):
-    ds = load_dataset("anakin87/events-scheduling")
-    train_split = ds.get("train") or ds[list(ds.keys())[0]]
-    eval_split = ds.get("test")
-    if eval_split is None:
-        train_split, eval_split = _holdout(train_split)
-
-    train_split = train_split.map(lambda ex: _map_example(ex, SYSTEM_MULTI))
-    eval_split  = eval_split.map(lambda ex: _map_example(ex, SYSTEM_MULTI))
-
-    train_split = _maybe_select(train_split, num_train_examples)
-    eval_split  = _maybe_select(eval_split,  num_eval_examples)
+    from ..core.env_multiturn import EventSchedulingMultiTurnEnv, SYSTEM as SYSTEM_MULTI
+    from ..evals.rubric import EventSchedulingRubric
 
-    from .config import EventRubricConfig
-    cfg = EventRubricConfig(
-        normalize_with_optimal=normalize_with_optimal,
-        strict_times=strict,
-        allow_reasoning_tag=allow_reasoning_tag,
+    check_formats(catalog_format, output_format)
+    cfg = _rubric_config(normalize_with_optimal, strict, allow_reasoning_tag, realism_min_gap, realism_enforce_bounds,
+                         output_format)
+    system_prompt = encoded_system_prompt(SYSTEM_MULTI, output_format)
+    train_split, eval_split = _load_splits(
+        system_prompt, num_train_examples, num_eval_examples, cfg,
+        num_proc=num_proc, cache_dir=cache_dir, use_cache=use_cache,
+        precompute_optimum=precompute_optimum, optimum_sidecar=optimum_sidecar,
+        synthetic=synthetic, synthetic_streaming=synthetic_streaming, catalog_format=catalog_format,
     )
+
     rubric = EventSchedulingRubric(cfg)
+    mt = MultiTurnConfig(max_turns=max_turns, compact_history=compact_history,
+                         compact_state=compact_state, spill_path=spill_path)
 
     env = EventSchedulingMultiTurnEnv(
         dataset=train_split,
         eval_dataset=eval_split,
         parser=None,
-        system_prompt=SYSTEM_MULTI,
+        system_prompt=system_prompt,
         rubric=rubric,
-        max_turns=max_turns,
+        max_turns=mt.max_turns,
         message_type="chat",
-        feedback_role="user",
-        stop_early_on_clean=True,
+        feedback_role=mt.feedback_role,
+        stop_early_on_clean=mt.stop_early_on_clean,
+        compact_history=mt.compact_history,
+        compact_state=mt.compact_state,
+        spill_path=mt.spill_path,
+        store=_result_store(results_dir, "multi", system_prompt, cfg, catalog_format=catalog_format,
+                            max_turns=mt.max_turns, compact_history=mt.compact_history),
     )
     return env
@@ -1,5 +1,27 @@
 import json, re, xml.etree.ElementTree as ET
-from typing import Optional, List, Dict
+from bisect import bisect_left, bisect_right
+from typing import Any, NamedTuple, Optional, List, Dict, Tuple, Union
+from ..utils.metrics import METRICS
+from .schedule import Schedule
+
+try:  # optional fast JSON backend
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    orjson = None
+    _loads = None
+
+_JSON = json.JSONDecoder()
+_MAX_CANDIDATES = 8  # payload starts tried per format before giving up
+_JSON_TOKENS = re.compile(r'\\.|["{}\[\]]', re.S)  # escapes, quotes and brackets
+
+Parsed = Union[Schedule, List[Dict[str,Any]]]
+
+class ScheduleMatch(NamedTuple):
+    schedule: Parsed          # Schedule, or {"index": i} entries for an indexed payload
+    path: str                 # "json" | "xml"
+    fenced: bool              # payload sat inside a ``` code fence
+    span: Tuple[int,int]      # [start, end) of the decoded payload in the text
 
 def strip_fences_and_maybe_think(text: str, allow_reasoning_tag: bool) -> str:
     s = text.strip()
@@ -12,19 +34,96 @@ def strip_fences_and_maybe_think(text: str, allow_reasoning_tag: bool) -> str:
         s = re.sub(r"(?s)^<think>.*?</think>\s*", "", s)
     return s.strip()
 
-def parse_schedule_any(text: str, allow_reasoning_tag: bool) -> Optional[List[Dict[str,str]]]:
+def _schedule_from_json(obj: Any, output_format: str = "full") -> Optional[Parsed]:
+    items = obj["schedule"]
+    # indexed form {"schedule":[3,7,12]}: ids into the catalog, resolved by ProblemInstance.resolve.
+    # Only when asked for: in full mode it would skip the name and time checks.
+    if items and all(type(e) is int for e in items):
+        return [{"index": e} for e in items] if output_format == "indexed" else None
+    for e in items:
+        if not isinstance(e, dict) or not ("name" in e and "start" in e and "end" in e):
+            return None
+    # decode straight into columns
+    return Schedule.from_columns(
+        [str(e["name"]) for e in items], [str(e["start"]) for e in items], [str(e["end"]) for e in items],
+    )
+
+def _schedule_from_xml(root: ET.Element) -> Optional[Schedule]:
+    names, starts, ends = [], [], []
+    for ev in root.findall(".//event"):
+        name = (ev.findtext("name") or "").strip()
+        start = (ev.findtext("start") or "").strip()
+        end = (ev.findtext("end") or "").strip()
+        if not (name and start and end):
+            return None
+        names.append(name); starts.append(start); ends.append(end)
+    return Schedule.from_columns(names, starts, ends) if names else None
+
+def _decode_at(text: str, brace: int) -> Tuple[Any, int]:
+    """JSON value starting at `brace` and the index just past it; (None, -1) if none."""
+    if _loads is not None:
+        tail = text[brace:]
+        try:
+            return _loads(tail), brace + len(tail.rstrip())
+        except ValueError as e:
+            # trailing prose: the decoder stopped where the value ends; decode just that span
+            span = tail[:getattr(e, "pos", 0)].rstrip()
+            if span:
+                try:
+                    return _loads(span), brace + len(span)
+                except ValueError:
+                    pass
+    try:
+        return _JSON.raw_decode(text, brace)
+    except ValueError:
+        return None, -1
+
+def _scan_json(text: str, lo: int, hi: int, output_format: str = "full") -> Optional[Tuple[Optional[Parsed], int, int]]:
+    """Decode the last object holding a "schedule" key that starts in [lo, hi)."""
+    key = text.rfind('"schedule"', lo, hi)
+    tries = 0
+    while key != -1 and tries < _MAX_CANDIDATES:
+        # usual case: `{"schedule"` -- otherwise walk back to enclosing braces
+        brace = text.rfind("{", lo, key)
+        while brace != -1 and tries < _MAX_CANDIDATES:
+            tries += 1
+            obj, end = _decode_at(text, brace)
+            if end > key and isinstance(obj, dict) and isinstance(obj.get("schedule"), list):
+                return _schedule_from_json(obj, output_format), brace, end
+            if text[brace+1:key].strip() == "":
+                break  # `{` directly before the key failed: this key is not a payload
+            brace = text.rfind("{", lo, brace)
+        key = text.rfind('"schedule"', lo, key)
+    return None
+
+def _scan_xml(text: str, lo: int, hi: int) -> Optional[Tuple[Optional[Parsed], int, int]]:
+    """Decode the last <schedule>...</schedule> element that starts in [lo, hi)."""
+    open_at = text.rfind("<schedule", lo, hi)
+    tries = 0
+    while open_at != -1 and tries < _MAX_CANDIDATES:
+        tries += 1
+        nxt = text[open_at+9:open_at+10]
+        close_at = text.find("</schedule>", open_at) if nxt in (">", " ", "\n", "\t", "\r") else -1
+        if close_at != -1:
+            end = close_at + len("</schedule>")
+            try:
+                root = ET.fromstring(text[open_at:end])
+            except ET.ParseError:
+                root = None
+            if root is not None:
+                return _schedule_from_xml(root), open_at, end
+        open_at = text.rfind("<schedule", lo, open_at)
+    return None
+
+def _parse_legacy(text: str, allow_reasoning_tag: bool, output_format: str = "full") -> Optional[Tuple[Optional[Parsed], str]]:
+    """Whole-document parse of the (fence/think-stripped) text; returns (schedule, path)."""
     s = strip_fences_and_maybe_think(text, allow_reasoning_tag)
 
     # Try JSON: {"schedule":[{"name":..., "start":"HH:MM","end":"HH:MM"}, ...]}
     try:
         obj = json.loads(s)
         if isinstance(obj, dict) and isinstance(obj.get("schedule"), list):
-            out = []
-            for e in obj["schedule"]:
-                if not all(k in e for k in ("name","start","end")):
-                    return None
-                out.append({"name": str(e["name"]), "start": str(e["start"]), "end": str(e["end"])})
-            return out
+            return _schedule_from_json(obj, output_format), "json"
     except Exception:
         pass
 
@@ -33,17 +132,288 @@ def parse_schedule_any(text: str, allow_reasoning_tag: bool) -> Optional[List[Di
     try:
         root = ET.fromstring(s)
         if root.tag.lower() == "schedule":
-            out = []
-            for ev in root.findall(".//event"):
-                name = (ev.findtext("name") or "").strip()
-                start = (ev.findtext("start") or "").strip()
-                end = (ev.findtext("end") or "").strip()
-                if not (name and start and end):
-                    return None
-                out.append({"name": name, "start": start, "end": end})
-            if out:
-                return out
+            return _schedule_from_xml(root), "xml"
     except Exception:
         pass
 
     return None
+
+def extract_schedule(text: str, allow_reasoning_tag: bool, output_format: str = "full") -> Optional[ScheduleMatch]:
+    """
+    Locate and decode the last JSON or XML schedule payload in `text`.
+    Only the payload span is decoded, so cost is linear in the text and does not
+    grow with failed full-document parses on long reasoning traces. With
+    `allow_reasoning_tag`, everything up to the last `</think>` is skipped;
+    without it, a leading `<think>` block makes the output invalid. Indexed
+    payloads (`{"schedule":[3,7]}`) are accepted only with `output_format="indexed"`.
+    """
+    lo = 0
+    if allow_reasoning_tag:
+        k = text.rfind("</think>")
+        if k != -1:
+            lo = k + len("</think>")
+    elif text.lstrip().startswith("<think>"):
+        return None
+
+    hi = len(text)
+    j = _scan_json(text, lo, hi, output_format)
+    x = _scan_xml(text, lo, hi)
+    if j is not None and (x is None or j[1] > x[1]):
+        (sched, start, end), path = j, "json"
+    elif x is not None:
+        (sched, start, end), path = x, "xml"
+    else:
+        # Uncommon shapes (e.g. <Schedule>) go through the whole-document parse
+        if "schedule" not in text.lower():
+            return None
+        legacy = _parse_legacy(text[lo:], allow_reasoning_tag, output_format)
+        if legacy is None or legacy[0] is None:
+            return None
+        return ScheduleMatch(legacy[0], legacy[1], "```" in text[lo:], (lo, hi))
+
+    if sched is None:
+        return None
+    fenced = text.count("```", lo, start) % 2 == 1
+    return ScheduleMatch(sched, path, fenced, (start, end))
+
+def payload_kind(text: str) -> str:
+    """Which format `text` seems to attempt ("json", "xml" or "none"), for failure accounting."""
+    j = text.rfind('"schedule"')
+    x = text.lower().rfind("<schedule")
+    if j == -1 and x == -1:
+        return "none"
+    return "json" if j > x else "xml"
+
+def parse_schedule_any(text: str, allow_reasoning_tag: bool, output_format: str = "full") -> Optional[Parsed]:
+    if not METRICS.enabled:
+        m = extract_schedule(text, allow_reasoning_tag, output_format)
+        return m.schedule if m is not None else None
+    with METRICS.timer("parse_seconds"):
+        m = extract_schedule(text, allow_reasoning_tag, output_format)
+    if m is None:
+        METRICS.incr("parse_failures_total", format=payload_kind(text))
+        return None
+    METRICS.incr("parses_total", format=m.path)
+    return m.schedule
+
+class IncrementalScheduleDetector:
+    """
+    Fed streamed completion text chunk by chunk; `feed` returns True once a
+    complete, parseable JSON or XML schedule has closed. Work per chunk is
+    proportional to the chunk: chunks are kept in a list (never re-concatenated),
+    each is scanned with a few characters of overlap, JSON payloads are tracked
+    with a brace/string state machine, and only the span of a closed candidate
+    (outer object, or `<schedule ...>...</schedule>`) is decoded. A `"schedule"`
+    key that is not the first one is traced back to its enclosing brace, as in
+    `extract_schedule`. A leading `<think>` block is skipped when allowed. `text`
+    joins the chunks on demand.
+    """
+    __slots__ = ("allow_reasoning_tag", "output_format", "match", "end", "_parts", "_starts", "_n", "_lo", "_in_think",
+                 "_tail", "_pos", "_sig", "_obj_start", "_depth", "_in_str", "_esc", "_xml_opens", "_fences",
+                 "_braces")
+
+    def __init__(self, allow_reasoning_tag: bool = True, output_format: str = "full"):
+        self.allow_reasoning_tag = allow_reasoning_tag
+        self.output_format = output_format
+        self.match: Optional[ScheduleMatch] = None
+        self.end = -1              # index just past the closed payload
+        self._parts: List[str] = []
+        self._starts: List[int] = []   # offset of each part in the text
+        self._n = 0
+        self._tail = ""            # last characters fed, for needles split across chunks
+        self._lo = 0               # detection starts here (after </think>)
+        self._in_think: Optional[bool] = None
+        self._pos = 0              # JSON state machine has consumed text[:_pos]
+        self._sig = (-1, "")       # last non-space character before _pos (at or after _lo)
+        self._obj_start = -1
+        self._depth = 0
+        self._in_str = False
+        self._esc = False
+        self._xml_opens: List[int] = []
+        self._fences: List[int] = []
+        self._braces: List[int] = []   # every `{` at or after _lo, for keys that are not first
+
+    @property
+    def done(self) -> bool:
+        return self.match is not None
+
+    @property
+    def text(self) -> str:
+        if len(self._parts) > 1:
+            self._parts, self._starts = ["".join(self._parts)], [0]
+        return self._parts[0] if self._parts else ""
+
+    def _slice(self, a: int, b: int) -> str:
+        """text[a:b], joined from the parts it spans."""
+        a = max(a, 0)
+        if a >= b:
+            return ""
+        s0 = self._starts[-1]
+        if a >= s0:
+            return self._parts[-1][a - s0:b - s0]
+        k = bisect_right(self._starts, a) - 1
+        out = []
+        while k < len(self._parts) and self._starts[k] < b:
+            s0 = self._starts[k]
+            out.append(self._parts[k][max(0, a - s0):b - s0])
+            k += 1
+        return "".join(out)
+
+    def feed(self, chunk: str) -> bool:
+        if self.match is not None:
+            return True
+        if not chunk:
+            return False
+        start, tail = self._n, self._tail
+        self._parts.append(chunk)
+        self._starts.append(start)
+        self._n += len(chunk)
+        # recent text: the chunk plus enough overlap for a needle split across chunks
+        recent = tail + chunk
+        self._tail = recent[-len("</schedule>"):]
+        if self._in_think is None:
+            head = self._slice(0, self._n).lstrip()
+            if len(head) < len("<think>") and "<think>".startswith(head):
+                return False
+            self._in_think = self.allow_reasoning_tag and head.startswith("<think>")
+        if self._in_think:
+            k = recent.find("</think>")
+            if k == -1:
+                return False
+            self._in_think = False
+            self._lo = self._pos = start = start - len(tail) + k + len("</think>")
+        if "{" in chunk:
+            off = self._n - len(chunk)
+            j = chunk.find("{", max(0, self._lo - off))
+            while j != -1:
+                self._braces.append(off + j)
+                j = chunk.find("{", j + 1)
+        # _pos is never further back than the overlap
+        base = max(self._lo, min(self._pos, start - len("</schedule>")))
+        window = recent[len(recent) - (self._n - base):]
+        return self._scan_xml(window, base, start) or self._scan_json(window, base)
+
+    @staticmethod
+    def _found(needle: str, window: str, base: int, start: int) -> List[int]:
+        """Positions of `needle` in `window` (text from `base`) for occurrences ending after `start`."""
+        out, k = [], window.find(needle, max(0, start - base - len(needle) + 1))
+        while k != -1:
+            out.append(base + k)
+            k = window.find(needle, k + len(needle))
+        return out
+
+    def _accept(self, sched: Optional[Parsed], path: str, begin: int, end: int) -> bool:
+        if sched is None:
+            return False
+        fenced = sum(1 for f in self._fences if f < begin) % 2 == 1
+        self.match, self.end = ScheduleMatch(sched, path, fenced, (begin, end)), end
+        return True
+
+    def _scan_xml(self, window: str, base: int, start: int) -> bool:
+        if "`" in window:
+            self._fences += self._found("```", window, base, start)
+        if "<" not in window:
+            return False
+        opens = self._found("<schedule", window, base, start)
+        if opens:
+            self._xml_opens = (self._xml_opens + opens)[-_MAX_CANDIDATES:]
+        for close_at in self._found("</schedule>", window, base, start):
+            end = close_at + len("</schedule>")
+            for open_at in reversed(self._xml_opens):
+                if open_at >= close_at or self._slice(open_at + 9, open_at + 10) not in (">", " ", "\n", "\t", "\r"):
+                    continue
+                try:
+                    root = ET.fromstring(self._slice(open_at, end))
+                except ET.ParseError:
+                    continue
+                if self._accept(_schedule_from_xml(root), "xml", open_at, end):
+                    return True
+                break
+        return False
+
+    def _decode_candidate(self, end: int) -> bool:
+        span = self._slice(self._obj_start, end)
+        obj, stop = _decode_at(span, 0)
+        if stop != len(span) or not isinstance(obj, dict) or not isinstance(obj.get("schedule"), list):
+            return False
+        return self._accept(_schedule_from_json(obj, self.output_format), "json", self._obj_start, end)
+
+    def _scan_json(self, text: str, base: int) -> bool:
+        i, n = self._pos - base, len(text)
+        while i < n:
+            if self._obj_start == -1:
+                # jump to the next object that opens with the "schedule" key
+                key = text.find('"schedule"', i)
+                if key == -1:
+                    # keep a tail so a key split across chunks is still found
+                    self._advance(base, text, max(i, n - len('"schedule"') + 1))
+                    return False
+                before = text[i:key].rstrip()
+                sig = (base + i + len(before) - 1, before[-1]) if before else self._sig
+                brace = sig[0] if sig[1] == "{" else -1
+                if sig[1] == ",":
+                    # a later key needs the walk back to its brace: only if a colon follows
+                    after = text[key + 10:key + 42].lstrip()[:1]
+                    if not after and n - key <= len("</schedule>"):
+                        self._advance(base, text, key)  # colon not streamed yet
+                        return False
+                    if after in (":", ""):
+                        brace = self._enclosing(base + key)
+                if brace == -1:
+                    self._advance(base, text, key + 1)
+                    i = key + 1
+                    continue
+                self._obj_start, self._depth, self._in_str, self._esc = brace, 1, False, False
+                i = key
+            c = text[i]
+            if self._in_str:
+                if self._esc:
+                    self._esc = False
+                elif c == "\\":
+                    self._esc = True
+                elif c == '"':
+                    self._in_str = False
+            elif c == '"':
+                self._in_str = True
+            elif c == "{" or c == "[":
+                self._depth += 1
+            elif c == "}" or c == "]":
+                self._depth -= 1
+                if self._depth == 0:
+                    if self._decode_candidate(base + i + 1):
+                        self._pos = base + i + 1
+                        return True
+                    self._obj_start = -1
+                    self._advance(base, text, i + 1)
+            i += 1
+        self._advance(base, text, n)
+        return False
+
+    def _enclosing(self, key: int) -> int:
+        """Start of the object holding `key` as a top-level key, trying the nearest braces first; -1 if none."""
+        k = bisect_left(self._braces, key)
+        for brace in reversed(self._braces[max(0, k - _MAX_CANDIDATES):k]):
+            depth, in_str = 0, False
+            for m in _JSON_TOKENS.finditer(self._slice(brace, key)):
+                c = m.group()
+                if in_str:
+                    in_str = c != '"'
+                elif c == '"':
+                    in_str = True
+                elif c == "{" or c == "[":
+                    depth += 1
+                elif c == "}" or c == "]":
+                    depth -= 1
+                    if depth == 0:
+                        break  # closed before the key
+            if depth == 1 and not in_str:
+                return brace
+        return -1
+
+    def _advance(self, base: int, text: str, i: int) -> None:
+        """Mark text[:base + i] consumed, remembering its last non-space character."""
+        k = max(0, self._pos - base)
+        done = text[k:i].rstrip()
+        if done:
+            self._sig = (base + k + len(done) - 1, done[-1])
+        self._pos = base + i
@@ -0,0 +1,145 @@
+"""
+Compact schedule representation.
+
+`Schedule` holds a proposal as parallel columns: event names plus int32 start and
+end minutes. Times that are not canonical `HH:MM` strings (malformed, `9:05`,
+padded) get code -1, and their original strings are kept in `raw` so strict
+time checks and reports see exactly what the model wrote. Catalog indices are
+resolved once per ProblemInstance with `bind()`.
+
+It still reads as the old list of `{"name", "start", "end"}` dicts: indexing,
+iteration and `==` against such a list work, and `as_dicts()` returns one.
+"""
+import weakref
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from ..utils.time_utils import HHMM_STRINGS, HHMM_TABLE
+
+NONCANONICAL = -1
+
+class Schedule:
+    __slots__ = ("names", "starts", "ends", "raw", "_bound")
+
+    def __init__(self, names: Optional[List[str]] = None, starts: Optional[array] = None,
+                 ends: Optional[array] = None, raw: Optional[Dict[int, Tuple[str, str]]] = None):
+        self.names: List[str] = names if names is not None else []
+        self.starts: array = starts if starts is not None else array("i")
+        self.ends: array = ends if ends is not None else array("i")
+        self.raw: Dict[int, Tuple[str, str]] = raw if raw is not None else {}  # position -> original (start, end)
+        self._bound: Optional[Tuple[weakref.ref, array]] = None
+
+    def append(self, name: str, start: str, end: str) -> None:
+        s, e = HHMM_TABLE.get(start, NONCANONICAL), HHMM_TABLE.get(end, NONCANONICAL)
+        if s == NONCANONICAL or e == NONCANONICAL:
+            self.raw[len(self.names)] = (start, end)
+        self.names.append(name)
+        self.starts.append(s)
+        self.ends.append(e)
+
+    @classmethod
+    def from_columns(cls, names: List[str], starts: List[str], ends: List[str]) -> "Schedule":
+        """Bulk constructor from parallel string columns (the parsers' fast path)."""
+        get = HHMM_TABLE.get
+        sc = [get(s, NONCANONICAL) for s in starts]
+        ec = [get(e, NONCANONICAL) for e in ends]
+        raw = {}
+        if NONCANONICAL in sc or NONCANONICAL in ec:
+            raw = {p: (starts[p], ends[p]) for p in range(len(names)) if sc[p] == NONCANONICAL or ec[p] == NONCANONICAL}
+        return cls(names, array("i", sc), array("i", ec), raw)
+
+    @classmethod
+    def from_triples(cls, triples: Iterable[Tuple[str, str, str]]) -> "Schedule":
+        rows = list(triples)
+        return cls.from_columns([t[0] for t in rows], [t[1] for t in rows], [t[2] for t in rows])
+
+    @classmethod
+    def from_dicts(cls, entries: Iterable[Dict[str, Any]]) -> "Schedule":
+        return cls.from_triples((str(e["name"]), str(e["start"]), str(e["end"])) for e in entries)
+
+    def start_str(self, pos: int) -> str:
+        s = self.starts[pos]
+        return HHMM_STRINGS[s] if s != NONCANONICAL else self.raw[pos][0]
+
+    def end_str(self, pos: int) -> str:
+        e = self.ends[pos]
+        return HHMM_STRINGS[e] if e != NONCANONICAL else self.raw[pos][1]
+
+    def triples(self) -> Iterator[Tuple[str, str, str]]:
+        """(name, start, end) strings per entry; canonical times come from a shared table."""
+        raw = self.raw
+        for pos, (nm, s, e) in enumerate(zip(self.names, self.starts, self.ends)):
+            if pos in raw:
+                yield (nm,) + raw[pos]
+            else:
+                yield nm, HHMM_STRINGS[s], HHMM_STRINGS[e]
+
+    def bind(self, problem: Any) -> array:
+        """
+        Catalog index of each entry (-1 if unknown), cached for the last problem.
+        The cache holds a weak reference rather than `id(problem)`: memoized
+        schedules outlive evicted problems, whose ids CPython reuses.
+        """
+        b = self._bound
+        if b is None or b[0]() is not problem:
+            get = problem.index.get
+            b = self._bound = (weakref.ref(problem), array("i", [get(nm, -1) for nm in self.names]))
+        return b[1]
+
+    def __getstate__(self):
+        return self.names, self.starts, self.ends, self.raw  # the binding is not picklable, and rebuilt on demand
+
+    def __setstate__(self, state) -> None:
+        self.names, self.starts, self.ends, self.raw = state
+        self._bound = None
+
+    def take(self, positions: Sequence[int]) -> "Schedule":
+        """The entries at `positions`, in that order."""
+        names, starts, ends, raw = self.names, self.starts, self.ends, self.raw
+        return Schedule([names[p] for p in positions], array("i", [starts[p] for p in positions]),
+                        array("i", [ends[p] for p in positions]),
+                        {k: raw[p] for k, p in enumerate(positions) if p in raw} if raw else {})
+
+    def copy(self) -> "Schedule":
+        return Schedule(self.names[:], self.starts[:], self.ends[:], dict(self.raw))
+
+    def key(self) -> tuple:
+        """Hashable identity of the entries, in order."""
+        return (tuple(self.names), self.starts.tobytes(), self.ends.tobytes(), tuple(sorted(self.raw.items())))
+
+    def as_dicts(self) -> List[Dict[str, str]]:
+        return [{"name": n, "start": s, "end": e} for n, s, e in self.triples()]
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __iter__(self) -> Iterator[Dict[str, str]]:
+        for n, s, e in self.triples():
+            yield {"name": n, "start": s, "end": e}
+
+    def __getitem__(self, pos):
+        if isinstance(pos, slice):
+            return self.take(range(len(self.names))[pos])
+        if pos < 0:
+            pos += len(self.names)
+        return {"name": self.names[pos], "start": self.start_str(pos), "end": self.end_str(pos)}
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, Schedule):
+            return self.key() == other.key()
+        if isinstance(other, (list, tuple)):
+            return len(other) == len(self) and all(
+                isinstance(d, dict) and (d.get("name"), d.get("start"), d.get("end")) == t
+                for d, t in zip(other, self.triples())
+            )
+        return NotImplemented
+
+    __hash__ = None  # mutable, like the list it replaces
+
+    def __repr__(self) -> str:
+        return f"Schedule({self.as_dicts()!r})"
+
+def triples(proposal: Any) -> Iterator[Tuple[str, str, str]]:
+    """(name, start, end) of each entry of a Schedule or a list of schedule dicts."""
+    if isinstance(proposal, Schedule):
+        return proposal.triples()
+    return ((e["name"], e["start"], e["end"]) for e in proposal)
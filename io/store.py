@@ -0,0 +1,222 @@
+"""
+Append-only store of finished rollouts, for resumable evaluation runs.
+
+Records are keyed by (example id, repetition, config hash):
+- example id: content hash of the prompt and answer;
+- repetition: the rollout's global index, i.e. its position in the `a_generate`
+  inputs plus `rollout_offset` (pass the shard's start when workers split a
+  run), so it does not depend on which process runs it or in what order.
+  Direct `rollout()` calls without an index fall back to a per-process count;
+- config hash: the store's base config (env settings) plus model and sampling args.
+
+Each process appends to its own segment file (`segment-<host>-<pid>-<rand>.jsonl`),
+one JSON line per rollout written with a single `write`, so concurrent workers
+never interleave. Readers merge all segments and skip a torn last line left by
+a crash. Envs given a store return recorded rollouts instead of calling the model.
+
+A rollout is recorded as soon as it finishes, without a reward. Its reward is
+appended as a short line of its own once the env's normal scoring pass has run
+(`record_rewards`), so nothing is scored twice. On resume the stored reward
+rides along in `state["stored_reward"]` and the rubric returns it as is.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import socket
+import threading
+import uuid
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+from ..utils.metrics import METRICS
+from .schedule import Schedule
+
+Key = Tuple[str, int, str]
+
+def _digest(obj: Any, n: int = 16) -> str:
+    return hashlib.sha1(json.dumps(obj, sort_keys=True, default=str).encode("utf-8", "surrogatepass")).hexdigest()[:n]
+
+def _as_json(obj: Any) -> Any:
+    if isinstance(obj, Schedule):
+        return obj.as_dicts()
+    raise TypeError(f"{type(obj).__name__} is not JSON serializable")
+
+def _as_json_or_str(obj: Any) -> Any:
+    return obj.as_dicts() if isinstance(obj, Schedule) else str(obj)
+
+def example_id(prompt: Any, answer: Any) -> str:
+    return _digest([prompt, answer])
+
+def jsonable_state(state: Dict[str, Any]) -> Dict[str, Any]:
+    """The JSON-serializable part of a rollout state; responses are kept as compact records."""
+    from ..core.records import record_response
+
+    out: Dict[str, Any] = {}
+    for k, v in state.items():
+        if k == "responses":
+            out[k] = [record_response(r).to_dict() for r in v]
+            continue
+        try:
+            json.dumps(v, default=_as_json)
+        except (TypeError, ValueError):
+            continue
+        out[k] = v
+    return out
+
+class ResultStore:
+    def __init__(self, root: str, config: Any = None):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.config_hash = _digest(config)
+        self._lock = threading.Lock()
+        self._segment = self.root / f"segment-{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}.jsonl"
+        self._fd: Optional[int] = None
+        self._reps: Dict[Tuple[str, str], int] = {}
+        self._records: Dict[Key, Dict[str, Any]] = self._load()
+
+    def _scan(self) -> Iterator[Tuple[Key, Dict[str, Any]]]:
+        for seg in sorted(self.root.glob("segment-*.jsonl")):
+            with open(seg, "rb") as f:
+                for line in f:
+                    try:
+                        rec = json.loads(line)
+                        yield (rec["example_id"], int(rec["rep"]), rec["config_hash"]), rec
+                    except (ValueError, KeyError, TypeError):
+                        continue  # torn or foreign line
+
+    def _load(self) -> Dict[Key, Dict[str, Any]]:
+        records: Dict[Key, Dict[str, Any]] = {}
+        rewards: Dict[Key, Any] = {}
+        for key, rec in self._scan():
+            if "completion" in rec:
+                records[key] = rec
+            else:  # reward line, possibly in another process's segment
+                rewards[key] = rec.get("reward")
+        for key, reward in rewards.items():
+            if key in records:
+                records[key]["reward"] = reward
+        return records
+
+    def run_hash(self, model: str, sampling_args: Optional[Dict[str, Any]]) -> str:
+        return _digest([self.config_hash, model, sampling_args or {}])
+
+    def claim(self, prompt: Any, answer: Any, model: str, sampling_args: Optional[Dict[str, Any]] = None,
+              rep: Optional[int] = None) -> Key:
+        """Key of rollout `rep` of this example; without one, of the next rollout of it in this process."""
+        eid, cfg = example_id(prompt, answer), self.run_hash(model, sampling_args)
+        if rep is None:
+            with self._lock:
+                rep = self._reps.get((eid, cfg), 0)
+                self._reps[(eid, cfg)] = rep + 1
+        return eid, rep, cfg
+
+    def get(self, key: Key) -> Optional[Dict[str, Any]]:
+        return self._records.get(key)
+
+    def __contains__(self, key: Key) -> bool:
+        return key in self._records
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def _append(self, rec: Dict[str, Any]) -> None:
+        data = (json.dumps(rec, default=_as_json_or_str) + "\n").encode("utf-8", "surrogatepass")
+        if self._fd is None:
+            self._fd = os.open(self._segment, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        n = os.write(self._fd, data)
+        if n < len(data):  # rare short write: finish it before anyone else appends
+            os.write(self._fd, data[n:])
+
+    def put(self, key: Key, completion: Any, state: Dict[str, Any], reward: Optional[float] = None) -> Dict[str, Any]:
+        eid, rep, cfg = key
+        rec = {"example_id": eid, "rep": rep, "config_hash": cfg, "reward": reward,
+               "completion": completion, "state": jsonable_state(state)}
+        with self._lock:
+            self._append(rec)
+            self._records[key] = rec
+        return rec
+
+    def put_reward(self, key: Key, reward: float) -> None:
+        """Record the reward of an already stored rollout."""
+        eid, rep, cfg = key
+        with self._lock:
+            self._append({"example_id": eid, "rep": rep, "config_hash": cfg, "reward": reward})
+            if key in self._records:
+                self._records[key]["reward"] = reward
+
+    def refresh(self) -> int:
+        """Pick up records appended by other processes; returns the record count."""
+        records = self._load()
+        with self._lock:
+            records.update(self._records)
+            self._records = records
+        return len(records)
+
+    def records(self) -> List[Dict[str, Any]]:
+        return list(self._records.values())
+
+    def close(self) -> None:
+        with self._lock:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+
+async def run_or_resume(
+    store: ResultStore,
+    rollout: Callable[[], Awaitable[Tuple[Any, Dict[str, Any]]]],
+    *,
+    prompt: Any,
+    answer: Any,
+    model: str,
+    sampling_args: Optional[Dict[str, Any]] = None,
+    rep: Optional[int] = None,
+) -> Tuple[Any, Dict[str, Any]]:
+    """
+    The recorded rollout for this (example, repetition, config) if the store has
+    one; otherwise run `rollout()` and record it. Either way `state["store_key"]`
+    names the record, for `record_rewards` once the rollout has been scored.
+    """
+    key = store.claim(prompt, answer, model, sampling_args, rep)
+    rec = store.get(key)
+    if rec is not None:
+        METRICS.incr("resumed_rollouts_total")
+        return rec["completion"], dict(rec["state"], resumed=True, stored_reward=rec["reward"], store_key=list(key))
+    completion, state = await rollout()
+    store.put(key, completion, state)
+    state["store_key"] = list(key)
+    return completion, state
+
+async def run_indexed(
+    rollout: Callable[..., Awaitable[Tuple[Any, Dict[str, Any]]]],
+    prompts: Sequence[Any],
+    answers: Sequence[Any],
+    tasks: Sequence[str],
+    infos: Sequence[Dict[str, Any]],
+    *,
+    offset: int = 0,
+    max_concurrent: int = -1,
+) -> List[Tuple[Any, Dict[str, Any]]]:
+    """
+    `rollout(prompt, answer, task, info, rollout_index=offset + i)` for every input,
+    at most `max_concurrent` at a time; what the envs' `run_rollouts` does with a store.
+    """
+    sem = asyncio.Semaphore(max_concurrent) if max_concurrent > 0 else None
+
+    async def one(i: int) -> Tuple[Any, Dict[str, Any]]:
+        if sem is None:
+            return await rollout(prompts[i], answers[i], tasks[i], infos[i], rollout_index=offset + i)
+        async with sem:
+            return await rollout(prompts[i], answers[i], tasks[i], infos[i], rollout_index=offset + i)
+
+    return list(await asyncio.gather(*(one(i) for i in range(len(prompts)))))
+
+def record_rewards(store: ResultStore, states: List[Dict[str, Any]], rewards: List[float]) -> int:
+    """Append the rewards of scored rollouts whose records lack one; returns how many were written."""
+    n = 0
+    for state, reward in zip(states, rewards):
+        key = state.get("store_key")
+        if key is None or (state.get("resumed") and state.get("stored_reward") is not None):
+            continue
+        store.put_reward((key[0], int(key[1]), key[2]), reward)
+        n += 1
+    return n
@@ -0,0 +1,123 @@
+"""
+Offline, seeded generator of scheduling instances in the dataset's schema
+(`events`, `priority_events`, `prompt`, `optimal_score`).
+
+Example `i` of a config is a pure function of (seed, i), so streams are
+reproducible, resumable and can be sharded by index range without coordination.
+
+    cfg = SyntheticConfig(num_events=500, overlap_density=4.0, cross_midnight_share=0.05)
+    ex = generate_example(cfg, 0)
+"""
+import random
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional
+from ..core.config import RealismConfig
+from ..utils.time_utils import hhmm_to_min
+
+@dataclass(slots=True)
+class SyntheticConfig:
+    num_events: int = 12
+    overlap_density: float = 1.5         # target mean number of other events each event overlaps
+    priority_ratio: float = 0.25
+    cross_midnight_share: float = 0.0    # fraction of events that wrap past 24:00
+    min_duration: int = 15
+    max_duration: int = 120
+    day_start: str = "08:00"
+    day_end: str = "22:00"
+    num_venues: int = 0                  # > 0: each event gets a venue ("Room k") as a 4th column
+    venue_capacity: int = 1              # parallel events each venue hosts (`answer["venue_capacity"]`)
+    seed: int = 0
+
+_TOPICS = ("Python", "Data", "Cloud", "Design", "Product", "Security", "Mobile", "Research", "Ops", "Growth",
+           "Yoga", "Jazz", "Chess", "Film", "Poetry", "Robotics", "History", "Cooking", "Startup", "Climate")
+_KINDS = ("Workshop", "Talk", "Panel", "Meetup", "Lab", "Keynote", "Session", "Clinic", "Showcase", "Roundtable")
+
+def _hhmm(m: int) -> str:
+    m %= 1440
+    return f"{m // 60:02d}:{m % 60:02d}"
+
+def format_prompt(events: List[List[str]], priority_events: List[str], venue_capacity: int = 0) -> str:
+    lines = ["Create an optimized schedule from the events below."]
+    if venue_capacity:
+        lines.append(f"Events in different venues may run in parallel; each venue hosts at most {venue_capacity} at a time.")
+    lines += ["", "Events:"]
+    lines += [f"- {e[0]} ({e[1]} - {e[2]})" + (f" @ {e[3]}" if len(e) > 3 else "") for e in events]
+    lines += ["", "Priority events:"]
+    lines += [f"- {name}" for name in priority_events] or ["- (none)"]
+    return "\n".join(lines)
+
+def _optimal_score(
+    events: List[List[str]], priority_events: List[str], cross: bool, venue_capacity: Optional[Dict[str, int]] = None,
+) -> int:
+    from ..evals.wis import catalog_arrays, solve, wis_catalog
+    realism = RealismConfig(enforce_day_bounds=False, allow_cross_midnight=cross)
+    if events and len(events[0]) > 3:
+        from ..evals.problem import ProblemInstance
+        realism.enforce_venue_exclusive = True
+        problem = ProblemInstance(events, priority_events, venue_capacity=venue_capacity)
+        return int(wis_catalog(events, priority_events, realism, problem)[0])
+    s, e, w, _ = catalog_arrays(events, priority_events, realism)
+    return int(solve(s, e, w)[0])
+
+def generate_example(cfg: SyntheticConfig, index: int) -> Dict[str, Any]:
+    """
+    One instance. Events are placed uniformly in a window sized so each event
+    overlaps about `overlap_density` others (capped at the day), a
+    `cross_midnight_share` of them start late enough to wrap past midnight, and
+    `optimal_score` is the exact DP optimum (wrapped events count when present).
+    With `num_venues`, events are spread over rooms and `optimal_score` is the
+    venue-exclusive optimum (per-room, `venue_capacity` tracks each).
+    """
+    rng = random.Random(f"{cfg.seed}:{index}")
+    n = max(0, cfg.num_events)
+    ds, de = hhmm_to_min(cfg.day_start), hhmm_to_min(cfg.day_end)
+    lo, hi = max(1, cfg.min_duration), max(cfg.min_duration, cfg.max_duration)
+    mean_dur = (lo + hi) / 2
+    # uniform starts in a window W give about 2 * mean_dur * (n - 1) / W overlaps per event
+    if cfg.overlap_density > 0 and n > 1:
+        window = int(2 * mean_dur * (n - 1) / cfg.overlap_density)
+    else:
+        window = de - ds
+    window = max(hi, min(window, de - ds))
+    w0 = ds + rng.randrange(max(1, de - ds - window + 1))
+
+    events: List[List[str]] = []
+    used = set()
+    for i in range(n):
+        dur = rng.randint(lo, hi)
+        if rng.random() < cfg.cross_midnight_share:
+            start = rng.randint(1440 - dur + 1, 1439)
+        else:
+            start = rng.randint(w0, max(w0, w0 + window - dur))
+        name = f"{rng.choice(_TOPICS)} {rng.choice(_KINDS)}"
+        if name in used:
+            name = f"{name} {i + 1}"
+        used.add(name)
+        events.append([name, _hhmm(start), _hhmm(start + dur)])
+    events.sort(key=lambda e: e[1])
+
+    k = int(round(cfg.priority_ratio * n))
+    priority = sorted(e[0] for e in rng.sample(events, k)) if k else []
+    capacity = None
+    if cfg.num_venues > 0:
+        for e in events:
+            e.append(f"Room {rng.randrange(cfg.num_venues) + 1}")
+        if cfg.venue_capacity > 1:
+            capacity = {f"Room {v + 1}": cfg.venue_capacity for v in range(cfg.num_venues)}
+    ex = {
+        "events": events,
+        "priority_events": priority,
+        "prompt": format_prompt(events, priority, cfg.venue_capacity if cfg.num_venues > 0 else 0),
+        "optimal_score": _optimal_score(events, priority, cfg.cross_midnight_share > 0, capacity),
+    }
+    if capacity:
+        ex["venue_capacity"] = capacity
+    return ex
+
+def iter_examples(cfg: SyntheticConfig, num_examples: int = -1, start: int = 0) -> Iterator[Dict[str, Any]]:
+    """Examples start, start+1, ...; endless when `num_examples` is -1."""
+    i = start
+    stop: Optional[int] = None if num_examples == -1 else start + num_examples
+    while stop is None or i < stop:
+        yield generate_example(cfg, i)
+        i += 1
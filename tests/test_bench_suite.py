@@ -0,0 +1,15 @@
+from events_env.benchmarks.suite import compare, run
+from events_env.benchmarks.synthetic import make_catalog
+
+
+def test_catalog_is_seeded():
+    assert make_catalog(50, seed=3) == make_catalog(50, seed=3)
+    assert make_catalog(50, seed=3) != make_catalog(50, seed=4)
+
+
+def test_run_and_compare_flags_regressions():
+    report = run(quick=True, filter="wis_optimum", repeat=1, min_time=0.0)
+    assert [r["id"] for r in report["results"]] == ["wis_optimum/events=5", "wis_optimum/events=500"]
+    slower = {"results": [dict(report["results"][0], median_us=report["results"][0]["median_us"] * 2)]}
+    assert compare(slower, report, threshold=0.5)[0]["regressed"]
+    assert not compare(report, slower, threshold=0.5)[0]["regressed"]
@@ -0,0 +1,66 @@
+import asyncio
+from types import SimpleNamespace
+import pytest
+from events_env.benchmarks.bench_client import measure
+from events_env.core.client import ChoiceBatcher, RetryPolicy
+
+
+class FakeCompletions:
+    def __init__(self, cap=None, fail=()):
+        self.calls = []
+        self.cap = cap
+        self.fail = list(fail)
+
+    async def create(self, **kw):
+        self.calls.append(kw)
+        if self.fail:
+            raise self.fail.pop(0)
+        n = kw.get("n", 1) if self.cap is None else min(self.cap, kw.get("n", 1))
+        k = len(self.calls)
+        choices = [SimpleNamespace(index=i, message=SimpleNamespace(content=f"call{k}-{i}")) for i in range(n)]
+        return SimpleNamespace(choices=choices)
+
+
+def _client(**kw):
+    return SimpleNamespace(chat=SimpleNamespace(completions=FakeCompletions(**kw)))
+
+
+class StatusError(Exception):
+    def __init__(self, code):
+        self.status_code = code
+
+
+async def _many(batcher, client, k, messages=None, **args):
+    messages = messages or [{"role": "user", "content": "p"}]
+    return await asyncio.gather(*(batcher.create(client, "m", messages, **args) for _ in range(k)))
+
+
+def test_identical_requests_share_one_n_choice_call():
+    client = _client()
+    out = asyncio.run(_many(ChoiceBatcher(max_n=8), client, 8, temperature=1.0))
+    assert [c["n"] for c in client.chat.completions.calls] == [8]
+    assert sorted(r.choices[0].message.content for r in out) == [f"call1-{i}" for i in range(8)]
+    assert all(len(r.choices) == 1 for r in out)
+
+
+def test_batches_split_at_max_n_and_refill_short_responses():
+    client = _client(cap=3)
+    b = ChoiceBatcher(max_n=4)
+    out = asyncio.run(_many(b, client, 6))
+    assert len({r.choices[0].message.content for r in out}) == 6
+    assert b.choices == 6 and sum(len(r.choices) for r in out) == 6
+    assert [c.get("n", 1) for c in client.chat.completions.calls] == [4, 1, 2]
+
+
+def test_retry_on_429_and_5xx_only():
+    policy = RetryPolicy(max_attempts=3, base_delay=0.001)
+    client = _client(fail=[StatusError(429), StatusError(503)])
+    out = asyncio.run(_many(ChoiceBatcher(max_n=2, retry=policy), client, 2))
+    assert len(client.chat.completions.calls) == 3 and len(out) == 2
+    with pytest.raises(StatusError):
+        asyncio.run(_many(ChoiceBatcher(retry=policy), _client(fail=[StatusError(400)]), 1))
+
+
+def test_grouped_rollouts_against_mock_server():
+    res = measure(prompts=2, repeats=4, slots=2, catalog_events=20)
+    assert res["single"]["server_requests"] == 8 and res["grouped"]["server_requests"] == 2
@@ -0,0 +1,58 @@
+import asyncio
+import json
+from datasets import Dataset
+from verifiers import MultiTurnEnv
+from events_env.core.compaction import approx_tokens, compact_messages
+from events_env.core.config import EventRubricConfig
+from events_env.core.env_multiturn import EventSchedulingMultiTurnEnv
+from events_env.evals.rubric import EventSchedulingRubric
+
+EVENTS = [["A","01:00","03:00"], ["B","02:00","04:00"], ["C","04:00","05:00"], ["D","06:00","07:00"]]
+ANSWER = json.dumps({"events": EVENTS, "priority_events": [], "optimal_score": None})
+
+
+def _proposal(names):
+    return {"role": "assistant", "content": json.dumps({"schedule": [
+        {"name": n, "start": s, "end": e} for n, s, e in EVENTS if n in names]})}
+
+
+def test_compact_keeps_prompt_latest_proposal_and_feedback():
+    head = [{"role": "system", "content": "sys"}, {"role": "user", "content": "catalog " * 50}]
+    fb1 = {"role": "user", "content": "Validator feedback:\nIssues:\n- 1 overlap(s) detected: A <-> B\nRevise."}
+    fb2 = {"role": "user", "content": "Your output was not a valid JSON or XML schedule."}
+    fb3 = {"role": "user", "content": "Validator feedback:\nIssues:\n- 1 duplicate(s): ['C']\nRevise."}
+    msgs = head + [_proposal("AB"), fb1, {"role": "assistant", "content": "oops"}, fb2, _proposal("ACC"), fb3]
+    out = compact_messages(msgs)
+    assert out[:2] == head and out[2] == msgs[-2]
+    assert [m["role"] for m in out] == ["system", "user", "assistant", "user"]
+    digest = out[3]["content"]
+    assert "attempt 1: 2 event(s); feedback: 1 overlap(s) detected" in digest
+    assert "attempt 2: no valid schedule; feedback: unparseable output" in digest
+    assert digest.endswith(fb3["content"]) and fb3["content"] == msgs[-1]["content"]
+    assert approx_tokens(out) < approx_tokens(msgs)
+    # nothing to fold yet
+    assert compact_messages(head + [_proposal("AB"), fb1]) == head + [_proposal("AB"), fb1]
+
+
+def test_env_sends_compacted_prompt_and_records_savings(monkeypatch):
+    env = EventSchedulingMultiTurnEnv(
+        dataset=Dataset.from_list([{"prompt": [{"role": "user", "content": "x"}], "answer": ANSWER}]),
+        rubric=EventSchedulingRubric(EventRubricConfig()), max_turns=4, compact_history=True,
+    )
+    msgs = [{"role": "system", "content": "sys"}, {"role": "user", "content": "catalog"}]
+    state = {"answer": ANSWER}
+    for names in ("AB", "ABC"):
+        msgs.append(_proposal(names))
+        fb, state = asyncio.run(env.env_response(msgs, state))
+        msgs += fb
+    assert len(state["prompt_tokens_saved"]) == 2
+    assert state["prompt_tokens_saved"][0] == 0 and state["prompt_tokens_saved"][1] > 0
+    assert [f - c for f, c in zip(state["prompt_tokens_full"], state["prompt_tokens_compact"])] == state["prompt_tokens_saved"]
+
+    seen = {}
+    async def fake_super(self, *args, **kwargs):
+        seen["prompt"] = kwargs["prompt"]
+    monkeypatch.setattr(MultiTurnEnv, "get_model_response", fake_super)
+    asyncio.run(env.get_model_response(client=None, model="m", prompt=msgs))
+    assert len(seen["prompt"]) == 4 and len(msgs) == 6
+    assert seen["prompt"][2] == msgs[4]
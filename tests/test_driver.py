@@ -0,0 +1,101 @@
+import asyncio
+import json
+from datasets import Dataset
+from openai.types.chat import ChatCompletion
+from events_env.core.driver import MultiTurnRolloutDriver
+from events_env.core.env_multiturn import EventSchedulingMultiTurnEnv
+from events_env.core.config import EventRubricConfig
+from events_env.evals.rubric import EventSchedulingRubric
+
+
+EVENTS = [["A","01:00","02:00"], ["B","01:30","03:00"]]
+ANSWER = json.dumps({"events": EVENTS, "priority_events": [], "optimal_score": None})
+BAD = json.dumps({"schedule": [{"name": n, "start": s, "end": e} for n, s, e in EVENTS]})
+GOOD = json.dumps({"schedule": [{"name": "A", "start": "01:00", "end": "02:00"}]})
+
+
+class FakeClient:
+    """Async chat client: overlapping schedule first, clean one after feedback."""
+    def __init__(self, delay=0.02):
+        self.delay = delay
+        self.in_flight = 0
+        self.peak = 0
+        self.first_call_times = []
+        self.chat = self
+        self.completions = self
+
+    async def create(self, model, messages, **kwargs):
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        first = sum(m["role"] == "assistant" for m in messages) == 0
+        if first:
+            self.first_call_times.append(asyncio.get_running_loop().time())
+        await asyncio.sleep(self.delay)
+        self.in_flight -= 1
+        return ChatCompletion.model_validate({
+            "id": "x", "object": "chat.completion", "created": 0, "model": model,
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": BAD if first else GOOD}}],
+        })
+
+
+def _env():
+    ds = Dataset.from_list([{"prompt": [{"role": "user", "content": "x"}], "answer": ANSWER}])
+    return EventSchedulingMultiTurnEnv(dataset=ds, rubric=EventSchedulingRubric(EventRubricConfig()), max_turns=4)
+
+
+def test_driver_bounds_in_flight_and_reports_throughput():
+    client = FakeClient()
+    driver = MultiTurnRolloutDriver(_env(), client, "m", max_in_flight=3, group_siblings=False)
+    prompts = [[{"role": "user", "content": f"p{i}"}] for i in range(10)]
+    results = asyncio.run(driver.run(prompts, [ANSWER] * 10))
+    assert len(results) == 10 and client.peak <= 3
+    completion, state = results[0]
+    assert state["validator_report"]["summary"] == "No issues found."
+    assert completion[-1]["content"] == "Looks good."
+    summary = driver.stats.summary()
+    assert summary["rollouts"] == 10 and summary["turns"] == 20
+    assert summary["rollouts_per_s"] > 0 and summary["queue_wait_max"] > 0
+
+
+def test_driver_groups_siblings_first_turn():
+    client = FakeClient(delay=0.05)
+    driver = MultiTurnRolloutDriver(_env(), client, "m", max_in_flight=4, group_siblings=True)
+    prompts = [[{"role": "user", "content": f"p{i}"}] for i in range(3)]
+    results = asyncio.run(driver.run(prompts, [ANSWER] * 3, repeats=4))
+    assert len(results) == 12 and client.peak <= 4
+    t = client.first_call_times
+    # each group of 4 siblings is dispatched as one burst
+    bursts = [t[i:i + 4] for i in range(0, 12, 4)]
+    assert all(max(b) - min(b) < 0.02 for b in bursts)
+
+
+def test_failed_sibling_hands_back_its_slot():
+    env = _env()
+    setup = env.setup_state
+    failed = []
+
+    def setup_state(state, **kw):
+        if not failed:
+            failed.append(1)
+            raise RuntimeError("boom")
+        return setup(state, **kw)
+
+    env.setup_state = setup_state
+
+    async def go():
+        driver = MultiTurnRolloutDriver(env, FakeClient(delay=0.01), "m", max_in_flight=2, group_siblings=True)
+        prompts = [[{"role": "user", "content": f"p{i}"}] for i in range(3)]
+        try:
+            await driver.run(prompts, [ANSWER] * 3, repeats=2)
+        except RuntimeError:
+            pass
+        # the remaining groups still get their slots and finish
+        for _ in range(100):
+            await asyncio.sleep(0.01)
+            if driver.stats.rollouts == 5:
+                break
+        return driver
+
+    driver = asyncio.run(go())
+    assert failed and driver.stats.rollouts == 5 and driver._slots._value == 2
@@ -0,0 +1,65 @@
+import json
+import pytest
+from events_env.core.config import EventRubricConfig
+from events_env.evals.problem import ProblemInstance
+from events_env.evals.rubric import EventSchedulingRubric
+from events_env.io import loader
+from events_env.io.encoding import catalog_table, check_formats, render_schedule, token_report
+from events_env.io.parsing import parse_schedule_any
+from events_env.io.synthetic import SyntheticConfig, generate_example
+
+EVENTS = [["Keynote, day 1", "09:00", "10:00"], ["Lunch", "12:00", "13:00"], ["Panel", "09:30", "11:00"]]
+ANSWER = json.dumps({"events": EVENTS, "priority_events": ["Lunch"], "optimal_score": 180})
+
+
+def test_table_lists_ids_and_quotes_names():
+    rows = catalog_table(EVENTS, ["Lunch"]).splitlines()
+    assert rows[0] == "id,name,start,end,priority"
+    assert rows[1] == '0,"Keynote, day 1",09:00,10:00,0' and rows[2] == "1,Lunch,12:00,13:00,1"
+
+
+def test_indexed_output_parses_and_scores_like_full():
+    assert parse_schedule_any('ids: ```json\n{"schedule":[0,1]}\n```', True, "indexed") == [{"index": 0}, {"index": 1}]
+    assert parse_schedule_any('{"schedule":[0,{"name":"x"}]}', True, "indexed") is None
+    problem = ProblemInstance(EVENTS, ["Lunch"])
+    full = [{"name": n, "start": s, "end": e} for n, s, e in EVENTS[:2]]
+    assert problem.resolve([{"index": 0}, {"index": 1}]) == full
+    assert problem.resolve([{"index": 7}])[0]["name"] == "#7"
+
+    rubric = EventSchedulingRubric(EventRubricConfig(normalize_with_optimal="none", clip_to_unit=False,
+                                                     output_format="indexed"))
+    texts = ['{"schedule":[0,1]}', json.dumps({"schedule": full}), '{"schedule":[0,2,9]}']
+    rewards = rubric.reward_group(texts, ANSWER)
+    assert rewards == [rubric._reward(t, ANSWER) for t in texts]
+    assert rewards[0] == rewards[1] == 180.0 and rewards[2] == 60 + 90 - 20 - 10  # overlap, unknown id
+
+
+def test_full_mode_rejects_indexed_payload():
+    text = '{"schedule":[0,1]}'
+    assert parse_schedule_any(text, True) is None and parse_schedule_any(text, True, "full") is None
+    rubric = EventSchedulingRubric(EventRubricConfig(normalize_with_optimal="none", clip_to_unit=False))
+    assert rubric._reward(text, ANSWER) == 0.0 and rubric.reward_group([text], ANSWER) == [0.0]
+    # the memo keeps the two modes apart
+    indexed = EventSchedulingRubric(EventRubricConfig(normalize_with_optimal="none", clip_to_unit=False,
+                                                      output_format="indexed"), memo=rubric.memo)
+    assert indexed._reward(text, ANSWER) == 180.0 and rubric._reward(text, ANSWER) == 0.0
+
+
+def test_loader_formats():
+    with pytest.raises(ValueError):
+        check_formats("text", "indexed")
+    env = loader.load_environment(synthetic={"num_events": 6}, num_eval_examples=2, synthetic_streaming=False,
+                                  num_train_examples=2, catalog_format="table", output_format="indexed")
+    sys_msg, user_msg = env.eval_dataset[0]["prompt"]
+    assert '"schedule":[id' in sys_msg["content"] and "id,name,start,end,priority" in user_msg["content"]
+    assert env.rubric.cfg.output_format == "indexed"
+
+
+def test_token_report_prefers_compact_encodings():
+    exs = [generate_example(SyntheticConfig(num_events=40, seed=i), 0) for i in range(3)]
+    rows = {(r["catalog"], r["output"]): r for r in token_report(exs, {"full": "s" * 40, "indexed": "s" * 40})}
+    assert set(rows) == {("text", "full"), ("table", "full"), ("table", "indexed")}
+    assert rows[("table", "indexed")]["answer_tokens"] < rows[("table", "full")]["answer_tokens"]
+    assert rows[("table", "full")]["prompt_tokens"] < rows[("text", "full")]["prompt_tokens"]
+    best = ProblemInstance(exs[0]["events"], exs[0]["priority_events"]).optimal_schedule(EventRubricConfig().realism)
+    assert parse_schedule_any(render_schedule(best, exs[0]["events"], "full"), True) == best
@@ -0,0 +1,52 @@
+import asyncio
+import json
+from datasets import Dataset
+from events_env.core.config import EventRubricConfig, PenaltiesMinutes, RealismConfig
+from events_env.core.env_multiturn import EventSchedulingMultiTurnEnv
+from events_env.evals.conflict_checker import check_conflicts
+from events_env.evals.engine import Evaluation, evaluate_schedule, stashed_evaluation
+from events_env.evals.problem import ProblemInstance
+from events_env.evals.rubric import EventSchedulingRubric
+from events_env.evals.scoring import score_with_penalties
+
+
+EVENTS = [["A","01:00","03:00"], ["B","02:00","04:00"], ["C","04:00","05:00"]]
+ANSWER = json.dumps({"events": EVENTS, "priority_events": ["A"], "optimal_score": None})
+PROP = [{"name":"A","start":"01:00","end":"03:00"},
+        {"name":"B","start":"02:00","end":"04:00"},
+        {"name":"X","start":"06:00","end":"07:00"}]
+
+
+def test_engine_matches_checker_and_scorer():
+    realism = RealismConfig(min_gap_minutes=10)
+    pen = PenaltiesMinutes()
+    ev = evaluate_schedule(PROP, ProblemInstance(EVENTS, ["A"]), strict_times=True, penalties=pen, realism=realism)
+    assert ev.report == check_conflicts(PROP, EVENTS, strict_times=True, min_gap_minutes=10)
+    assert (ev.minutes, ev.diag) == score_with_penalties(PROP, EVENTS, ["A"], strict_times=True,
+                                                         penalties=pen, realism=realism)
+    assert ev.report["not_in_catalog"] == ["X"] and ev.diag["penalty_counts"]["overlap"] == 1
+
+
+def _env():
+    rubric = EventSchedulingRubric(EventRubricConfig(normalize_with_optimal="dp"))
+    ds = Dataset.from_list([{"prompt": [{"role": "user", "content": "x"}], "answer": ANSWER}])
+    return EventSchedulingMultiTurnEnv(dataset=ds, rubric=rubric, max_turns=3), rubric
+
+
+def test_env_state_evaluation_reused_by_rubric():
+    env, rubric = _env()
+    text = json.dumps({"schedule": [{"name": "A", "start": "01:00", "end": "03:00"}]})
+    messages = [{"role": "assistant", "content": text}]
+    _, state = asyncio.run(env.env_response(messages, {"answer": ANSWER}))
+    json.dumps(state)  # plain data only; the Evaluation lives in a side cache
+    ev = stashed_evaluation(state)[0]
+    assert isinstance(ev, Evaluation) and ev.report["summary"] == "No issues found."
+    assert state["evaluation"]["summary"] == "No issues found."
+
+    completion = messages + [{"role": "user", "content": "Looks good."}]
+    expected = rubric._reward(completion, ANSWER)
+    ev.minutes = 0.0  # prove the stored result is what gets used
+    assert rubric._reward(completion, ANSWER, state=state) == 0.0
+    # a different final text is recomputed
+    other = [{"role": "assistant", "content": text + " "}]
+    assert rubric._reward(other, ANSWER, state=state) == expected
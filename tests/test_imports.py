@@ -0,0 +1,18 @@
+from events_env.benchmarks.bench_import import CORE_MODULES, HEAVY, import_profile
+
+
+def test_core_imports_without_heavy_dependencies():
+    for module in CORE_MODULES:
+        _, loaded = import_profile(module)
+        assert not loaded & HEAVY, (module, sorted(loaded & HEAVY))
+
+
+def test_reward_scorer_matches_rubric():
+    from events_env.core.config import EventRubricConfig
+    from events_env.evals.reward import EventScorer
+    from events_env.evals.rubric import EventSchedulingRubric
+
+    answer = '{"events": [["A", "09:00", "10:00"], ["B", "09:30", "11:00"]], "priority_events": ["B"], "optimal_score": 180}'
+    text = '{"schedule": [{"name": "A", "start": "09:00", "end": "10:00"}, {"name": "B", "start": "09:30", "end": "11:00"}]}'
+    cfg = EventRubricConfig()
+    assert EventScorer(cfg)._reward(text, answer) == EventSchedulingRubric(cfg)._reward(text, answer)
@@ -0,0 +1,71 @@
+import asyncio
+import json
+import random
+from datasets import Dataset
+from events_env.core.config import EventRubricConfig, PenaltiesMinutes, RealismConfig
+from events_env.core.env_multiturn import EventSchedulingMultiTurnEnv
+from events_env.evals.engine import evaluate_schedule
+from events_env.evals.incremental import ValidatedSchedule
+from events_env.evals.problem import ProblemInstance
+from events_env.evals.rubric import EventSchedulingRubric
+from events_env.io.synthetic import SyntheticConfig, generate_example
+
+
+def _revise(rng, proposal, events):
+    p = [dict(e) for e in proposal]
+    for _ in range(rng.randint(1, 3)):
+        op = rng.random()
+        if op < 0.3 and p:
+            p.pop(rng.randrange(len(p)))
+        elif op < 0.6:
+            n, s, e = rng.choice(events)
+            p.insert(rng.randint(0, len(p)), {"name": n, "start": s, "end": e})
+        elif op < 0.8 and p:
+            i = rng.randrange(len(p))
+            h = rng.randint(0, 23)
+            p[i]["start"] = f"{h:02d}:{rng.choice(['00', '30'])}"
+        elif op < 0.9:
+            p.append({"name": "Ghost", "start": "10:00", "end": "bad"})
+        elif p:
+            p.append(dict(rng.choice(p)))  # duplicate
+    return p
+
+
+def test_incremental_matches_full_revalidation():
+    rng = random.Random(0)
+    settings = [
+        (True, RealismConfig()),
+        (False, RealismConfig(min_gap_minutes=15)),
+        (False, RealismConfig(allow_cross_midnight=True, min_gap_minutes=5)),
+        (True, RealismConfig(day_start="09:00", day_end="18:00", min_gap_minutes=30)),
+    ]
+    pen = PenaltiesMinutes()
+    for seed in range(12):
+        ex = generate_example(SyntheticConfig(num_events=25, overlap_density=3.0, cross_midnight_share=0.1, seed=seed), 0)
+        problem = ProblemInstance(ex["events"], ex["priority_events"])
+        strict, realism = settings[seed % len(settings)]
+        vs = ValidatedSchedule()
+        proposal = [{"name": n, "start": s, "end": e} for n, s, e in rng.sample(ex["events"], 8)]
+        for _ in range(15):
+            inc = vs.update(proposal, problem, strict_times=strict, penalties=pen, realism=realism)
+            full = evaluate_schedule(proposal, problem, strict_times=strict, penalties=pen, realism=realism)
+            assert (inc.report, inc.minutes, inc.diag) == (full.report, full.minutes, full.diag)
+            proposal = _revise(rng, proposal, ex["events"])
+
+
+def test_env_only_rechecks_changed_events():
+    events = [["A","01:00","03:00"], ["B","02:00","04:00"], ["C","04:00","05:00"], ["D","06:00","07:00"]]
+    answer = json.dumps({"events": events, "priority_events": [], "optimal_score": None})
+    env = EventSchedulingMultiTurnEnv(
+        dataset=Dataset.from_list([{"prompt": [{"role": "user", "content": "x"}], "answer": answer}]),
+        rubric=EventSchedulingRubric(EventRubricConfig()), max_turns=3,
+    )
+    first = [{"name": n, "start": s, "end": e} for n, s, e in events[:3]]
+    _, state = asyncio.run(env.env_response([{"role": "assistant", "content": json.dumps({"schedule": first})}],
+                                            {"answer": answer}))
+    assert state["revalidated_events"] == 3 and state["validator_report"]["overlaps"] == [("A", "B")]
+    second = [first[0], first[2], {"name": "D", "start": "06:00", "end": "07:00"}]
+    _, state = asyncio.run(env.env_response([{"role": "assistant", "content": json.dumps({"schedule": second})}],
+                                            state))
+    assert state["revalidated_events"] == 1 and state["validator_report"]["summary"] == "No issues found."
+    assert "validated" not in state and json.loads(json.dumps(state))["validator_report"]["normalized"] == second
@@ -0,0 +1,51 @@
+import random
+from events_env.core.config import PenaltiesMinutes, RealismConfig
+from events_env.evals.conflict_checker import check_conflicts
+from events_env.evals.scoring import score_group, score_with_penalties
+from events_env.utils.intervals import count_overlaps, overlapping_names, overlapping_pairs
+from events_env.utils.time_utils import find_overlaps
+
+
+def _brute(ints):
+    return [(i, j) for i in range(len(ints)) for j in range(i + 1, len(ints))
+            if ints[i][1] > ints[i][0] and ints[j][1] > ints[j][0]
+            and ints[i][0] < ints[j][1] and ints[j][0] < ints[i][1]]
+
+
+def test_pairs_and_count_match_brute_force():
+    rng = random.Random(11)
+    for _ in range(200):
+        ints = []
+        for _ in range(rng.randint(0, 12)):
+            s = rng.randint(0, 300)
+            ints.append((s, s + rng.randint(0, 90)))
+        assert overlapping_pairs(ints) == _brute(ints)
+        assert count_overlaps(ints) == len(_brute(ints))
+
+
+def test_circular_wrap_and_names():
+    ints = [(1380, 1500), (30, 90), (60, 120)]  # 23:00-01:00, 00:30-01:30, 01:00-02:00
+    assert overlapping_pairs(ints) == [(1, 2)]
+    assert overlapping_pairs(ints, circular=True) == [(0, 1), (1, 2)]
+    assert count_overlaps(ints, circular=True) == 2
+    assert overlapping_names(["L", "M", "N"], ints, circular=True) == [("L", "M"), ("M", "N")]
+
+
+def test_long_event_counts_every_conflict():
+    events = [["Long","09:00","13:00"], ["A","09:30","10:00"], ["B","10:30","11:00"], ["C","12:00","12:30"]]
+    prop = [{"name": n, "start": s, "end": e} for n, s, e in events]
+    rep = check_conflicts(prop, events, strict_times=True)
+    assert rep["overlaps"] == [("Long", "A"), ("Long", "B"), ("Long", "C")]
+    pen, realism = PenaltiesMinutes(), RealismConfig()
+    scalar = score_with_penalties(prop, events, [], strict_times=True, penalties=pen, realism=realism)
+    assert scalar[1]["overlaps"] == 3
+    assert score_group([prop, prop[:2]], events, [], strict_times=True, penalties=pen, realism=realism) == [
+        scalar, score_with_penalties(prop[:2], events, [], strict_times=True, penalties=pen, realism=realism)]
+
+
+def test_scorer_stays_linear_and_find_overlaps_reports_all_pairs():
+    catalog = [["Late", "23:00", "01:00"], ["Early", "00:30", "01:30"]]
+    prop = [{"name": n, "start": s, "end": e} for n, s, e in catalog]
+    assert check_conflicts(prop, catalog, allow_cross_midnight=True)["overlaps"] == []
+    ints = [(540, 780), (570, 600), (630, 660)]
+    assert find_overlaps(ints) == overlapping_pairs(ints) == [(0, 1), (0, 2)]
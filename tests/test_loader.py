@@ -0,0 +1,68 @@
+import pickle
+from functools import partial
+import pytest
+from datasets import Dataset, DatasetDict
+from events_env.io import loader
+
+
+def _raw(n):
+    return Dataset.from_list([{
+        "events": [[f"E{i}", "01:00", "02:00"]],
+        "priority_events": [],
+        "optimal_score": 60,
+        "prompt": f"listing {i}",
+    } for i in range(n)])
+
+
+@pytest.fixture
+def fake_hub(monkeypatch):
+    calls = []
+    def fake_load_dataset(name, revision=None):
+        calls.append((name, revision))
+        return DatasetDict({"train": _raw(50), "test": _raw(20 if revision != "r2" else 30)})
+    monkeypatch.setattr(loader, "load_dataset", fake_load_dataset)
+    monkeypatch.setattr(loader, "_dataset_revision", lambda: "r1")
+    return calls
+
+
+def test_select_before_map_and_warm_start(fake_hub, tmp_path, monkeypatch):
+    mapped = []
+    real = loader._map_example
+    monkeypatch.setattr(loader, "_map_example", lambda ex, system_prompt, **kw: mapped.append(1) or real(ex, system_prompt, **kw))
+
+    train, ev = loader._prepare_splits("SYS", 5, 3, cache_dir=str(tmp_path))
+    assert (len(train), len(ev)) == (5, 3) and len(mapped) == 8
+    assert train[0]["prompt"][0] == {"role": "system", "content": "SYS"}
+
+    train2, ev2 = loader._prepare_splits("SYS", 5, 3, cache_dir=str(tmp_path))
+    assert len(fake_hub) == 1 and len(mapped) == 8  # warm start: no load, no map
+    assert train2[:] == train[:] and ev2[:] == ev[:]
+
+    loader._prepare_splits("OTHER", 5, 3, cache_dir=str(tmp_path))
+    assert len(fake_hub) == 2
+
+
+def test_mapper_is_picklable():
+    mapper = pickle.loads(pickle.dumps(partial(loader._map_example, system_prompt="SYS")))
+    out = mapper({"events": [], "priority_events": [], "prompt": "p"})
+    assert out["prompt"][1]["content"] == "p"
+
+
+def test_multiturn_loader_applies_realism(fake_hub, tmp_path):
+    env = loader.load_environment_multiturn(num_train_examples=4, num_eval_examples=2,
+                                            realism_min_gap=15, cache_dir=str(tmp_path))
+    assert env.rubric.cfg.realism.min_gap_minutes == 15
+    assert len(env.dataset) == 4
+
+
+def test_upstream_update_invalidates_prepared_splits(fake_hub, tmp_path, monkeypatch):
+    loader._prepare_splits("SYS", -1, -1, cache_dir=str(tmp_path))
+    monkeypatch.setattr(loader, "_dataset_revision", lambda: "r2")  # the dataset moved on
+    _, ev = loader._prepare_splits("SYS", -1, -1, cache_dir=str(tmp_path))
+    assert fake_hub[-1] == (loader.DATASET_ID, "r2") and len(ev) == 30
+
+    # revision unknown (offline): the loaded source's fingerprint keys the cache
+    monkeypatch.setattr(loader, "_dataset_revision", lambda: None)
+    loader._prepare_splits("SYS", -1, -1, cache_dir=str(tmp_path))
+    loader._prepare_splits("SYS", -1, -1, cache_dir=str(tmp_path))
+    assert len(fake_hub) == 4 and len(list(tmp_path.iterdir())) == 3
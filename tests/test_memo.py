@@ -0,0 +1,49 @@
+import json
+from events_env.core.config import EventRubricConfig
+from events_env.evals import reward as reward_mod
+from events_env.evals.memo import RewardMemo, text_key
+from events_env.evals.rubric import EventSchedulingRubric
+from events_env.utils.cache import LRUCache
+
+
+EVENTS = [["A","01:00","03:00"], ["B","02:00","04:00"], ["C","04:00","05:00"]]
+ANSWER = json.dumps({"events": EVENTS, "priority_events": ["A"], "optimal_score": None})
+SCHED = {"schedule": [{"name": "A", "start": "01:00", "end": "03:00"}, {"name": "C", "start": "04:00", "end": "05:00"}]}
+
+
+def test_text_key_ignores_reasoning_only_when_allowed():
+    a, b = "<think>x</think>" + json.dumps(SCHED), "<think>yy</think>" + json.dumps(SCHED)
+    assert text_key(a, True) == text_key(b, True)
+    assert text_key(a, False) != text_key(b, False)
+
+
+def test_duplicates_hit_the_memo_and_match_uncached(monkeypatch):
+    cfg = EventRubricConfig(normalize_with_optimal="dp")
+    cached = EventSchedulingRubric(cfg, problem_cache=LRUCache(8))
+    plain = EventSchedulingRubric(cfg, problem_cache=LRUCache(8), memoize=False)
+    texts = [json.dumps(SCHED), json.dumps(SCHED), "<think>a</think>" + json.dumps(SCHED, indent=1), "nope"]
+    expected = [plain._reward(t, ANSWER) for t in texts]
+
+    calls = []
+    real = reward_mod.evaluate_schedule
+    monkeypatch.setattr(reward_mod, "evaluate_schedule", lambda *a, **k: calls.append(1) or real(*a, **k))
+    assert [cached._reward(t, ANSWER) for t in texts] == expected
+    assert len(calls) == 1  # one distinct schedule
+    stats = cached.memo.stats()
+    assert stats["extract"]["hits"] == 1 and stats["reward"]["hits"] == 2 and stats["reward"]["misses"] == 1
+
+    group = EventSchedulingRubric(cfg, problem_cache=LRUCache(8))
+    assert group.reward_group(texts, ANSWER) == expected
+    assert group.memo.stats()["reward"]["size"] == 1
+    assert group.reward_group(texts, ANSWER) == expected
+    assert group.memo.stats()["reward"]["hits"] == 1
+
+
+def test_memo_is_keyed_by_answer_and_settings():
+    memo = RewardMemo()
+    other = json.dumps({"events": EVENTS, "priority_events": [], "optimal_score": None})
+    r = EventSchedulingRubric(EventRubricConfig(normalize_with_optimal="none", clip_to_unit=False), memo=memo)
+    assert r._reward(json.dumps(SCHED), ANSWER) == 300.0
+    assert r._reward(json.dumps(SCHED), other) == 180.0
+    r.cfg.realism.min_gap_minutes = 120
+    assert r._reward(json.dumps(SCHED), other) == 170.0
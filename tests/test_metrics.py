@@ -0,0 +1,70 @@
+import json
+import pytest
+from events_env.core.config import EventRubricConfig
+from events_env.evals.rubric import EventSchedulingRubric
+from events_env.utils.cache import LRUCache
+from events_env.utils.metrics import (
+    METRICS, InMemoryExporter, JsonlExporter, Metrics, PrometheusExporter, enable_metrics,
+)
+
+
+@pytest.fixture
+def metrics():
+    enable_metrics()
+    METRICS.reset()
+    yield METRICS
+    METRICS.enabled = False
+    METRICS.reset()
+    METRICS._exporters.clear()
+
+
+def _counter(snap, name, **labels):
+    return sum(c["value"] for c in snap["counters"]
+               if c["name"] == name and all(c["labels"].get(k) == v for k, v in labels.items()))
+
+
+def _hist(snap, name):
+    return [h for h in snap["histograms"] if h["name"] == name]
+
+
+def test_disabled_records_nothing():
+    m = Metrics(enabled=False)
+    with m.timer("x"):
+        m.incr("y")
+    assert m.snapshot()["counters"] == [] and m.snapshot()["histograms"] == []
+
+
+def test_reward_path_is_instrumented(metrics):
+    answer = json.dumps({"events": [["A","01:00","03:00"], ["B","02:00","04:00"]], "priority_events": [], "optimal_score": 240})
+    rubric = EventSchedulingRubric(EventRubricConfig(normalize_with_optimal="dp"), problem_cache=LRUCache(8))
+    good = json.dumps({"schedule": [{"name": "A", "start": "01:00", "end": "03:00"},
+                                    {"name": "B", "start": "02:00", "end": "04:00"}]})
+    rubric._reward(good, answer)
+    rubric._reward('{"schedule": [oops', answer)
+    rubric._reward("<schedule><event>", answer)
+
+    snap = metrics.snapshot()
+    assert _counter(snap, "parses_total", format="json") == 1
+    assert _counter(snap, "parse_failures_total", format="json") == 1
+    assert _counter(snap, "parse_failures_total", format="xml") == 1
+    assert _counter(snap, "penalties_total", category="overlap") == 1
+    assert _counter(snap, "problem_cache_total", result="miss") == 1
+    assert _counter(snap, "problem_cache_total", result="hit") == 2
+    assert _counter(snap, "optimum_total", source="dp") == 1
+    assert _hist(snap, "reward_seconds")[0]["count"] == 3
+    assert _hist(snap, "validate_seconds")[0]["count"] == 1
+
+
+def test_exporters(metrics, tmp_path):
+    mem, prom = InMemoryExporter(), PrometheusExporter(str(tmp_path / "m.prom"))
+    jsonl = JsonlExporter(str(tmp_path / "m.jsonl"))
+    for exp in (mem, prom, jsonl):
+        metrics.add_exporter(exp)
+    metrics.incr("parse_failures_total", format="xml")
+    metrics.observe("turns_used", 2, buckets=(1, 2, 3))
+    metrics.flush()
+    assert mem.snapshots[0]["counters"][0]["value"] == 1
+    assert json.loads((tmp_path / "m.jsonl").read_text())["histograms"][0]["count"] == 1
+    text = (tmp_path / "m.prom").read_text()
+    assert 'events_env_parse_failures_total{format="xml"} 1' in text
+    assert 'events_env_turns_used_bucket{le="2"} 1' in text and 'events_env_turns_used_bucket{le="1"} 0' in text
@@ -1,5 +1,5 @@
 import pytest
-from events_env.io.parsing import parse_schedule_any
+from events_env.io.parsing import extract_schedule, parse_schedule_any
 
 
 CASES = [
@@ -17,3 +17,24 @@ def test_parse_schedule_any(text, ok):
     assert (got is not None) == ok
 
 
+LONG_THINK = "<think>" + ("let me try {\"schedule\": [{\"name\": \"Draft\"}]} hmm " * 400) + "</think>\n"
+JSON_A = '{"schedule":[{"name":"A","start":"01:00","end":"02:00"}]}'
+XML_B = '<schedule><event><name>B</name><start>03:00</start><end>04:00</end></event></schedule>'
+
+
+@pytest.mark.parametrize("text,path,fenced,name", [
+    (LONG_THINK + JSON_A, "json", False, "A"),
+    (LONG_THINK + "Here you go:\n```xml\n" + XML_B + "\n```\nDone.", "xml", True, "B"),
+    ("First try " + JSON_A + " actually, final: " + XML_B, "xml", False, "B"),
+    ('{"note": "x", "schedule": [{"name":"C","start":"05:00","end":"06:00"}]} trailing', "json", False, "C"),
+    ('<Schedule><event><name>D</name><start>01:00</start><end>02:00</end></event></Schedule>', "xml", False, "D"),
+])
+def test_extract_schedule_reports_path(text, path, fenced, name):
+    m = extract_schedule(text, allow_reasoning_tag=True)
+    assert m is not None
+    assert (m.path, m.fenced, m.schedule[0]["name"]) == (path, fenced, name)
+
+
+def test_extract_ignores_drafts_inside_think():
+    assert extract_schedule(LONG_THINK + "no final answer", allow_reasoning_tag=True) is None
+    assert parse_schedule_any(LONG_THINK + JSON_A, allow_reasoning_tag=False) is None
@@ -0,0 +1,37 @@
+import json
+from datasets import Dataset
+from events_env.core.config import EventRubricConfig, RealismConfig
+from events_env.evals import scoring
+from events_env.evals.precompute import add_optimum_column, attach_optimum_sidecar, write_optimum_sidecar
+from events_env.evals.problem import ProblemInstance
+from events_env.evals.rubric import EventSchedulingRubric
+from events_env.io.loader import _map_example
+
+
+EVENTS = [["A","01:00","03:00"], ["B","02:00","04:00"], ["C","04:00","05:00"], ["D","04:05","06:00"]]
+ROWS = [{"events": EVENTS, "priority_events": ["A"], "optimal_score": 999, "prompt": "p"}]
+
+
+def test_wis_solve_reconstructs_optimal_set():
+    value, chosen = scoring.wis_solve(EVENTS, ["A"], RealismConfig())
+    assert value == 240 + 115 and [EVENTS[k][0] for k in chosen] == ["A", "D"]
+
+
+def test_column_and_sidecar_agree(tmp_path):
+    realism = RealismConfig(min_gap_minutes=0)
+    col = add_optimum_column(Dataset.from_list(ROWS), realism)[0]["dp_optimum"]
+    path = tmp_path / "optima.jsonl"
+    assert write_optimum_sidecar(ROWS, realism, str(path)) == 1
+    side = attach_optimum_sidecar(Dataset.from_list(ROWS), str(path))[0]["dp_optimum"]
+    assert col == side and col["value"] == 355.0
+    assert col["schedule"] == [["A","01:00","03:00"], ["D","04:05","06:00"]]
+
+
+def test_rubric_reads_precomputed_denominator(monkeypatch):
+    cfg = EventRubricConfig(normalize_with_optimal="dp")
+    ex = add_optimum_column(Dataset.from_list(ROWS), cfg.realism)[0]
+    answer = _map_example(dict(ex), "SYS")["answer"]
+    monkeypatch.setattr(scoring, "wis_optimum", lambda *a, **k: (_ for _ in ()).throw(AssertionError("DP ran")))
+    completion = json.dumps({"schedule": [{"name": "A", "start": "01:00", "end": "03:00"}]})
+    assert EventSchedulingRubric(cfg)._reward(completion, answer) == 240 / 355
+    assert ProblemInstance.from_answer(answer).optimal_schedule(cfg.realism)[1]["name"] == "D"
@@ -0,0 +1,47 @@
+import json
+from events_env.core.config import EventRubricConfig, RealismConfig
+from events_env.evals.problem import ProblemInstance, get_problem, realism_key
+from events_env.evals.rubric import EventSchedulingRubric
+from events_env.utils.cache import LRUCache
+
+
+ANSWER = json.dumps({
+    "events": [["A","01:00","03:00"], ["B","02:00","04:00"], ["C","04:00","05:00"]],
+    "priority_events": ["A"],
+    "optimal_score": None,
+})
+COMPLETION = '{"schedule":[{"name":"A","start":"01:00","end":"03:00"},{"name":"C","start":"04:00","end":"05:00"}]}'
+
+
+def test_problem_instance_compiles_catalog():
+    p = ProblemInstance.from_answer(ANSWER)
+    assert list(p.starts) == [60, 120, 240] and list(p.ends) == [180, 240, 300]
+    assert p.index["B"] == 1
+    assert list(p.priority) == [1, 0, 0]
+
+
+def test_cache_hits_and_bounded():
+    cache = LRUCache(maxsize=2)
+    a = get_problem(ANSWER, cache)
+    assert get_problem(ANSWER, cache) is a
+    assert (cache.hits, cache.misses) == (1, 1)
+    get_problem(json.dumps({"events": [], "priority_events": []}), cache)
+    get_problem(json.dumps({"events": [["X","01:00","02:00"]], "priority_events": []}), cache)
+    assert len(cache) == 2 and ANSWER not in cache
+
+
+def test_optimum_memoized_per_realism():
+    p = ProblemInstance.from_answer(ANSWER)
+    assert p.optimum(RealismConfig()) == 2*120 + 60
+    p._optima[realism_key(RealismConfig())] = -1.0  # memo is consulted, not recomputed
+    assert p.optimum(RealismConfig()) == -1.0
+    assert p.optimum(RealismConfig(min_gap_minutes=5)) == 2*120 + 60
+
+
+def test_rubric_reuses_compiled_problem():
+    cache = LRUCache(maxsize=8)
+    rubric = EventSchedulingRubric(EventRubricConfig(normalize_with_optimal="dp"), problem_cache=cache)
+    r1 = rubric._reward(COMPLETION, ANSWER)
+    r2 = rubric._reward(COMPLETION, ANSWER)
+    assert r1 == r2 == 1.0
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
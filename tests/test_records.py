@@ -0,0 +1,56 @@
+import asyncio
+import json
+from types import SimpleNamespace
+from datasets import Dataset
+from openai.types.chat import ChatCompletion
+from events_env.core.config import EventRubricConfig
+from events_env.core.env_multiturn import EventSchedulingMultiTurnEnv
+from events_env.core.records import ResponseRecord, SpillFile, record_response
+from events_env.evals.rubric import EventSchedulingRubric
+
+EVENTS = [["A", "01:00", "03:00"], ["B", "02:00", "04:00"]]
+ANSWER = json.dumps({"events": EVENTS, "priority_events": [], "optimal_score": None})
+
+
+def _completion(text, k=0):
+    top = [{"token": "x", "logprob": -0.1, "top_logprobs": [{"token": "y", "logprob": -2.0}] * 5}] * 50
+    return ChatCompletion.model_validate({
+        "id": f"c{k}", "object": "chat.completion", "created": 0, "model": "m",
+        "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": text},
+                     "logprobs": {"content": top}}],
+        "usage": {"prompt_tokens": 30, "completion_tokens": 12, "total_tokens": 42},
+    })
+
+
+def test_record_keeps_text_counts_and_spills_raw(tmp_path):
+    spill = SpillFile(str(tmp_path / "spill.jsonl"))
+    rec = record_response(_completion("hello"), spill)
+    assert (rec.text, rec.prompt_tokens, rec.completion_tokens, rec.finish_reason) == ("hello", 30, 12, "stop")
+    assert not hasattr(rec, "__dict__") and rec.spilled
+    assert rec.raw()["choices"][0]["logprobs"]["content"][0]["top_logprobs"][0]["token"] == "y"
+    # a later append grows the file past the current mapping
+    rec2 = record_response(_completion("again", 1), spill)
+    assert rec2.raw()["id"] == "c1" and rec.raw()["id"] == "c0"
+    assert record_response(_completion("x")).raw() is None
+    spill.close()
+
+
+def test_multiturn_compact_state(tmp_path):
+    first = json.dumps({"schedule": [{"name": n, "start": s, "end": e} for n, s, e in EVENTS]})
+    second = json.dumps({"schedule": [{"name": "A", "start": "01:00", "end": "03:00"}]})
+    replies = iter([first, second])
+
+    async def create(**kw):
+        return _completion(next(replies))
+
+    client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    env = EventSchedulingMultiTurnEnv(
+        dataset=Dataset.from_list([{"prompt": [{"role": "user", "content": "x"}], "answer": ANSWER}]),
+        rubric=EventSchedulingRubric(EventRubricConfig()), max_turns=3,
+        compact_state=True, spill_path=str(tmp_path / "spill.jsonl"),
+    )
+    completion, state = asyncio.run(env.rollout(client, "m", [{"role": "user", "content": "x"}], ANSWER))
+    assert [m["role"] for m in completion] == ["assistant", "user", "assistant"]
+    assert all(isinstance(r, ResponseRecord) for r in state["responses"])
+    assert [r.text for r in state["responses"]] == [first, second]
+    assert state["responses"][1].raw()["usage"]["completion_tokens"] == 12
@@ -0,0 +1,66 @@
+import json
+import random
+import pytest
+from events_env.core.config import EventRubricConfig, PenaltiesMinutes
+from events_env.evals.rescore import main
+from events_env.evals.reward import EventScorer
+from events_env.io.synthetic import SyntheticConfig, generate_example
+
+
+def _records(n_examples=6, per_example=5):
+    rng = random.Random(0)
+    out = []
+    for i in range(n_examples):
+        ex = generate_example(SyntheticConfig(num_events=10, seed=i), 0)
+        answer = json.dumps({"events": ex["events"], "priority_events": ex["priority_events"],
+                             "optimal_score": ex["optimal_score"]})
+        for j in range(per_example):
+            picks = rng.sample(ex["events"], rng.randint(0, 6))
+            text = json.dumps({"schedule": [{"name": n, "start": s, "end": e} for n, s, e in picks]})
+            completion = [{"role": "assistant", "content": text}] if j % 2 else text
+            out.append({"id": f"{i}-{j}", "answer": answer, "completion": "no schedule" if j == 4 else completion})
+    out.append({"id": "store", "state": {"answer": out[0]["answer"]}, "completion": out[0]["completion"]})
+    return out
+
+
+def _read(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+
+def test_rescore_matches_scorer_in_order(tmp_path):
+    records = _records()
+    src = tmp_path / "in.jsonl"
+    src.write_text("".join(json.dumps(r) + "\n" for r in records))
+    cfg = EventRubricConfig(penalties=PenaltiesMinutes(overlap=35.0))
+    scorer = EventScorer(cfg, memoize=False)
+    expected = [scorer._reward(r["completion"], r.get("answer", r.get("state", {}).get("answer"))) for r in records]
+
+    for workers in ("0", "2"):
+        out = tmp_path / f"out{workers}.jsonl"
+        assert main([str(src), "--out", str(out), "--workers", workers, "--chunk-size", "4",
+                     "--penalty", "overlap=35", "--progress", "0"]) == 0
+        rows = _read(out)
+        assert [r["index"] for r in rows] == list(range(len(records)))
+        assert [r["id"] for r in rows] == [r["id"] for r in records]
+        assert [r["reward"] for r in rows] == expected
+        assert rows[4]["parsed"] is False and rows[0]["parsed"] is True
+        assert set(rows[0]["penalty_counts"]) >= {"overlap", "hallucinated_event"}
+
+
+def test_rescore_arrow_input_and_bad_answers(tmp_path):
+    pa = pytest.importorskip("pyarrow")
+    records = _records(2, 3)[:-1] + [{"id": "bad", "answer": "{not json", "completion": "x"}]
+    table = pa.Table.from_pylist([{"id": r["id"], "answer": r["answer"], "completion": json.dumps(r["completion"])}
+                                  for r in records])
+    src = tmp_path / "in.arrow"
+    with pa.ipc.new_stream(str(src), table.schema) as w:
+        w.write_table(table, max_chunksize=2)
+    out = tmp_path / "out.jsonl"
+    assert main([str(src), "--out", str(out), "--workers", "0", "--completion-field", "completion",
+                 "--progress", "0"]) == 0
+    rows = _read(out)
+    assert len(rows) == len(records) and rows[-1]["reward"] is None and "error" in rows[-1]
+    assert all(r["reward"] is not None for r in rows[:-1])
+    with pytest.raises(SystemExit):
+        main([str(src), "--penalty", "nope=1"])
@@ -0,0 +1,98 @@
+import random
+from events_env.core.config import PenaltiesMinutes, RealismConfig
+from events_env.evals.engine import evaluate_schedule
+from events_env.evals.memo import schedule_key
+from events_env.evals.problem import ProblemInstance
+from events_env.evals.scoring import score_group
+from events_env.io import parsing
+from events_env.io.parsing import parse_schedule_any
+from events_env.io.schedule import Schedule
+from events_env.io.store import ResultStore, jsonable_state
+from events_env.io.synthetic import SyntheticConfig, generate_example
+
+
+def _proposal(rng, events):
+    p = []
+    for _ in range(rng.randint(0, 14)):
+        n, s, e = rng.choice(events)
+        r = rng.random()
+        if r < 0.1:
+            s = s.lstrip("0") or "0:00"      # parseable, not canonical
+        elif r < 0.15:
+            e = "bad"
+        elif r < 0.2:
+            n = "Ghost"
+        elif r < 0.3:
+            s = f"{rng.randint(0, 23):02d}:{rng.choice(['00', '30'])}"
+        p.append({"name": n, "start": s, "end": e})
+    return p
+
+
+def test_parsed_schedule_reads_as_dicts():
+    text = '{"schedule":[{"name":"A","start":"09:00","end":"10:00"},{"name":"B","start":"9:30","end":"x"}]}'
+    s = parse_schedule_any(text, allow_reasoning_tag=True)
+    assert isinstance(s, Schedule)
+    expected = [{"name": "A", "start": "09:00", "end": "10:00"}, {"name": "B", "start": "9:30", "end": "x"}]
+    assert s == expected and expected == s
+    assert s[1] == expected[1] and s[-1] == expected[1] and list(s) == expected
+    assert s.starts.tolist() == [540, -1] and s.raw == {1: ("9:30", "x")}
+    assert s[1:] == expected[1:] and s.as_dicts() == expected
+    assert schedule_key(s) == schedule_key(expected)
+    xml = "<schedule><event><name>A</name><start>09:00</start><end>10:00</end></event></schedule>"
+    assert parse_schedule_any(xml, allow_reasoning_tag=True) == expected[:1]
+
+
+def test_json_backends_agree(monkeypatch):
+    texts = [
+        '{"schedule":[{"name":"A","start":"09:00","end":"10:00"}]}',
+        'pre {"schedule":[{"name":"A","start":"09:00","end":"10:00"}]} trailing {not json}',
+        '{"schedule":[{"name":"A","start":"09:00","end":"10:00"}], "x": NaN}',
+        'x {"schedule":[{"name":"A} {","start":"09:00","end":"10:00"}]} \n see {a} } end',
+    ]
+    fast = [parsing.extract_schedule(t, True) for t in texts]
+    monkeypatch.setattr(parsing, "_loads", None)
+    slow = [parsing.extract_schedule(t, True) for t in texts]
+    assert fast == slow and all(m is not None for m in fast)
+    assert fast[3].span == (2, texts[3].index("]}") + 2)
+
+
+def test_native_scoring_matches_dict_path():
+    rng = random.Random(3)
+    pen = PenaltiesMinutes()
+    for seed in range(8):
+        ex = generate_example(SyntheticConfig(num_events=20, cross_midnight_share=0.1, seed=seed), 0)
+        problem = ProblemInstance(ex["events"], ex["priority_events"])
+        dicts = [_proposal(rng, ex["events"]) for _ in range(6)]
+        scheds = [Schedule.from_dicts(p) for p in dicts]
+        for strict in (True, False):
+            for realism in (RealismConfig(), RealismConfig(allow_cross_midnight=True, min_gap_minutes=10)):
+                kw = dict(strict_times=strict, penalties=pen, realism=realism)
+                for d, s in zip(dicts, scheds):
+                    a, b = evaluate_schedule(d, problem, **kw), evaluate_schedule(s, problem, **kw)
+                    assert a.report == b.report and a.minutes == b.minutes and a.diag == b.diag
+                batch = score_group(scheds, ex["events"], ex["priority_events"], problem=problem, **kw)
+                assert batch == score_group(dicts, ex["events"], ex["priority_events"], problem=problem, **kw)
+
+
+def test_indexed_payload_resolves_to_schedule_and_state_serializes(tmp_path):
+    problem = ProblemInstance([["A", "09:00", "10:00"], ["B", "10:00", "11:00"]], [])
+    s = problem.resolve(parse_schedule_any('{"schedule":[1,5]}', allow_reasoning_tag=True, output_format="indexed"))
+    assert isinstance(s, Schedule)
+    assert s == [{"name": "B", "start": "10:00", "end": "11:00"}, {"name": "#5", "start": "", "end": ""}]
+    assert "validator_report" in jsonable_state({"validator_report": {"normalized": s}})
+    store = ResultStore(str(tmp_path))
+    store.put(("e", 0, "c"), [], {"validator_report": {"normalized": s}})
+    store.close()
+    rec = ResultStore(str(tmp_path)).get(("e", 0, "c"))
+    assert rec["state"]["validator_report"]["normalized"] == s.as_dicts()
+
+
+def test_bind_follows_the_problem_not_its_id():
+    s = Schedule.from_triples([("A", "09:00", "10:00"), ("B", "10:00", "11:00")])
+    a = ProblemInstance([["A", "09:00", "10:00"], ["B", "10:00", "11:00"]], [])
+    assert s.bind(a).tolist() == [0, 1]
+    del a  # CPython tends to hand the freed id to the next catalog
+    b = ProblemInstance([["B", "10:00", "11:00"], ["X", "12:00", "13:00"], ["A", "09:00", "10:00"]], [])
+    assert s.bind(b).tolist() == [2, 0]
+    ev = evaluate_schedule(s, b, strict_times=True, penalties=PenaltiesMinutes(), realism=RealismConfig())
+    assert ev.minutes == 120 and ev.report["summary"] == "No issues found."
@@ -0,0 +1,65 @@
+import json
+import random
+import pytest
+from events_env.core.config import EventRubricConfig, PenaltiesMinutes, RealismConfig
+from events_env.evals.problem import ProblemInstance
+from events_env.evals.rubric import EventSchedulingRubric
+from events_env.evals.scoring import score_group, score_with_penalties
+from events_env.utils.time_utils import min_to_hhmm
+
+
+def _catalog(rng, n):
+    events = []
+    for k in range(n):
+        s = rng.randrange(0, 1440 - 15, 5)
+        e = (s + rng.choice([-30, 0, 30, 45, 90, 180])) % 1440
+        events.append([f"E{k}", min_to_hhmm(s), min_to_hhmm(e)])
+    return events
+
+
+def _proposal(rng, events):
+    out = []
+    for _ in range(rng.randrange(0, 12)):
+        roll = rng.random()
+        if roll < 0.1:
+            out.append({"name": "ghost", "start": "01:00", "end": "02:00"})
+            continue
+        nm, st, en = rng.choice(events)
+        if roll < 0.25:
+            st = min_to_hhmm(rng.randrange(0, 1440, 15))
+        out.append({"name": nm, "start": st, "end": en})
+    return out
+
+
+REALISMS = [
+    RealismConfig(),
+    RealismConfig(min_gap_minutes=15, day_start="06:00", day_end="22:00"),
+    RealismConfig(allow_cross_midnight=True, min_gap_minutes=10),
+    RealismConfig(enforce_day_bounds=False),
+]
+
+
+@pytest.mark.parametrize("realism", REALISMS)
+@pytest.mark.parametrize("strict", [True, False])
+def test_group_matches_scalar(realism, strict):
+    rng = random.Random(1234)
+    pen = PenaltiesMinutes(overlap=7.5, min_gap_violation=0.3)
+    for _ in range(20):
+        events = _catalog(rng, rng.randrange(1, 15))
+        prio = [e[0] for e in events if rng.random() < 0.3]
+        problem = ProblemInstance(events, prio)
+        props = [_proposal(rng, events) for _ in range(rng.randrange(1, 10))]
+        batch = score_group(props, events, prio, strict_times=strict, penalties=pen, realism=realism, problem=problem)
+        scalar = [score_with_penalties(p, events, prio, strict_times=strict, penalties=pen, realism=realism)
+                  for p in props]
+        assert batch == scalar
+
+
+def test_rubric_reward_group_matches_reward():
+    events = [["A","01:00","03:00"], ["B","02:00","04:00"], ["C","04:00","05:00"]]
+    answer = json.dumps({"events": events, "priority_events": ["B"], "optimal_score": None})
+    sched = lambda *names: json.dumps({"schedule": [
+        {"name": e[0], "start": e[1], "end": e[2]} for e in events if e[0] in names]})
+    completions = [sched("A", "C"), "garbage", sched("A", "B", "C"), [{"role": "assistant", "content": sched("B")}]]
+    rubric = EventSchedulingRubric(EventRubricConfig(normalize_with_optimal="dp"))
+    assert rubric.reward_group(completions, answer) == [rubric._reward(c, answer) for c in completions]
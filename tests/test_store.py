@@ -0,0 +1,125 @@
+import asyncio
+import json
+import multiprocessing as mp
+from datasets import Dataset
+from openai.types.chat import ChatCompletion
+from events_env.core.config import EventRubricConfig
+from events_env.core.env_multiturn import EventSchedulingMultiTurnEnv
+from events_env.evals.rubric import EventSchedulingRubric
+from events_env.io import loader
+from events_env.io.store import ResultStore
+
+EVENTS = [["A", "01:00", "03:00"], ["B", "04:00", "05:00"]]
+ANSWER = json.dumps({"events": EVENTS, "priority_events": [], "optimal_score": 180})
+CLEAN = json.dumps({"schedule": [{"name": n, "start": s, "end": e} for n, s, e in EVENTS]})
+
+
+def _env(root, calls):
+    env = EventSchedulingMultiTurnEnv(
+        dataset=Dataset.from_list([{"prompt": [{"role": "user", "content": "x"}], "answer": ANSWER}]),
+        rubric=EventSchedulingRubric(EventRubricConfig()), max_turns=3, store=ResultStore(root, {"v": 1}),
+    )
+    async def get_model_response(client, model, prompt, **kw):
+        calls.append(model)
+        return ChatCompletion.model_validate({
+            "id": "x", "object": "chat.completion", "created": 0, "model": model,
+            "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": CLEAN}}],
+        })
+    env.get_model_response = get_model_response
+    return env
+
+
+async def _run(env, client, reps, model="m"):
+    prompt = [{"role": "user", "content": "x"}]
+    return await asyncio.gather(*(env.rollout(client, model, prompt, ANSWER) for _ in range(reps)))
+
+
+def _generate(env, reps, model="m", score=True):
+    inputs = {"prompt": [[{"role": "user", "content": "x"}]] * reps, "answer": [ANSWER] * reps}
+    return asyncio.run(env.a_generate(inputs, client=object(), model=model, score_rollouts=score))
+
+
+def _count_scoring(env):
+    scored = []
+    normalize = env.rubric._normalize
+    env.rubric._normalize = lambda *a: scored.append(1) or normalize(*a)
+    return scored
+
+
+def test_restart_skips_completed_rollouts(tmp_path):
+    calls = []
+    env = _env(str(tmp_path), calls)
+    scored = _count_scoring(env)
+    first = _generate(env, 3)
+    assert len(calls) == 3 and len(scored) == 3  # each rollout scored once
+    store = ResultStore(str(tmp_path), {"v": 1})
+    assert len(store) == 3 and all(r["reward"] == 1.0 for r in store.records())
+
+    # a crash left a torn line behind
+    seg = next(tmp_path.glob("segment-*.jsonl"))
+    with open(seg, "a") as f:
+        f.write('{"example_id": "tor')
+
+    calls.clear()
+    env = _env(str(tmp_path), calls)
+    scored = _count_scoring(env)
+    again = _generate(env, 4)
+    assert len(calls) == 1 and len(scored) == 1  # only the 4th repetition is new; stored rewards are reused
+    assert sum(bool(st.get("resumed")) for st in again.state) == 3 and first.completion == again.completion[:3]
+    assert again.reward == [1.0] * 4
+    # another model is another config
+    asyncio.run(_run(_env(str(tmp_path), calls), None, 1, model="other"))
+    assert len(calls) == 2
+
+
+def test_reward_recorded_by_a_later_process(tmp_path):
+    calls = []
+    _generate(_env(str(tmp_path), calls), 2, score=False)  # as if it crashed before scoring
+    assert [r["reward"] for r in ResultStore(str(tmp_path), {"v": 1}).records()] == [None, None]
+    env = _env(str(tmp_path), calls)
+    scored = _count_scoring(env)
+    assert _generate(env, 2).reward == [1.0, 1.0] and len(scored) == 2 and len(calls) == 2  # replayed, scored once
+    assert [r["reward"] for r in ResultStore(str(tmp_path), {"v": 1}).records()] == [1.0, 1.0]
+
+
+def _writer(root, wid, n):
+    store = ResultStore(root, {"v": 1})
+    for i in range(n):
+        store.put((f"ex{wid}", i, "cfg"), [{"role": "assistant", "content": "y" * 5000}], {"turn": i}, 0.5)
+    store.close()
+
+
+def test_concurrent_writers(tmp_path):
+    ctx = mp.get_context("fork" if "fork" in mp.get_all_start_methods() else "spawn")
+    procs = [ctx.Process(target=_writer, args=(str(tmp_path), w, 50)) for w in range(4)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
+    store = ResultStore(str(tmp_path), {"v": 1})
+    assert len(store) == 200 and len(list(tmp_path.glob("segment-*.jsonl"))) == 4
+
+
+def test_repetitions_follow_the_global_rollout_index(tmp_path):
+    # two workers split one run of 4 repetitions; their keys must not collide
+    calls = []
+    inputs = {"prompt": [[{"role": "user", "content": "x"}]] * 2, "answer": [ANSWER] * 2}
+    for offset in (0, 2):
+        env = _env(str(tmp_path), calls)
+        asyncio.run(env.a_generate(inputs, client=object(), model="m", rollout_offset=offset, max_concurrent=1))
+    store = ResultStore(str(tmp_path), {"v": 1})
+    assert sorted(r["rep"] for r in store.records()) == [0, 1, 2, 3] and len(calls) == 4
+
+    calls.clear()
+    again = _generate(_env(str(tmp_path), calls), 4)
+    assert calls == [] and all(st["resumed"] for st in again.state)
+    assert [st["store_key"][1] for st in again.state] == [0, 1, 2, 3]
+
+
+def test_config_hash_covers_sampling_settings(tmp_path):
+    hashes = {
+        loader.load_environment(synthetic={"num_events": 6}, num_train_examples=2, num_eval_examples=2,
+                                use_cache=False, results_dir=str(tmp_path), **kw).store.config_hash
+        for kw in ({}, {"stream": True}, {"group_choices": 4})
+    }
+    assert len(hashes) == 3
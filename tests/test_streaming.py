@@ -0,0 +1,148 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace as NS
+import pytest
+from datasets import Dataset
+from openai import AsyncOpenAI
+from events_env.core.env_singleturn import EventSchedulingEnv
+from events_env.io.parsing import IncrementalScheduleDetector, extract_schedule, parse_schedule_any
+
+
+SCHEDULE = '{"schedule":[{"name":"A","start":"01:00","end":"02:00"},{"name":"B","start":"03:00","end":"04:00"}]}'
+TRAILER = ["\n\nLet", " me", " double", " check", ":", " " + SCHEDULE] + [" ok"] * 40
+
+
+def _tokens(text, size=4):
+    return [text[i:i+size] for i in range(0, len(text), size)]
+
+
+@pytest.mark.parametrize("text", [
+    SCHEDULE,
+    "<think>draft " + SCHEDULE.replace("A", "Z") + "</think>" + SCHEDULE,
+    "Sure!\n<schedule><event><name>A</name><start>01:00</start><end>02:00</end></event></schedule> more",
+    '{"reasoning": "A {first}, then \\"B\\"", "meta": {"v": [1, {}]}, ' + SCHEDULE[1:] + " trailing" * 20,
+])
+def test_detector_fires_when_payload_closes(text):
+    det = IncrementalScheduleDetector(allow_reasoning_tag=True)
+    fired_at = None
+    for k, tok in enumerate(_tokens(text)):
+        if det.feed(tok):
+            fired_at = k
+            break
+    assert fired_at is not None and det.done
+    assert det.match.schedule == parse_schedule_any(det.text[:det.end], allow_reasoning_tag=True)
+    assert det.match.schedule[0]["name"] == "A"
+
+
+@pytest.mark.parametrize("text", [
+    "Here:\n```json\n" + SCHEDULE + "\n```\nDone {}",
+    '{"note": "a { \\" brace"} {"schedule": "none"} {\n  "schedule" : [{"name":"A}","start":"01:00","end":"02:00"}]} }',
+    "<think>" + "x" * 50 + '{"schedule":[]}</think> <schedule version="1"><event><name>A</name>'
+    "<start>01:00</start><end>02:00</end></event></schedule> tail",
+    "<schedulex/> <schedule>oops</schedule " + SCHEDULE,
+    'a {b, "schedule" c} {"x": 1, "schedule": 5} {"reasoning": "{", "schedule":' + SCHEDULE[12:] + " }",
+    'x, "schedule" {y} ' * 5 + '{"a": 1, "schedule"\n   :' + SCHEDULE[12:],
+])
+def test_detector_matches_extract_for_any_chunking(text):
+    ends = set()
+    for size in (1, 3, 7, 64):
+        det = IncrementalScheduleDetector(allow_reasoning_tag=True)
+        assert any(det.feed(t) for t in _tokens(text, size))
+        assert det.text == text[:len(det.text)] and det.match == extract_schedule(det.text[:det.end], True)
+        ends.add(det.end)
+    assert len(ends) == 1
+
+
+def test_detector_stops_when_schedule_is_not_the_first_key():
+    text = '{"reasoning": "' + "think " * 200 + '", "schedule":' + SCHEDULE[12:] + " ok" * 100
+    det = IncrementalScheduleDetector()
+    tokens = _tokens(text)
+    fired = next(k for k, t in enumerate(tokens) if det.feed(t))
+    assert fired < len(tokens) - 50 and det.match.span == (0, len(text) - 300)
+    assert det.match == extract_schedule(text, True)
+
+
+def test_detector_ignores_incomplete_payload():
+    det = IncrementalScheduleDetector()
+    assert not any(det.feed(t) for t in _tokens(SCHEDULE[:-1] + ' "x"'))
+
+
+class _FakeStreamingServer(BaseHTTPRequestHandler):
+    sent = 0
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+        for tok in _tokens(SCHEDULE) + TRAILER:
+            chunk = {"id": "x", "object": "chat.completion.chunk", "created": 0, "model": "m",
+                     "choices": [{"index": 0, "delta": {"content": tok}, "finish_reason": None}]}
+            try:
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+                self.wfile.flush()
+            except (BrokenPipeError, ConnectionResetError):
+                return
+            type(self).sent += 1
+            time.sleep(0.01)
+        self.wfile.write(b"data: [DONE]\n\n")
+
+
+def test_streaming_rollout_stops_after_schedule():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _FakeStreamingServer)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        client = AsyncOpenAI(base_url=f"http://127.0.0.1:{server.server_port}/v1", api_key="x")
+        ds = Dataset.from_list([{"prompt": [{"role": "user", "content": "x"}], "answer": "{}"}])
+        env = EventSchedulingEnv(dataset=ds, stream=True)
+        completion, state = asyncio.run(env.rollout(
+            client, "m", [{"role": "user", "content": "x"}], "{}", sampling_args={"max_tokens": 200}))
+    finally:
+        server.shutdown()
+
+    total = len(_tokens(SCHEDULE)) + len(TRAILER)
+    assert completion[0]["content"] == SCHEDULE
+    assert state["stopped_early"] and state["stream_tokens"] == len(_tokens(SCHEDULE))
+    assert state["budget_remaining"] == 200 - state["stream_tokens"]
+    assert state["time_to_schedule"] > 0
+    assert _FakeStreamingServer.sent < total
+
+
+class _Stream:
+    def __init__(self, chunks):
+        self.chunks = chunks
+
+    def __aiter__(self):
+        return self._gen()
+
+    async def _gen(self):
+        for c in self.chunks:
+            yield c
+
+    async def close(self):
+        pass
+
+
+def _chunk(content, finish=None):
+    return NS(choices=[NS(delta=NS(content=content), finish_reason=finish)])
+
+
+def test_schedule_on_final_chunk_is_not_stopped_early():
+    toks = _tokens(SCHEDULE)
+    chunks = [_chunk(t) for t in toks[:-1]] + [_chunk(toks[-1], "stop")]
+
+    async def create(**kwargs):
+        return _Stream(chunks)
+
+    client = NS(chat=NS(completions=NS(create=create)))
+    env = EventSchedulingEnv(dataset=Dataset.from_list([{"prompt": [{"role": "user", "content": "x"}], "answer": "{}"}]),
+                             stream=True)
+    text, state = asyncio.run(env._stream_until_schedule(client, "m", [], {}))
+    assert text == SCHEDULE and not state["stopped_early"]
+    assert state["finish_reason"] == "stop" and state["budget_remaining"] is None
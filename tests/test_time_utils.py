@@ -0,0 +1,34 @@
+import json
+import pytest
+from events_env.core.config import EventRubricConfig, PenaltiesMinutes, RealismConfig
+from events_env.evals.rubric import EventSchedulingRubric
+from events_env.evals.scoring import score_group, score_with_penalties
+from events_env.utils.time_utils import hhmm_to_min, parse_hhmm
+
+
+def test_parse_hhmm_table_and_slow_path():
+    assert parse_hhmm("00:00") == 0 and parse_hhmm("23:59") == 1439 and parse_hhmm("24:00") == 1440
+    assert parse_hhmm("9:05") == 545 and parse_hhmm(" 09:05 ") == 545
+    for bad in ("24:01", "12:60", "1:5", "noon", "", "12-30", "123:00"):
+        assert parse_hhmm(bad) is None
+    with pytest.raises(ValueError):
+        hhmm_to_min("25:00")
+
+
+EVENTS = [["A","09:00","10:00"], ["B","10:00","11:00"]]
+
+
+@pytest.mark.parametrize("strict", [True, False])
+def test_malformed_time_is_a_penalty_not_an_error(strict):
+    prop = [{"name":"A","start":"9am","end":"10:00"}, {"name":"B","start":"10:00","end":"11:00"}]
+    pen, realism = PenaltiesMinutes(malformed_time=7.0), RealismConfig()
+    minutes, diag = score_with_penalties(prop, EVENTS, [], strict_times=strict, penalties=pen, realism=realism)
+    assert diag["penalty_counts"]["malformed_time"] == 1 and diag["penalty_counts"]["time_mismatch"] == 0
+    assert minutes == 60 - 7.0
+    assert score_group([prop], EVENTS, [], strict_times=strict, penalties=pen, realism=realism) == [(minutes, diag)]
+
+
+def test_rubric_survives_garbage_times():
+    answer = json.dumps({"events": EVENTS, "priority_events": [], "optimal_score": 120})
+    completion = json.dumps({"schedule": [{"name": "A", "start": "99:99", "end": "??"}]})
+    assert EventSchedulingRubric(EventRubricConfig(strict_times=False))._reward(completion, answer) == 0.0
@@ -0,0 +1,92 @@
+import json
+import random
+import numpy as np
+from events_env.core.config import EventRubricConfig, PenaltiesMinutes, RealismConfig
+from events_env.evals.conflict_checker import check_conflicts
+from events_env.evals.engine import evaluate_schedule
+from events_env.evals.incremental import ValidatedSchedule
+from events_env.evals.problem import ProblemInstance
+from events_env.evals.reward import EventScorer
+from events_env.evals.scoring import score_group
+from events_env.evals.wis import solve, solve_tracks
+from events_env.io.synthetic import SyntheticConfig, generate_example
+
+
+def _brute(s, e, w, k, gap):
+    best = 0.0
+    for m in range(1 << len(s)):
+        sel = [i for i in range(len(s)) if m >> i & 1]
+        # k tracks suffice iff no point is covered by more than k of [start, end + gap)
+        if all(sum(1 for i in sel if s[i] <= s[j] < e[i] + gap) <= k for j in sel):
+            best = max(best, sum(w[i] for i in sel))
+    return best
+
+
+def test_solve_tracks_matches_brute_force():
+    rng = random.Random(0)
+    for _ in range(150):
+        n, k, gap = rng.randint(0, 8), rng.randint(1, 3), rng.choice([0, 10])
+        s = [rng.randint(0, 120) for _ in range(n)]
+        e = [x + rng.randint(1, 60) for x in s]
+        w = [float(rng.randint(1, 50)) for _ in range(n)]
+        value, sel = solve_tracks(np.array(s), np.array(e), np.array(w), k, min_gap=gap, with_selection=True)
+        assert value == _brute(s, e, w, k, gap)
+        assert sum(w[i] for i in sel) == value
+        if k == 1:
+            assert value == solve(np.array(s), np.array(e), np.array(w), min_gap=gap)[0]
+
+
+def test_rooms_and_capacity():
+    catalog = [["A", "09:00", "10:00", "Hall"], ["B", "09:30", "10:30", "Lab"], ["C", "09:15", "09:45", "Hall"]]
+    sched = [{"name": n, "start": s, "end": e} for n, s, e, _ in catalog]
+    assert len(check_conflicts(sched, catalog)["overlaps"]) == 3
+    rep = check_conflicts(sched, catalog, enforce_venue_exclusive=True)
+    assert rep["overlaps"] == [("A", "C")]
+
+    realism = RealismConfig(enforce_venue_exclusive=True)
+    two_rooms = ProblemInstance(catalog, [], venue_capacity={"Hall": 2})
+    ev = evaluate_schedule(sched, two_rooms, strict_times=True, penalties=PenaltiesMinutes(), realism=realism)
+    assert ev.report["overlaps"] == [] and ev.minutes == 60 + 60 + 30
+    assert two_rooms.optimum(realism) == 150
+    assert ProblemInstance(catalog, []).optimum(realism) == 120
+
+
+def test_venue_modes_agree_across_paths():
+    rng = random.Random(1)
+    pen = PenaltiesMinutes()
+    for seed in range(6):
+        for venues, cap in ((0, 1), (4, 1), (3, 2)):
+            ex = generate_example(SyntheticConfig(num_events=18, num_venues=venues, venue_capacity=cap, seed=seed), 0)
+            problem = ProblemInstance(ex["events"], ex["priority_events"], venue_capacity=ex.get("venue_capacity"))
+            props = [[{"name": n, "start": s, "end": e} for n, s, e, *_ in rng.sample(ex["events"], rng.randint(0, 12))]
+                     for _ in range(5)]
+            for gap in (0, 10):
+                realism = RealismConfig(enforce_venue_exclusive=True, min_gap_minutes=gap)
+                kw = dict(strict_times=True, penalties=pen, realism=realism)
+                full = [evaluate_schedule(p, problem, **kw) for p in props]
+                assert score_group(props, ex["events"], ex["priority_events"], problem=problem, **kw) == \
+                    [(f.minutes, f.diag) for f in full]
+                vs = ValidatedSchedule()
+                for p, f in zip(props, full):
+                    inc = vs.update(p, problem, **kw)
+                    assert (inc.minutes, inc.report) == (f.minutes, f.report)
+                if venues == 0:  # one shared venue: same as plain exclusivity
+                    plain = RealismConfig(min_gap_minutes=gap)
+                    assert [f.minutes for f in full] == \
+                        [evaluate_schedule(p, problem, strict_times=True, penalties=pen, realism=plain).minutes for p in props]
+                # the optimal event set is conflict-free and scores the optimum
+                best = problem.optimal_schedule(realism)
+                ev = evaluate_schedule(best, problem, **kw)
+                assert ev.diag["penalty_minutes"] == 0 and ev.minutes == problem.optimum(realism)
+
+
+def test_reward_normalizes_by_venue_optimum():
+    ex = generate_example(SyntheticConfig(num_events=30, num_venues=3, venue_capacity=2, seed=4), 0)
+    answer = json.dumps({"events": ex["events"], "priority_events": ex["priority_events"],
+                         "optimal_score": ex["optimal_score"], "venue_capacity": ex["venue_capacity"]})
+    realism = RealismConfig(enforce_day_bounds=False, enforce_venue_exclusive=True)
+    best = ProblemInstance.from_answer(answer).optimal_schedule(realism)
+    text = json.dumps({"schedule": best})
+    for mode in ("dp", "dataset"):
+        scorer = EventScorer(EventRubricConfig(normalize_with_optimal=mode, realism=realism, clip_to_unit=False))
+        assert scorer._reward(text, answer) == 1.0
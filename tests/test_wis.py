@@ -0,0 +1,48 @@
+from itertools import combinations
+import numpy as np
+from events_env.core.config import RealismConfig
+from events_env.evals import scoring
+from events_env.evals.wis import solve, solve_batch
+
+
+def _brute(s, e, w, gap):
+    order = sorted(range(len(s)), key=lambda i: s[i])
+    best = 0.0
+    for r in range(len(s) + 1):
+        for sub in combinations(order, r):
+            if all(e[a] + gap <= s[b] for a, b in zip(sub, sub[1:])):
+                best = max(best, sum(w[i] for i in sub))
+    return best
+
+
+def _catalog(rng, n):
+    s = rng.integers(0, 600, size=n)
+    e = s + rng.integers(1, 120, size=n)
+    return s, e, (e - s) * rng.choice([1.0, 2.0], size=n)
+
+
+def test_solve_matches_brute_force_with_min_gap():
+    rng = np.random.default_rng(7)
+    for trial in range(60):
+        s, e, w = _catalog(rng, int(rng.integers(0, 9)))
+        gap = int(rng.choice([0, 5, 30]))
+        value, sel = solve(s, e, w, min_gap=gap, with_selection=True)
+        assert value == _brute(s, e, w, gap)
+        assert w[sel].sum() == value
+        assert all(e[a] + gap <= s[b] for a, b in zip(sel, sel[1:]))
+
+
+def test_batch_equals_individual_solves():
+    rng = np.random.default_rng(3)
+    cats = [_catalog(rng, int(rng.integers(0, 40))) for _ in range(50)]
+    for gap in (0, 15):
+        expected = [solve(*c, min_gap=gap)[0] for c in cats]
+        assert solve_batch(cats, min_gap=gap).tolist() == expected
+
+
+def test_min_gap_lowers_optimum_and_wraps_cross_midnight():
+    events = [["A","09:00","10:00"], ["B","10:05","11:00"], ["L","23:00","01:00"]]
+    assert scoring.wis_optimum(events, [], RealismConfig()) == 115
+    assert scoring.wis_optimum(events, [], RealismConfig(min_gap_minutes=10)) == 60
+    value, chosen = scoring.wis_solve(events, [], RealismConfig(allow_cross_midnight=True))
+    assert value == 235 and chosen == [0, 1, 2]
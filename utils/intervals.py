@@ -0,0 +1,81 @@
+"""
+Sweep-line overlap queries over half-open minute intervals [start, end).
+
+These helpers report every overlapping pair in O(n log n + k) (k = number of pairs), or just count them in
+O(n log n), and can map pairs back to event names.
+
+Intervals are linear by default: a wrapped event is expected with its end
+extended past 1440, as the scorer does, which models one day's schedule. With
+`circular=True` the timeline is a `period`-minute circle instead, so a 23:00-01:00
+event also conflicts with 00:30-01:30. Circular mode is opt-in for callers:
+the scorer (engine, check_conflicts, score_group) always uses the linear form,
+so its overlaps agree with the linear DP optimum.
+"""
+import heapq
+from bisect import bisect_right
+from typing import List, Sequence, Tuple
+
+Interval = Tuple[int, int]
+
+def _unwrapped(intervals: Sequence[Interval], period: int) -> List[Tuple[int, int, int]]:
+    """(start, end, owner) including a copy shifted back one period for each wrapped interval."""
+    items = [(s, e, k) for k, (s, e) in enumerate(intervals)]
+    items += [(s - period, e - period, k) for k, (s, e) in enumerate(intervals) if e > period]
+    return items
+
+def overlapping_pairs(
+    intervals: Sequence[Interval],
+    *,
+    circular: bool = False,
+    period: int = 1440,
+) -> List[Tuple[int, int]]:
+    """
+    Every pair (i, j), i < j, of input positions whose intervals overlap, sorted.
+    Touching intervals (end == next start) do not overlap.
+    """
+    items = _unwrapped(intervals, period) if circular else [(s, e, k) for k, (s, e) in enumerate(intervals)]
+    items.sort()
+    active: List[Tuple[int, int]] = []  # heap of (end, owner)
+    pairs = set() if circular else []
+    for s, e, k in items:
+        if e <= s:
+            continue
+        while active and active[0][0] <= s:
+            heapq.heappop(active)
+        for _, other in active:
+            if other != k:
+                p = (other, k) if other < k else (k, other)
+                if circular:
+                    pairs.add(p)
+                else:
+                    pairs.append(p)
+        heapq.heappush(active, (e, k))
+    return sorted(pairs)
+
+def count_overlaps(
+    intervals: Sequence[Interval],
+    *,
+    circular: bool = False,
+    period: int = 1440,
+) -> int:
+    """
+    Number of overlapping pairs without materializing them. For linear intervals,
+    interval j (in start order) overlaps the earlier ones not yet ended at its
+    start: j - #{ends <= start_j}.
+    """
+    if circular:
+        return len(overlapping_pairs(intervals, circular=True, period=period))
+    ints = [(s, e) for s, e in intervals if e > s]
+    starts = sorted(s for s, _ in ints)
+    ends = sorted(e for _, e in ints)
+    return sum(j - bisect_right(ends, s) for j, s in enumerate(starts))
+
+def overlapping_names(
+    names: Sequence[str],
+    intervals: Sequence[Interval],
+    *,
+    circular: bool = False,
+    period: int = 1440,
+) -> List[Tuple[str, str]]:
+    """`overlapping_pairs` with positions mapped to `names` (parallel to `intervals`)."""
+    return [(names[i], names[j]) for i, j in overlapping_pairs(intervals, circular=circular, period=period)]
@@ -0,0 +1,208 @@
+"""
+Process-wide counters and histograms for rollouts and rewards.
+
+Disabled by default; the instrumented code paths then cost one attribute check
+(`timer()` hands back a shared no-op context). Enable with EVENTS_ENV_METRICS=1
+or `enable_metrics(...)`, then read `METRICS.snapshot()` or push it to exporters
+with `METRICS.flush()`:
+
+    from events_env.utils.metrics import METRICS, JsonlExporter, enable_metrics
+    enable_metrics(JsonlExporter("metrics.jsonl"))
+    ...
+    METRICS.flush()
+"""
+import json
+import os
+import tempfile
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+# seconds; wide enough for both microsecond parsing and multi-second model calls
+LATENCY_BUCKETS: Tuple[float, ...] = (
+    1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3, 2.5e-3, 5e-3, 1e-2, 2.5e-2, 5e-2,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+COUNT_BUCKETS: Tuple[float, ...] = (1, 2, 3, 4, 5, 6, 8, 10, 16, 32)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+class Histogram:
+    __slots__ = ("bounds", "counts", "count", "sum", "min", "max")
+
+    def __init__(self, bounds: Sequence[float] = LATENCY_BUCKETS):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)  # last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.min = float("inf")
+        self.max = float("-inf")
+
+    def observe(self, v: float) -> None:
+        self.counts[bisect_left(self.bounds, v)] += 1
+        self.count += 1
+        self.sum += v
+        if v < self.min: self.min = v
+        if v > self.max: self.max = v
+
+    def to_dict(self) -> Dict[str, Any]:
+        cum, buckets = 0, []
+        for le, c in zip(self.bounds + (float("inf"),), self.counts):
+            cum += c
+            buckets.append(["+Inf" if le == float("inf") else le, cum])
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+            "mean": self.sum / self.count if self.count else None,
+            "buckets": buckets,
+        }
+
+class _NullTimer:
+    __slots__ = ()
+    def __enter__(self): return self
+    def __exit__(self, *exc): return False
+
+_NULL_TIMER = _NullTimer()
+
+class _Timer:
+    __slots__ = ("metrics", "name", "labels", "t0")
+
+    def __init__(self, metrics: "Metrics", name: str, labels: Dict[str, Any]):
+        self.metrics, self.name, self.labels = metrics, name, labels
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.observe(self.name, time.perf_counter() - self.t0, **self.labels)
+        return False
+
+def _key(name: str, labels: Dict[str, Any]) -> Tuple[str, Labels]:
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+class Metrics:
+    __slots__ = ("enabled", "_lock", "_counters", "_hists", "_exporters")
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._counters: Dict[Tuple[str, Labels], float] = {}
+        self._hists: Dict[Tuple[str, Labels], Histogram] = {}
+        self._exporters: List[Any] = []
+
+    def incr(self, name: str, value: float = 1, **labels: Any) -> None:
+        if not self.enabled:
+            return
+        k = _key(name, labels)
+        with self._lock:
+            self._counters[k] = self._counters.get(k, 0) + value
+
+    def observe(self, name: str, value: float, *, buckets: Optional[Sequence[float]] = None, **labels: Any) -> None:
+        if not self.enabled:
+            return
+        k = _key(name, labels)
+        with self._lock:
+            h = self._hists.get(k)
+            if h is None:
+                h = self._hists[k] = Histogram(buckets or LATENCY_BUCKETS)
+            h.observe(value)
+
+    def timer(self, name: str, **labels: Any):
+        """Context manager observing elapsed seconds into histogram `name`."""
+        return _Timer(self, name, labels) if self.enabled else _NULL_TIMER
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = [{"name": n, "labels": dict(l), "value": v} for (n, l), v in sorted(self._counters.items())]
+            hists = [{"name": n, "labels": dict(l), **h.to_dict()} for (n, l), h in sorted(self._hists.items(), key=lambda kv: kv[0])]
+        return {"ts": time.time(), "counters": counters, "histograms": hists}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._hists.clear()
+
+    def add_exporter(self, exporter: Any) -> None:
+        self._exporters.append(exporter)
+
+    def flush(self) -> Dict[str, Any]:
+        """Send the current snapshot to every registered exporter and return it."""
+        snap = self.snapshot()
+        for exp in self._exporters:
+            exp.export(snap)
+        return snap
+
+class InMemoryExporter:
+    """Keeps every exported snapshot in `snapshots`."""
+    def __init__(self):
+        self.snapshots: List[Dict[str, Any]] = []
+
+    def export(self, snapshot: Dict[str, Any]) -> None:
+        self.snapshots.append(snapshot)
+
+class JsonlExporter:
+    """Appends one JSON line per snapshot."""
+    def __init__(self, path: str):
+        self.path = path
+
+    def export(self, snapshot: Dict[str, Any]) -> None:
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(snapshot) + "\n")
+
+def _prom_labels(labels: Dict[str, str], extra: Optional[Tuple[str, str]] = None) -> str:
+    items = list(labels.items()) + ([extra] if extra else [])
+    if not items:
+        return ""
+    esc = lambda v: str(v).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+    return "{" + ",".join(f'{k}="{esc(v)}"' for k, v in items) + "}"
+
+def to_prometheus(snapshot: Dict[str, Any], prefix: str = "events_env_") -> str:
+    """Prometheus text exposition format of a snapshot."""
+    lines: List[str] = []
+    typed = set()
+    for c in snapshot["counters"]:
+        name = prefix + c["name"]
+        if name not in typed:
+            lines.append(f"# TYPE {name} counter"); typed.add(name)
+        lines.append(f"{name}{_prom_labels(c['labels'])} {c['value']}")
+    for h in snapshot["histograms"]:
+        name = prefix + h["name"]
+        if name not in typed:
+            lines.append(f"# TYPE {name} histogram"); typed.add(name)
+        for le, cum in h["buckets"]:
+            lines.append(f"{name}_bucket{_prom_labels(h['labels'], ('le', str(le)))} {cum}")
+        lines.append(f"{name}_sum{_prom_labels(h['labels'])} {h['sum']}")
+        lines.append(f"{name}_count{_prom_labels(h['labels'])} {h['count']}")
+    return "\n".join(lines) + "\n"
+
+class PrometheusExporter:
+    """
+    Renders snapshots as Prometheus text. Kept in `text`; with `path`, also written
+    atomically to that file (e.g. for the node_exporter textfile collector).
+    """
+    def __init__(self, path: Optional[str] = None, prefix: str = "events_env_"):
+        self.path = path
+        self.prefix = prefix
+        self.text = ""
+
+    def export(self, snapshot: Dict[str, Any]) -> None:
+        self.text = to_prometheus(snapshot, self.prefix)
+        if self.path:
+            d = os.path.dirname(os.path.abspath(self.path))
+            fd, tmp = tempfile.mkstemp(dir=d, prefix=".metrics-")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(self.text)
+            os.replace(tmp, self.path)
+
+METRICS = Metrics(enabled=os.environ.get("EVENTS_ENV_METRICS", "") not in ("", "0"))
+
+def enable_metrics(*exporters: Any) -> Metrics:
+    """Turn on the process-wide METRICS and register `exporters`."""
+    METRICS.enabled = True
+    for exp in exporters:
+        METRICS.add_exporter(exp)
+    return METRICS
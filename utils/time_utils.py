@@ -1,6 +1,28 @@
+from typing import Optional
+from .intervals import overlapping_pairs
+
+# Every canonical "HH:MM" of the day plus "24:00" (end of day), precomputed once.
+HHMM_TABLE: dict[str, int] = {f"{m // 60:02d}:{m % 60:02d}": m for m in range(1441)}
+HHMM_STRINGS: tuple[str, ...] = tuple(HHMM_TABLE)  # minute -> canonical string
+
+def parse_hhmm(t: str) -> Optional[int]:
+    """Minutes since midnight, or None if `t` is not a valid time in [00:00, 24:00]."""
+    m = HHMM_TABLE.get(t)
+    if m is not None:
+        return m
+    # slow path: surrounding whitespace and single-digit hours ("9:05")
+    if not isinstance(t, str):
+        return None
+    h, sep, mm = t.strip().partition(":")
+    if not sep or not (1 <= len(h) <= 2) or len(mm) != 2 or not (h.isdigit() and mm.isdigit()):
+        return None
+    return HHMM_TABLE.get(f"{int(h):02d}:{mm}")
+
 def hhmm_to_min(t: str) -> int:
-    h, m = t.split(":")
-    return int(h) * 60 + int(m)
+    m = parse_hhmm(t)
+    if m is None:
+        raise ValueError(f"invalid time: {t!r}")
+    return m
 
 def min_to_hhmm(x: int) -> str:
     h = x // 60
@@ -22,10 +44,6 @@ def no_overlap(intervals: list[tuple[int,int]]) -> bool:
     return True
 
 def find_overlaps(intervals: list[tuple[int,int]]) -> list[tuple[int,int]]:
-    ints = sorted(intervals, key=lambda x: x[0])
-    overlaps = []
-    for i in range(len(ints) - 1):
-        if ints[i][1] > ints[i+1][0]:
-            overlaps.append((i, i+1))
-    return overlaps
+    """Every overlapping pair (i, j) of input positions; kept as an alias of `intervals.overlapping_pairs`."""
+    return overlapping_pairs(intervals)
  
\ No newline at end of file